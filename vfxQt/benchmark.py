@@ -0,0 +1,327 @@
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from Qt import QtCore, QtGui, QtSvg
+
+from vfxQt.media import (
+    ARCEvictionPolicy,
+    ImageCache,
+    ImageSequence,
+    LFUEvictionPolicy,
+    LRUEvictionPolicy,
+    MediaCache,
+)
+
+EVICTION_POLICIES = {
+    "lru": LRUEvictionPolicy,
+    "lfu": LFUEvictionPolicy,
+    "arc": ARCEvictionPolicy,
+}
+
+
+class TraceMediaCache(MediaCache):
+    """A media cache that replays resource names without touching
+    the file system. Every resource costs the same amount of bytes.
+    """
+
+    def __init__(self, resource_bytes) -> None:
+        super().__init__()
+        self._supported_resource_ext = (".svg", ".png", ".jpg", ".jpeg")
+        self._resource_bytes = resource_bytes
+
+    def resolveResourcePath(self, resource_name):
+        return resource_name
+
+    def allocateResource(self, resource_file_path):
+        return resource_file_path
+
+    def resourceBytes(self, resource_object):
+        return self._resource_bytes
+
+
+def load_trace(file_path):
+    """Load a recorded scroll trace.
+    Args:
+        file_path (str): A text file with one resource name per line,
+                         in the order the delegate requested them.
+    Returns:
+        list[str]: The resource names.
+    """
+    with open(file_path, "r") as trace_file:
+        return [line.strip() for line in trace_file if line.strip()]
+
+
+def generate_scroll_trace(
+    item_count=50000, visible_count=60, scroll_count=2000, seed=0
+):
+    """Generate a synthetic asset browser scroll trace. The viewport
+    mostly scrolls forward and occasionally jumps back to an already
+    seen position, each step requests all visible items.
+    Args:
+        item_count (int): The item count of the view.
+        visible_count (int): The visible item count.
+        scroll_count (int): The scroll step count.
+        seed (int): The random seed.
+    Returns:
+        list[str]: The resource names.
+    """
+    rng = random.Random(seed)
+    trace = []
+    position = 0
+    history = [position]
+    for _ in range(scroll_count):
+        if rng.random() < 0.1 and len(history) > 1:
+            position = rng.choice(history)
+        else:
+            position += rng.randint(-visible_count // 2, visible_count)
+        position = min(max(0, position), item_count - visible_count)
+        history.append(position)
+        for item_idx in range(position, position + visible_count):
+            trace.append(f"asset_{item_idx:06d}.png")
+    return trace
+
+
+def simulate_hit_rate(trace, policy_name, max_bytes, resource_bytes):
+    """Replay the trace with the given eviction policy.
+    Args:
+        trace (list[str]): The resource names.
+        policy_name (str): The eviction policy name.
+        max_bytes (int): The cache byte budget.
+        resource_bytes (int): The cost per resource.
+    Returns:
+        float: The hit rate.
+    """
+    cache = TraceMediaCache(resource_bytes)
+    cache.setEvictionPolicy(EVICTION_POLICIES[policy_name]())
+    cache.setMaxBytes(max_bytes)
+    for resource_name in trace:
+        cache.getResource(resource_name, track=False)
+    return cache.stats()["hit_rate"]
+
+
+def stress_media_cache(
+    thread_count=16, iteration_count=20000, resource_count=500, budget=100
+):
+    """Hammer a media cache from a thread pool with a mix of tracked
+    and untracked lookups and releases, then validate its bookkeeping.
+    Args:
+        thread_count (int): The worker thread count.
+        iteration_count (int): The lookup count per worker.
+        resource_count (int): The distinct resource count.
+        budget (int): The byte budget measured in resource counts.
+    Returns:
+        list[str]: The detected inconsistencies, empty if the cache is sound.
+    """
+    resource_bytes = 1024
+    cache = TraceMediaCache(resource_bytes)
+    cache.setEvictionPolicy(ARCEvictionPolicy())
+    cache.setMaxBytes(budget * resource_bytes)
+    errors = []
+    start_barrier = threading.Barrier(thread_count)
+
+    def worker(seed):
+        rng = random.Random(seed)
+        tracked_resource_names = []
+        start_barrier.wait()
+        for _ in range(iteration_count):
+            resource_name = f"asset_{rng.randrange(resource_count):06d}.png"
+            track = rng.random() < 0.2
+            if cache.getResource(resource_name, track=track) != resource_name:
+                errors.append(f"Lookup of {resource_name} returned a wrong object")
+            if track:
+                tracked_resource_names.append(resource_name)
+            if tracked_resource_names and rng.random() < 0.2:
+                cache.releaseResource(tracked_resource_names.pop(), clear=False)
+        for resource_name in tracked_resource_names:
+            cache.releaseResource(resource_name, clear=False)
+
+    with ThreadPoolExecutor(max_workers=thread_count) as executor:
+        for future in [executor.submit(worker, i) for i in range(thread_count)]:
+            future.result()
+
+    resources = list(cache._cache.values())
+    if cache.cacheBytes() != sum(r["bytes"] for r in resources):
+        errors.append("Resident bytes don't match the cached resources")
+    if any(r["users"] != 0 for r in resources):
+        errors.append("Unbalanced user counts after all resources were released")
+    if cache.cacheBytes() > cache.maxBytes():
+        errors.append("Cache exceeds its budget without pinned resources")
+    return errors
+
+
+STRESS_SVG = b"""<svg xmlns="http://www.w3.org/2000/svg" width="32" height="32">
+<circle cx="16" cy="16" r="12" fill="#3da5d9"/>
+</svg>
+"""
+
+
+def stress_image_cache(
+    thread_count=8, iteration_count=2000, resource_count=64, budget=16
+):
+    """Hammer an image cache from a thread pool while the GUI thread
+    draws from it, then validate its bookkeeping. Workers request
+    raster images, svg files and image sequences, their raster inserts
+    evict the pixmaps of the GUI thread, which have to be handed back
+    to the GUI thread to be released.
+    Args:
+        thread_count (int): The worker thread count.
+        iteration_count (int): The lookup count per worker.
+        resource_count (int): The distinct raster image count.
+        budget (int): The byte budget measured in raster image counts.
+    Returns:
+        list[str]: The detected inconsistencies, empty if the cache is sound.
+    """
+    app = QtGui.QGuiApplication.instance()
+    if app is None:
+        if sys.platform.startswith("linux") and not (
+            os.environ.get("DISPLAY") or os.environ.get("WAYLAND_DISPLAY")
+        ):
+            # Headless hosts (e.g. CI) have no display to connect to.
+            os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+        app = QtGui.QGuiApplication(sys.argv[:1])
+    errors = []
+    with tempfile.TemporaryDirectory() as dir_path:
+        image = QtGui.QImage(64, 64, QtGui.QImage.Format_ARGB32)
+        image_names = []
+        for index in range(resource_count):
+            image.fill(QtGui.QColor.fromHsv(index * 5 % 360, 200, 200))
+            image_names.append(f"asset_{index:06d}.png")
+            image.save(os.path.join(dir_path, image_names[-1]))
+        for index in range(8):
+            image.save(os.path.join(dir_path, f"sequence.{index:04d}.png"))
+        with open(os.path.join(dir_path, "asset.svg"), "wb") as svg_file:
+            svg_file.write(STRESS_SVG)
+        resource_names = image_names + ["asset.svg", "sequence.####.png"]
+
+        cache = ImageCache()
+        cache.setEvictionPolicy(ARCEvictionPolicy())
+        cache.setMaxBytes(budget * cache.resourceBytes(image))
+        cache.addSearchPath(dir_path)
+        start_barrier = threading.Barrier(thread_count + 1)
+
+        def worker(seed):
+            rng = random.Random(seed)
+            tracked_resource_names = []
+            start_barrier.wait()
+            for _ in range(iteration_count):
+                resource_name = rng.choice(resource_names)
+                track = rng.random() < 0.2
+                resource_object = cache.getResource(resource_name, track=track)
+                if resource_name.endswith(".svg"):
+                    expected_type = QtSvg.QSvgRenderer
+                elif ImageSequence.isPattern(resource_name):
+                    expected_type = ImageSequence
+                else:
+                    expected_type = QtGui.QImage
+                if not isinstance(resource_object, expected_type):
+                    errors.append(f"Lookup of {resource_name} returned a wrong object")
+                elif (
+                    isinstance(resource_object, QtCore.QObject)
+                    and resource_object.thread() != app.thread()
+                ):
+                    errors.append(f"{resource_name} isn't owned by the GUI thread")
+                if track:
+                    tracked_resource_names.append(resource_name)
+                if tracked_resource_names and rng.random() < 0.2:
+                    cache.releaseResource(tracked_resource_names.pop(), clear=False)
+            for resource_name in tracked_resource_names:
+                cache.releaseResource(resource_name, clear=False)
+
+        with ThreadPoolExecutor(max_workers=thread_count) as executor:
+            futures = [executor.submit(worker, i) for i in range(thread_count)]
+            start_barrier.wait()
+            rng = random.Random(thread_count)
+            while not all(future.done() for future in futures):
+                resource_name = rng.choice(image_names)
+                if not isinstance(
+                    cache.getResource(resource_name, track=False), QtGui.QPixmap
+                ):
+                    errors.append(f"GUI lookup of {resource_name} isn't a pixmap")
+                app.processEvents()
+            wait(futures)
+            for future in futures:
+                future.result()
+        app.processEvents()
+
+        resources = list(cache._cache.values())
+        if cache.cacheBytes() != sum(r["bytes"] for r in resources):
+            errors.append("Resident bytes don't match the cached resources")
+        if any(r["users"] != 0 for r in resources):
+            errors.append("Unbalanced user counts after all resources were released")
+        if cache.cacheBytes() > cache.maxBytes():
+            errors.append("Cache exceeds its budget without pinned resources")
+        if cache.releaseQueueSize():
+            errors.append("Resources removed off the GUI thread weren't released")
+        cache.clearResources(force=True)
+    return errors
+
+
+def run_stress_test():
+    """Run the media and image cache stress tests as an automated check,
+    e.g. from CI via 'python -m vfxQt.benchmark --stress', which exits
+    with a non-zero code on failure. An AssertionError that lists the
+    detected inconsistencies is raised if a cache isn't sound.
+    """
+    errors = stress_media_cache() + stress_image_cache()
+    if errors:
+        raise AssertionError("\n".join(errors))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Compare media cache eviction policy hit rates on scroll traces."
+    )
+    parser.add_argument(
+        "traces", nargs="*", help="Recorded trace files, synthetic if none are given."
+    )
+    parser.add_argument(
+        "--resource-bytes", type=int, default=256 * 256 * 4, help="Cost per resource."
+    )
+    parser.add_argument(
+        "--budgets",
+        type=int,
+        nargs="+",
+        default=[100, 500, 2000],
+        help="Byte budgets measured in resource counts.",
+    )
+    parser.add_argument(
+        "--stress",
+        action="store_true",
+        help="Run the multi threaded cache stress test instead.",
+    )
+    args = parser.parse_args(argv)
+
+    if args.stress:
+        try:
+            run_stress_test()
+        except AssertionError as exc:
+            print(exc)
+            print("Stress test failed.")
+            return 1
+        print("Stress test passed.")
+        return 0
+
+    traces = {os.path.basename(p): load_trace(p) for p in args.traces}
+    if not traces:
+        traces["synthetic"] = generate_scroll_trace()
+
+    for trace_name, trace in traces.items():
+        print(f"{trace_name} ({len(trace)} requests)")
+        for budget in args.budgets:
+            max_bytes = budget * args.resource_bytes
+            hit_rates = []
+            for policy_name in EVICTION_POLICIES:
+                hit_rate = simulate_hit_rate(
+                    trace, policy_name, max_bytes, args.resource_bytes
+                )
+                hit_rates.append(f"{policy_name} {hit_rate:6.2%}")
+            print(f"    {budget:>6} resources | " + " | ".join(hit_rates))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,13 +6,14 @@ import qtawesome as QtAwesome
 from Qt import QtCore, QtGui, QtWidgets
 from Qt.QtCore import Qt
 
-from vfxQt.media import getImageCache
+from vfxQt.media import getIconCache, getImageCache, getMemoryPressureMonitor
 from vfxQt.style import get_palette
 from vfxQt.views import (
     ComboBoxItemDelegate,
     ComboBoxItemDelegateSourceMode,
     HtmlItemDelegate,
     ImageItemDelegate,
+    ItemViewPrefetcher,
     RowTableView,
     TagItemIconRole,
 )
@@ -148,13 +149,10 @@ class ExampleTagList(QtWidgets.QMainWindow):
         layout.setAlignment(Qt.AlignTop)
         center_widget.setLayout(layout)
 
-        import random
-
-        import qtawesome as qta
-
-        icon_checked = qta.icon("fa5s.times-circle", color="white")
-        icon_unchecked = qta.icon("fa5s.plus-circle", color="grey")
-        icon = qta.icon("fa5s.user-circle", color="grey")
+        icon_cache = getIconCache()
+        icon_checked = icon_cache.getIcon("fa5s.times-circle", color="white")
+        icon_unchecked = icon_cache.getIcon("fa5s.plus-circle", color="grey")
+        icon = icon_cache.getIcon("fa5s.user-circle", color="grey")
 
         tag_list_widget = TagListWidget(parent=self)
         tag_item_model = tag_list_widget.getModel()
@@ -288,6 +286,10 @@ class ExampleHtmlItemDelegate(QtWidgets.QMainWindow):
         html_item_delegate = HtmlItemDelegate(list_view)
         html_item_delegate.setItemValueRole(Qt.UserRole)
         list_view.setItemDelegate(html_item_delegate)
+        # html_item_delegate.setAsyncRendering(True)
+        # self.list_view_prefetcher = ItemViewPrefetcher(
+        #     list_view, html_item_delegate, role=Qt.UserRole
+        # )
 
         html = """
         <html>
@@ -338,6 +340,8 @@ class ExampleImageItemDelegate(QtWidgets.QMainWindow):
         )
         image_cache = getImageCache()
         image_cache.addSearchPath(media_dir_path)
+        image_cache.setDecodeAtTargetSize(True)
+        # image_cache.setMipmapping(True)
 
         # Image Delegate
         list_view = QtWidgets.QListView(self)
@@ -347,11 +351,18 @@ class ExampleImageItemDelegate(QtWidgets.QMainWindow):
 
         image_item_delegate = ImageItemDelegate(list_view)
         image_item_delegate.setImageCache(image_cache)
+        image_item_delegate.setAsyncLoading(True)
         image_item_delegate.repaintNeeded.connect(self.queueUpdate)
+        memory_pressure_monitor = getMemoryPressureMonitor()
+        memory_pressure_monitor.pressureChanged.connect(
+            image_item_delegate.onMemoryPressureChanged
+        )
+        memory_pressure_monitor.start()
         list_view.setItemDelegate(image_item_delegate)
 
         image_resource_name = "loading_dual_ring.svg"
         # image_resource_name = "loading_gear_0.png"
+        # image_resource_name = "loading_gear_#.png"
 
         model = QtGui.QStandardItemModel()
         list_view.setModel(model)
@@ -365,6 +376,7 @@ class ExampleImageItemDelegate(QtWidgets.QMainWindow):
 
         self.list_model = model
         self.list_view = list_view
+        self.list_view_prefetcher = ItemViewPrefetcher(list_view, image_item_delegate)
 
         # Show
         self.resize(800, 400)
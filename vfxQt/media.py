@@ -1,15 +1,432 @@
+import argparse
+import atexit
+import hashlib
+import heapq
+import itertools
+import json
+import logging
+import math
 import os
-from typing import Any
+import re
+import struct
+import sys
+import tempfile
+import threading
+import time
+import weakref
+import zlib
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import contextmanager
+from enum import IntEnum
+from multiprocessing import resource_tracker, shared_memory
+from typing import Any, Iterator
 
-from Qt import QtGui, QtSvg
+from Qt import QtCore, QtGui, QtSvg
 
 from vfxQt.style import get_frames_per_second
+from vfxQt.utils import enum_to_int, is_gui_thread
 
+try:
+    import qtawesome
+except ImportError:
+    qtawesome = None
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+LOG = logging.getLogger(__name__)
+
+
+class MediaCacheEvictionPolicy:
+    """The eviction policy interface. A policy only tracks resource
+    keys, the cache itself decides (based on the byte budget and the
+    pinned state) which of the proposed victims are actually removed.
+    """
+
+    def recordInsert(self, key) -> None:
+        """Record that a resource was added to the cache.
+        Args:
+            key (Any): The resource key.
+        """
+        raise NotImplementedError
+
+    def recordAccess(self, key) -> None:
+        """Record a cache hit.
+        Args:
+            key (Any): The resource key.
+        """
+        raise NotImplementedError
+
+    def recordRemove(self, key, evicted=False) -> None:
+        """Record that a resource was removed from the cache.
+        Args:
+            key (Any): The resource key.
+            evicted (bool): If True, the removal was caused by the budget.
+        """
+        raise NotImplementedError
+
+    def victims(self) -> Iterator[Any]:
+        """Iterate the resident keys in eviction order.
+        Returns:
+            Iterator[Any]: The keys, the first one being the best candidate.
+        """
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        """Reset the policy state."""
+        raise NotImplementedError
+
+
+class LRUEvictionPolicy(MediaCacheEvictionPolicy):
+    """Evict the least recently used resource first."""
+
+    def __init__(self) -> None:
+        self._keys = OrderedDict()
+
+    def recordInsert(self, key) -> None:
+        self._keys[key] = None
+        self._keys.move_to_end(key)
+
+    def recordAccess(self, key) -> None:
+        if key in self._keys:
+            self._keys.move_to_end(key)
+
+    def recordRemove(self, key, evicted=False) -> None:
+        self._keys.pop(key, None)
+
+    def victims(self) -> Iterator[Any]:
+        return iter(list(self._keys))
+
+    def clear(self) -> None:
+        self._keys.clear()
+
+
+class LFUEvictionPolicy(MediaCacheEvictionPolicy):
+    """Evict the least frequently used resource first. Ties are
+    resolved by evicting the least recently used resource.
+    """
+
+    def __init__(self) -> None:
+        self._frequencies = {}
+        self._buckets = {}
+
+    def _bucketAdd(self, key, frequency):
+        self._frequencies[key] = frequency
+        self._buckets.setdefault(frequency, OrderedDict())[key] = None
+
+    def _bucketRemove(self, key):
+        frequency = self._frequencies.pop(key)
+        bucket = self._buckets[frequency]
+        bucket.pop(key)
+        if not bucket:
+            self._buckets.pop(frequency)
+        return frequency
+
+    def recordInsert(self, key) -> None:
+        if key in self._frequencies:
+            self._bucketRemove(key)
+        self._bucketAdd(key, 1)
+
+    def recordAccess(self, key) -> None:
+        if key in self._frequencies:
+            self._bucketAdd(key, self._bucketRemove(key) + 1)
+
+    def recordRemove(self, key, evicted=False) -> None:
+        if key in self._frequencies:
+            self._bucketRemove(key)
+
+    def victims(self) -> Iterator[Any]:
+        keys = []
+        for frequency in sorted(self._buckets):
+            keys.extend(self._buckets[frequency])
+        return iter(keys)
+
+    def clear(self) -> None:
+        self._frequencies.clear()
+        self._buckets.clear()
+
+
+class ARCEvictionPolicy(MediaCacheEvictionPolicy):
+    """Adaptive replacement cache policy. Resources seen once (T1) and
+    resources seen multiple times (T2) are kept in separate lists,
+    the ghost lists (B1/B2) of recently evicted keys adapt the target
+    size of T1. As the cache is byte budgeted, the capacity is
+    measured as the current resident resource count.
+    """
+
+    def __init__(self) -> None:
+        self._t1 = OrderedDict()
+        self._t2 = OrderedDict()
+        self._b1 = OrderedDict()
+        self._b2 = OrderedDict()
+        self._target = 0.0
+
+    def _capacity(self):
+        return max(1, len(self._t1) + len(self._t2))
+
+    def _trimGhosts(self):
+        capacity = self._capacity()
+        for ghosts in (self._b1, self._b2):
+            while len(ghosts) > capacity:
+                ghosts.popitem(last=False)
+
+    def recordInsert(self, key) -> None:
+        capacity = self._capacity()
+        if key in self._b1:
+            delta = max(len(self._b2) / max(1, len(self._b1)), 1)
+            self._target = min(capacity, self._target + delta)
+            self._b1.pop(key)
+            self._t2[key] = None
+        elif key in self._b2:
+            delta = max(len(self._b1) / max(1, len(self._b2)), 1)
+            self._target = max(0.0, self._target - delta)
+            self._b2.pop(key)
+            self._t2[key] = None
+        elif key not in self._t1 and key not in self._t2:
+            self._t1[key] = None
+        self._trimGhosts()
+
+    def recordAccess(self, key) -> None:
+        if key in self._t1:
+            self._t1.pop(key)
+            self._t2[key] = None
+        elif key in self._t2:
+            self._t2.move_to_end(key)
+
+    def recordRemove(self, key, evicted=False) -> None:
+        if key in self._t1:
+            self._t1.pop(key)
+            if evicted:
+                self._b1[key] = None
+        elif key in self._t2:
+            self._t2.pop(key)
+            if evicted:
+                self._b2[key] = None
+        self._trimGhosts()
+
+    def victims(self) -> Iterator[Any]:
+        if len(self._t1) > self._target:
+            return iter(list(self._t1) + list(self._t2))
+        return iter(list(self._t2) + list(self._t1))
+
+    def clear(self) -> None:
+        self._t1.clear()
+        self._t2.clear()
+        self._b1.clear()
+        self._b2.clear()
+        self._target = 0.0
+
+
+class LatencyHistogram:
+    """A log-scale latency histogram. Values are sorted into buckets
+    that grow by a factor of 2^(1/4), so percentiles are accurate to
+    about 19% regardless of the magnitude of the recorded values.
+    """
+
+    bucket_base = 2**0.25
+    bucket_min_value = 1e-6
 
-class MediaCache:
     def __init__(self) -> None:
+        self._buckets = {}
+        self._count = 0
+        self._total = 0.0
+
+    def record(self, value: float):
+        """Record a value.
+        Args:
+            value (float): The value in seconds.
+        """
+        if value <= self.bucket_min_value:
+            bucket_idx = 0
+        else:
+            bucket_idx = math.ceil(
+                math.log(value / self.bucket_min_value, self.bucket_base)
+            )
+        self._buckets[bucket_idx] = self._buckets.get(bucket_idx, 0) + 1
+        self._count += 1
+        self._total += value
+
+    def count(self) -> int:
+        """Get the recorded value count.
+        Returns:
+            int: The count.
+        """
+        return self._count
+
+    def percentile(self, value: float) -> float:
+        """Get the (bucket upper bound) percentile.
+        Args:
+            value (float): The percentile in the [0, 1] range.
+        Returns:
+            float: The percentile in seconds.
+        """
+        if not self._count:
+            return 0.0
+        target_count = value * self._count
+        count = 0
+        for bucket_idx in sorted(self._buckets):
+            count += self._buckets[bucket_idx]
+            if count >= target_count:
+                break
+        return self.bucket_min_value * self.bucket_base**bucket_idx
+
+    def merge(self, histogram):
+        """Add the values of another histogram.
+        Args:
+            histogram (LatencyHistogram): The histogram.
+        """
+        for bucket_idx, count in list(histogram._buckets.items()):
+            self._buckets[bucket_idx] = self._buckets.get(bucket_idx, 0) + count
+        self._count += histogram._count
+        self._total += histogram._total
+
+    def summary(self) -> dict:
+        """Get the histogram summary.
+        Returns:
+            dict: The count, mean and p50/p95/p99 percentiles (in seconds).
+        """
+        return {
+            "count": self._count,
+            "mean": self._total / self._count if self._count else 0.0,
+            "p50": self.percentile(0.5),
+            "p95": self.percentile(0.95),
+            "p99": self.percentile(0.99),
+        }
+
+
+class MediaResourceHandle:
+    """A tracked use of a cached resource. The resource stays pinned
+    in the cache until the handle is released, either explicitly,
+    by leaving its context or once the handle is garbage collected.
+    """
+
+    def __init__(self, cache, resource_key, resource_object, clear=False) -> None:
+        self._resource_key = resource_key
+        self._resource_object = resource_object
+        # The finalizer must not reference the handle itself.
+        self._finalizer = weakref.finalize(
+            self, _release_resource, cache, resource_key, clear
+        )
+
+    def resourceKey(self) -> Any:
+        """Get the key of the pinned resource.
+        Returns:
+            Any: The resource key.
+        """
+        return self._resource_key
+
+    def resource(self) -> Any:
+        """Get the resource object.
+        Returns:
+            Any: The resource object.
+        """
+        return self._resource_object
+
+    def isReleased(self) -> bool:
+        """Get the released state.
+        Returns:
+            bool: The state.
+        """
+        return not self._finalizer.alive
+
+    def release(self, clear=None):
+        """Release the resource, releasing it again is a no-op.
+        Args:
+            clear (bool): Override the clear state of the handle, None
+                          keeps the state the handle was created with.
+        """
+        if clear is None:
+            self._finalizer()
+            return
+        finalizer_info = self._finalizer.detach()
+        if finalizer_info is not None:
+            _, release_func, (cache, resource_key, _), _ = finalizer_info
+            release_func(cache, resource_key, clear)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.release()
+
+
+class MediaDemoteRunnable(QtCore.QRunnable):
+    """Compress an evicted resource into the cold tier on a worker thread."""
+
+    def __init__(self, cache, resource_key, *compress_args) -> None:
+        super().__init__()
+        self._cache = cache
+        self._resource_key = resource_key
+        self._compress_args = compress_args
+
+    def run(self):
+        data = self._cache.compressResource(*self._compress_args)
+        self._cache.storeColdResource(self._resource_key, data)
+
+
+def _release_resource(cache, resource_key, clear):
+    try:
+        cache.releaseResource(resource_key, clear=clear)
+    except Exception:
+        # The resource was already removed (e.g. by a forced clear).
+        pass
+
+
+class MediaCache(QtCore.QObject):
+    """The media cache base class.
+
+    The cache can be shared between threads. Cache hits don't take a
+    lock, they only read the cache dict and record the access in a
+    buffer that is replayed to the eviction policy under the lock.
+    All structural changes (inserts, removals, evictions, search path
+    edits) and user count updates are guarded by the cache lock.
+
+    Statistics are collected per resource type (the file extension).
+    Their counters are updated without locking, so they can be off
+    by a few counts under heavy multi threaded contention.
+
+    With a cold tier budget, evicted resources are compressed into
+    a second in-memory tier instead of being dropped. A lookup that
+    misses the (hot) cache promotes them back, which is a lot cheaper
+    than reading and decoding the resource file again.
+
+    With content deduplication enabled, resource names are mapped to
+    the digest of their file content. Names with identical content
+    share the cache entry (and its user count) of the first name
+    that was requested with that content, the canonical name.
+    """
+
+    resourceReady = QtCore.Signal(str, name="resourceReady")
+
+    def __init__(self, parent=None) -> None:
+        super().__init__(parent)
+        self._lock = threading.RLock()
+        self._access_buffer = deque()
+        self._access_buffer_max_count = 4096
         self._cache = {}
+        self._cache_bytes = 0
+        self._max_bytes = 0
+        self._eviction_policy = LRUEvictionPolicy()
+        self._cold_cache = OrderedDict()
+        self._cold_cache_bytes = 0
+        self._cold_max_bytes = 0
         self._search_dir_paths = []
+        self._search_dir_listings = {}
+        self._search_index = {}
+        self._missing_resources = {}
+        self._missing_resource_ttl = 10.0
+        self._stats = {}
+        self._stats_log_timer = None
+        self._content_dedup = False
+        self._content_digests = {}
+        self._content_names = {}
+        self._content_aliases = {}
+        self._content_alias_names = {}
+        self._content_file_keys = {}
+        self._file_system_watcher = None
 
     def addSearchPath(self, dir_path: str) -> None:
         """Add a search path directory.
@@ -18,75 +435,3609 @@ class MediaCache:
         Args:
             dir_path (str): The directory to add.
         """
-        if dir_path not in self._search_dir_paths:
-            self._search_dir_paths.append(dir_path)
+        # Search path lists are replaced instead of mutated,
+        # so lock-free readers always iterate a consistent list.
+        with self._lock:
+            if dir_path not in self._search_dir_paths:
+                self._search_dir_listings[dir_path] = self.listSearchPath(dir_path)
+                self.watchSearchPath(dir_path)
+            search_dir_paths = [p for p in self._search_dir_paths if p != dir_path]
+            self._search_dir_paths = search_dir_paths + [dir_path]
+            self.rebuildSearchIndex()
+            self.clearMissingResources()
+
+    def removeSearchPath(self, dir_path) -> bool:
+        """Remove a search path directory.
+        Args:
+            dir_path (str): The directory to add.
+        Returns:
+            bool: True if the directory was in the search path else False
+        """
+        with self._lock:
+            if dir_path in self._search_dir_paths:
+                self._search_dir_paths = [
+                    p for p in self._search_dir_paths if p != dir_path
+                ]
+                self._search_dir_listings.pop(dir_path, None)
+                file_system_watcher = self._file_system_watcher
+                if (
+                    file_system_watcher is not None
+                    and dir_path in file_system_watcher.directories()
+                ):
+                    file_system_watcher.removePath(dir_path)
+                self.rebuildSearchIndex()
+                self.clearMissingResources()
+                return True
+        return False
+
+    def fileSystemWatcher(self) -> QtCore.QFileSystemWatcher:
+        """Get the search path watcher. The watcher is created on first
+        use on the GUI thread, it then watches and re-lists all search
+        paths, as they may have changed while unwatched. Caches
+        that are (only) used on other threads don't get a watcher, as
+        its socket notifiers would be bound to the calling thread.
+        Returns:
+            QtCore.QFileSystemWatcher: The watcher or None if the
+                                       calling thread can't own it.
+        """
+        if self._file_system_watcher is not None:
+            return self._file_system_watcher
+        app = QtCore.QCoreApplication.instance()
+        if (
+            app is None
+            or QtCore.QThread.currentThread() != app.thread()
+            or self.thread() != app.thread()
+        ):
+            return None
+        with self._lock:
+            if self._file_system_watcher is None:
+                file_system_watcher = QtCore.QFileSystemWatcher(self)
+                file_system_watcher.directoryChanged.connect(self.onSearchPathChanged)
+                self._file_system_watcher = file_system_watcher
+                search_index_changed = False
+                for dir_path in self._search_dir_paths:
+                    self.watchSearchPath(dir_path)
+                    file_names = self.listSearchPath(dir_path)
+                    if file_names != self._search_dir_listings.get(dir_path):
+                        self._search_dir_listings[dir_path] = file_names
+                        search_index_changed = True
+                if search_index_changed:
+                    self.rebuildSearchIndex()
+                    self.clearMissingResources()
+        return self._file_system_watcher
+
+    def watchSearchPath(self, dir_path):
+        """Watch a search path directory for changes. Directories that
+        don't exist (yet) are watched through their nearest existing
+        parent, so they are picked up once they are created.
+        Args:
+            dir_path (str): The directory.
+        """
+        file_system_watcher = self.fileSystemWatcher()
+        if file_system_watcher is None:
+            return
+        watch_path = dir_path
+        if not os.path.isdir(watch_path):
+            watch_path = os.path.dirname(os.path.abspath(dir_path))
+            while not os.path.isdir(watch_path):
+                parent_path = os.path.dirname(watch_path)
+                if parent_path == watch_path:
+                    return
+                watch_path = parent_path
+        if watch_path not in file_system_watcher.directories():
+            file_system_watcher.addPath(watch_path)
+
+    def listSearchPath(self, dir_path) -> set[str]:
+        """List the file names of a search path directory.
+        Args:
+            dir_path (str): The directory.
+        Returns:
+            set[str]: The file names.
+        """
+        try:
+            with os.scandir(dir_path) as entries:
+                return {entry.name for entry in entries if entry.is_file()}
+        except OSError:
+            return set()
+
+    def rebuildSearchIndex(self, changed_file_names=()):
+        """Rebuild the resource name to file path index
+        from the (already listed) search path directories.
+        The content aliases of names that now resolve to another
+        file (or whose file may have been replaced) are dropped.
+        Args:
+            changed_file_names (Iterable[str]): The names of files that may
+                                                have been replaced in place.
+        """
+        with self._lock:
+            previous_search_index = self._search_index
+            search_index = {}
+            for search_dir_path in self._search_dir_paths:
+                for file_name in self._search_dir_listings.get(search_dir_path, ()):
+                    search_index[file_name] = os.path.join(search_dir_path, file_name)
+            self._search_index = search_index
+            if self._content_aliases:
+                changed_file_names = set(changed_file_names)
+                changed_resource_names = []
+                for resource_name in list(self._content_aliases):
+                    resource_file_path = search_index.get(resource_name, None)
+                    if resource_file_path is None:
+                        # Relative paths aren't indexed, they may resolve elsewhere.
+                        resource_file_path = self.resolveResourcePath(resource_name)
+                    elif resource_name not in changed_file_names and (
+                        resource_file_path
+                        == previous_search_index.get(resource_name, None)
+                    ):
+                        continue
+                    content_file_key = None
+                    if resource_file_path:
+                        content_file_key = self.contentFileKey(resource_file_path)
+                    if content_file_key != self._content_file_keys.get(resource_name):
+                        changed_resource_names.append(resource_name)
+                self.dropContentAliases(changed_resource_names)
+
+    def onSearchPathChanged(self, changed_dir_path: str):
+        """The file system watcher callback, this re-lists
+        the changed directory and updates the search index.
+        Changes of a watched parent directory re-list the
+        search paths below it that got created in the meantime.
+        Args:
+            changed_dir_path (str): The changed directory.
+        """
+        with self._lock:
+            search_index_changed = False
+            changed_file_names = set()
+            watched_dir_paths = self.fileSystemWatcher().directories()
+            for dir_path in self._search_dir_paths:
+                is_watched = dir_path in watched_dir_paths
+                if dir_path == changed_dir_path or (
+                    not is_watched and os.path.isdir(dir_path)
+                ):
+                    file_names = self.listSearchPath(dir_path)
+                    # Files may have been replaced by renaming others over them.
+                    changed_file_names.update(
+                        self._search_dir_listings.get(dir_path, ()), file_names
+                    )
+                    self._search_dir_listings[dir_path] = file_names
+                    search_index_changed = True
+                # Directories that get deleted and re-created drop out of the watcher.
+                if not is_watched or not os.path.isdir(dir_path):
+                    self.watchSearchPath(dir_path)
+            if not search_index_changed:
+                return
+            self.rebuildSearchIndex(changed_file_names)
+            self.clearMissingResources()
+
+    def missingResourceTimeToLive(self) -> float:
+        """Get the time a failed lookup is remembered.
+        Returns:
+            float: The time in seconds.
+        """
+        return self._missing_resource_ttl
+
+    def setMissingResourceTimeToLive(self, value: float):
+        """Set the time a failed lookup is remembered.
+        Args:
+            value (float): The time in seconds, 0 disables the negative cache.
+        """
+        self._missing_resource_ttl = max(0.0, value)
+        if not self._missing_resource_ttl:
+            self.clearMissingResources()
+
+    def isResourceMissing(self, resource_name) -> bool:
+        """Check if the resource is known to be missing.
+        Args:
+            resource_name (str): The resource name.
+        Returns:
+            bool: The missing state.
+        """
+        expiry_time = self._missing_resources.get(resource_name, None)
+        if expiry_time is None:
+            return False
+        if expiry_time < time.monotonic():
+            self._missing_resources.pop(resource_name, None)
+            return False
+        resource_stats = self.resourceStats(resource_name)
+        resource_stats["negative_hits"] += 1
+        if os.path.basename(resource_name) != resource_name:
+            resource_stats["saved_stat_calls"] += len(self._search_dir_paths)
+        return True
+
+    def clearMissingResources(self):
+        """Forget all failed lookups."""
+        self._missing_resources.clear()
+
+    def negativeCacheHits(self) -> int:
+        """Get the lookup count answered by the negative cache.
+        Returns:
+            int: The count.
+        """
+        return self.stats()["negative_hits"]
+
+    def savedStatCalls(self) -> int:
+        """Get the file system probe count the negative cache saved.
+        Plain resource names are resolved by the search index and
+        therefore don't count, only relative file paths do.
+        Returns:
+            int: The count.
+        """
+        return self.stats()["saved_stat_calls"]
+
+    def contentDeduplication(self) -> bool:
+        """Get the content deduplication state.
+        Returns:
+            bool: The state.
+        """
+        return self._content_dedup
+
+    def setContentDeduplication(self, state: bool):
+        """Set the content deduplication state. If enabled, a resource
+        file is hashed the first time its name is requested, names
+        with identical content then share a single cached object.
+        Args:
+            state (bool): The state.
+        """
+        self._content_dedup = state
+
+    def contentFileKey(self, resource_file_path) -> tuple:
+        """Get the key that identifies the content of a file without
+        reading it, its real path, modification time and size.
+        Args:
+            resource_file_path (str): The file path.
+        Returns:
+            tuple: The key or None if the file doesn't exist.
+        """
+        try:
+            stat = os.stat(resource_file_path)
+        except OSError:
+            return None
+        return (
+            os.path.realpath(resource_file_path),
+            stat.st_mtime_ns,
+            stat.st_size,
+        )
+
+    def contentDigest(self, resource_file_path) -> str:
+        """Get the digest of a file's content. Digests are remembered
+        per file path, modification time and size.
+        This is safe to call from worker threads.
+        Args:
+            resource_file_path (str): The file path.
+        Returns:
+            str: The digest or None if the file can't be read.
+        """
+        digest_key = self.contentFileKey(resource_file_path)
+        if digest_key is None:
+            return None
+        digest = self._content_digests.get(digest_key, None)
+        if digest is not None:
+            return digest
+        content_hash = hashlib.sha1()
+        try:
+            with open(resource_file_path, "rb") as resource_file:
+                for chunk in iter(lambda: resource_file.read(1024**2), b""):
+                    content_hash.update(chunk)
+        except OSError:
+            return None
+        digest = content_hash.hexdigest()
+        with self._lock:
+            self._content_digests[digest_key] = digest
+        return digest
+
+    def registerContentAlias(
+        self, resource_name, digest, resource_file_path=None
+    ) -> str:
+        """Map a resource name to its content.
+        Args:
+            resource_name (str): The resource name.
+            digest (str): The content digest.
+            resource_file_path (str): The hashed file, the mapping is dropped
+                                      once the name resolves to another file
+                                      or the file changes.
+        Returns:
+            str: The canonical name of the content.
+        """
+        content_file_key = None
+        if resource_file_path:
+            content_file_key = self.contentFileKey(resource_file_path)
+        with self._lock:
+            canonical_name = self._content_names.setdefault(digest, resource_name)
+            self._content_file_keys[resource_name] = content_file_key
+            self._content_aliases[resource_name] = canonical_name
+            self._content_alias_names.setdefault(canonical_name, set()).add(
+                resource_name
+            )
+        return canonical_name
+
+    def canonicalResourceName(
+        self, resource_name, resolve=True, resource_file_path=None
+    ) -> str:
+        """Get the name the resource content is cached under.
+        Args:
+            resource_name (str): The resource name.
+            resolve (bool): Hash the resource file if the content of the
+                            name isn't known yet, else the name is
+                            returned as is.
+            resource_file_path (str): The already resolved file path
+                                      ("" if it doesn't exist), it is
+                                      looked up if None.
+        Returns:
+            str: The canonical name, the resource name itself
+                 if content deduplication is disabled.
+        """
+        if not self._content_dedup:
+            return resource_name
+        canonical_name = self._content_aliases.get(resource_name, None)
+        if canonical_name is not None:
+            return canonical_name
+        if not resolve:
+            return resource_name
+        if resource_file_path is None:
+            resource_file_path = self.lookupResourcePath(resource_name)
+        if not resource_file_path:
+            return resource_name
+        digest = self.contentDigest(resource_file_path)
+        if digest is None:
+            return resource_name
+        return self.registerContentAlias(resource_name, digest, resource_file_path)
+
+    def resolveCanonicalResource(self, resource_name, resource_file_path=None) -> tuple:
+        """Get the canonical name of the resource. If the file path had
+        to be resolved for it, the path is returned as well, so callers
+        that read the file don't resolve it a second time.
+        Args:
+            resource_name (str): The resource name.
+            resource_file_path (str): The already resolved file path, if any.
+        Returns:
+            tuple[str, str]: The canonical name and the file path ("" if
+                             the resource doesn't exist, None if the
+                             path wasn't resolved).
+        """
+        if (
+            resource_file_path is None
+            and self._content_dedup
+            and resource_name not in self._content_aliases
+        ):
+            resource_file_path = self.lookupResourcePath(resource_name) or ""
+        canonical_name = self.canonicalResourceName(
+            resource_name, resource_file_path=resource_file_path
+        )
+        return canonical_name, resource_file_path
+
+    def contentAliases(self, resource_name) -> set[str]:
+        """Get all requested names that share the resource content.
+        Args:
+            resource_name (str): The resource name.
+        Returns:
+            set[str]: The names, including the resource name.
+        """
+        canonical_name = self._content_aliases.get(resource_name, resource_name)
+        alias_names = set(self._content_alias_names.get(canonical_name, ()))
+        alias_names.add(resource_name)
+        return alias_names
+
+    def isContentCached(self, digest, resource_key=None) -> bool:
+        """Check if content is cached (under its canonical name).
+        Args:
+            digest (str): The content digest.
+            resource_key (str | tuple): The requested key, variant
+                                        keys check the same variant
+                                        of the canonical name.
+        Returns:
+            bool: The cached state.
+        """
+        canonical_name = self._content_names.get(digest, None)
+        if canonical_name is None:
+            return False
+        if isinstance(resource_key, tuple):
+            return (canonical_name,) + resource_key[1:] in self._cache
+        return canonical_name in self._cache
+
+    def dropContentAliases(self, resource_names):
+        """Forget the content of names, they are hashed again on their next
+        lookup. If a name is the canonical name of its content, the other
+        names of the content are forgotten as well and the (unpinned)
+        resources cached under the canonical name (in both tiers) are
+        removed, as they hold the previous content. Pinned resources stay cached until
+        they are released, so handles can still release them.
+        Args:
+            resource_names (Iterable[str]): The resource names.
+        """
+        with self._lock:
+            dropped_canonical_names = set()
+            for resource_name in resource_names:
+                self._content_file_keys.pop(resource_name, None)
+                canonical_name = self._content_aliases.pop(resource_name, None)
+                if canonical_name is None:
+                    continue
+                if canonical_name != resource_name:
+                    alias_names = self._content_alias_names.get(canonical_name, None)
+                    if alias_names is not None:
+                        alias_names.discard(resource_name)
+                    continue
+                for alias_name in self._content_alias_names.pop(canonical_name, ()):
+                    self._content_aliases.pop(alias_name, None)
+                dropped_canonical_names.add(canonical_name)
+            if not dropped_canonical_names:
+                return
+            self._content_names = {
+                digest: name
+                for digest, name in self._content_names.items()
+                if name not in dropped_canonical_names
+            }
+            for resource_key, resource in list(self._cache.items()):
+                resource_name = resource_key
+                if isinstance(resource_key, tuple):
+                    resource_name = resource_key[0]
+                if resource_name in dropped_canonical_names and not resource["users"]:
+                    self.removeResource(resource_key)
+            for resource_key in list(self._cold_cache):
+                resource_name = resource_key
+                if isinstance(resource_key, tuple):
+                    resource_name = resource_key[0]
+                if resource_name in dropped_canonical_names:
+                    self._cold_cache_bytes -= len(self._cold_cache.pop(resource_key))
+
+    def clearContentIndex(self):
+        """Forget all content digests and name mappings. This should only
+        be called without tracked users of aliased resources, as their
+        releases could otherwise not be mapped to the shared entry.
+        """
+        with self._lock:
+            self._content_digests.clear()
+            self._content_names.clear()
+            self._content_aliases.clear()
+            self._content_alias_names.clear()
+            self._content_file_keys.clear()
+
+    def resourceType(self, resource_key) -> str:
+        """Get the resource type used to group statistics.
+        Args:
+            resource_key (Any): The resource key.
+        Returns:
+            str: The resource type (the file extension).
+        """
+        if isinstance(resource_key, tuple):
+            resource_key = resource_key[0]
+        return os.path.splitext(resource_key)[1]
+
+    def resourceStats(self, resource_key) -> dict:
+        """Get the (mutable) statistics of a resource type.
+        Args:
+            resource_key (Any): The resource key.
+        Returns:
+            dict: The statistics.
+        """
+        resource_type = self.resourceType(resource_key)
+        resource_stats = self._stats.get(resource_type, None)
+        if resource_stats is None:
+            resource_stats = self._stats.setdefault(
+                resource_type,
+                {
+                    "hits": 0,
+                    "misses": 0,
+                    "negative_hits": 0,
+                    "saved_stat_calls": 0,
+                    "evictions": 0,
+                    "cold_hits": 0,
+                    "decode_time": LatencyHistogram(),
+                    "resolve_time": LatencyHistogram(),
+                    "promote_time": LatencyHistogram(),
+                },
+            )
+        return resource_stats
+
+    def recordMiss(self, resource_key):
+        """Record a cache miss.
+        Args:
+            resource_key (Any): The resource key.
+        """
+        self.resourceStats(resource_key)["misses"] += 1
+
+    def recordDecodeTime(self, resource_key, value: float):
+        """Record the time it took to decode a resource.
+        Args:
+            resource_key (Any): The resource key.
+            value (float): The time in seconds.
+        """
+        self.resourceStats(resource_key)["decode_time"].record(value)
+
+    def stats(self) -> dict:
+        """Get the cache statistics. The cache totals are
+        available at the top level, the statistics per
+        resource type in the 'types' dict.
+        Returns:
+            dict: The statistics, latencies are in seconds.
+        """
+        counter_names = (
+            "hits",
+            "misses",
+            "negative_hits",
+            "saved_stat_calls",
+            "evictions",
+            "cold_hits",
+        )
+        histogram_names = ("decode_time", "resolve_time", "promote_time")
+
+        def create_stats():
+            stats = {name: 0 for name in counter_names}
+            stats.update({name: LatencyHistogram() for name in histogram_names})
+            stats["resident_count"] = 0
+            stats["resident_bytes"] = 0
+            stats["dedup_bytes_saved"] = 0
+            return stats
+
+        total_stats = create_stats()
+        type_stats = {}
+        for resource_type, resource_stats in list(self._stats.items()):
+            stats = type_stats.setdefault(resource_type, create_stats())
+            for name in counter_names:
+                stats[name] += resource_stats[name]
+                total_stats[name] += resource_stats[name]
+            for name in histogram_names:
+                stats[name].merge(resource_stats[name])
+                total_stats[name].merge(resource_stats[name])
+        for resource_key, resource in list(self._cache.items()):
+            resource_type = self.resourceType(resource_key)
+            stats = type_stats.setdefault(resource_type, create_stats())
+            # Every additional name would otherwise hold its own copy.
+            resource_name = (
+                resource_key[0] if isinstance(resource_key, tuple) else resource_key
+            )
+            alias_count = len(self._content_alias_names.get(resource_name, ()))
+            for target_stats in (stats, total_stats):
+                target_stats["resident_count"] += 1
+                target_stats["resident_bytes"] += resource["bytes"]
+                target_stats["dedup_bytes_saved"] += resource["bytes"] * max(
+                    0, alias_count - 1
+                )
+
+        for stats in [total_stats] + list(type_stats.values()):
+            lookup_count = stats["hits"] + stats["misses"]
+            stats["hit_rate"] = stats["hits"] / lookup_count if lookup_count else 0.0
+            for name in histogram_names:
+                stats[name] = stats[name].summary()
+        total_stats["max_bytes"] = self._max_bytes
+        total_stats["cold_count"] = len(self._cold_cache)
+        total_stats["cold_bytes"] = self._cold_cache_bytes
+        total_stats["cold_max_bytes"] = self._cold_max_bytes
+        total_stats["dedup_aliases"] = sum(
+            1 for name, canonical in self._content_aliases.items() if name != canonical
+        )
+        total_stats["types"] = type_stats
+        return total_stats
+
+    def resetStats(self):
+        """Reset the cache statistics."""
+        self._stats = {}
+
+    def statsLogInterval(self) -> float:
+        """Get the periodic statistics log interval.
+        Returns:
+            float: The interval in seconds, 0 if disabled.
+        """
+        if self._stats_log_timer is None or not self._stats_log_timer.isActive():
+            return 0.0
+        return self._stats_log_timer.interval() / 1000.0
+
+    def setStatsLogInterval(self, value: float):
+        """Set the periodic statistics log interval. The
+        statistics are logged to the 'vfxQt.media' logger.
+        Args:
+            value (float): The interval in seconds, 0 disables the log.
+        """
+        if self._stats_log_timer is None:
+            self._stats_log_timer = QtCore.QTimer(self)
+            self._stats_log_timer.timeout.connect(self.logStats)
+        if value > 0:
+            self._stats_log_timer.start(round(value * 1000))
+        else:
+            self._stats_log_timer.stop()
+
+    def logStats(self):
+        """Log the cache statistics."""
+        stats = self.stats()
+        lines = [
+            "{} | {:.1%} hit rate | {} resources | {:.1f}/{:.1f} MB"
+            " | {} cold resources | {:.1f}/{:.1f} MB"
+            " | {:.1f} MB deduplicated".format(
+                self.__class__.__name__,
+                stats["hit_rate"],
+                stats["resident_count"],
+                stats["resident_bytes"] / 1024**2,
+                stats["max_bytes"] / 1024**2,
+                stats["cold_count"],
+                stats["cold_bytes"] / 1024**2,
+                stats["cold_max_bytes"] / 1024**2,
+                stats["dedup_bytes_saved"] / 1024**2,
+            )
+        ]
+        for resource_type, type_stats in sorted(stats["types"].items()):
+            lines.append(
+                "    {} | hits {} | misses {} | negative hits {} | evictions {}"
+                " | cold hits {}"
+                " | decode p50/p95/p99 {:.1f}/{:.1f}/{:.1f} ms"
+                " | resolve p50/p95/p99 {:.2f}/{:.2f}/{:.2f} ms"
+                " | promote p50/p95/p99 {:.2f}/{:.2f}/{:.2f} ms".format(
+                    resource_type or "<none>",
+                    type_stats["hits"],
+                    type_stats["misses"],
+                    type_stats["negative_hits"],
+                    type_stats["evictions"],
+                    type_stats["cold_hits"],
+                    *[
+                        type_stats[name][percentile] * 1000
+                        for name in ("decode_time", "resolve_time", "promote_time")
+                        for percentile in ("p50", "p95", "p99")
+                    ],
+                )
+            )
+        LOG.info("\n".join(lines))
+
+    def maxBytes(self) -> int:
+        """Get the cache byte budget.
+        Returns:
+            int: The budget, 0 means unlimited.
+        """
+        return self._max_bytes
+
+    def setMaxBytes(self, value: int):
+        """Set the cache byte budget. Resources without tracked
+        users are evicted until the cache fits the budget.
+        Args:
+            value (int): The budget, 0 means unlimited.
+        """
+        self._max_bytes = max(0, int(value))
+        self.evictResources()
+
+    def cacheBytes(self) -> int:
+        """Get the (approximate) resident bytes of the cache.
+        Returns:
+            int: The byte count.
+        """
+        return self._cache_bytes
+
+    def coldMaxBytes(self) -> int:
+        """Get the cold tier byte budget.
+        Returns:
+            int: The budget, 0 means the cold tier is disabled.
+        """
+        return self._cold_max_bytes
+
+    def setColdMaxBytes(self, value: int):
+        """Set the cold tier byte budget. Evicted resources are
+        compressed into the cold tier, the least recently
+        demoted ones are dropped once it exceeds the budget.
+        Args:
+            value (int): The budget, 0 disables the cold tier.
+        """
+        with self._lock:
+            self._cold_max_bytes = max(0, int(value))
+            self.trimColdResources()
+
+    def coldCacheBytes(self) -> int:
+        """Get the compressed bytes of the cold tier.
+        Returns:
+            int: The byte count.
+        """
+        return self._cold_cache_bytes
+
+    def compressResource(self, resource_object) -> bytes:
+        """Compress a resource object for the cold tier.
+        Args:
+            resource_object (Any): The resource object.
+        Returns:
+            bytes: The compressed data or None if the
+                   resource can't be compressed.
+        """
+        return None
+
+    def decompressResource(self, data: bytes) -> Any:
+        """Restore a resource object from the cold tier.
+        Args:
+            data (bytes): The compressed data.
+        Returns:
+            Any: The resource object or None if it can't be restored.
+        """
+        return None
+
+    def demoteResource(self, resource_key, resource_object) -> bool:
+        """Queue a resource to be compressed into the cold tier. Evictions
+        run under the cache lock, so the compression is done on the global
+        thread pool instead, without blocking other lookups.
+        Args:
+            resource_key (Any): The resource key.
+            resource_object (Any): The resource object.
+        Returns:
+            bool: True if the resource was queued else False.
+        """
+        if not self._cold_max_bytes:
+            return False
+        QtCore.QThreadPool.globalInstance().start(
+            MediaDemoteRunnable(self, resource_key, resource_object)
+        )
+        return True
+
+    def storeColdResource(self, resource_key, data: bytes) -> bool:
+        """Store compressed resource data in the cold tier.
+        This is safe to call from worker threads.
+        Args:
+            resource_key (Any): The resource key.
+            data (bytes): The compressed data, None is ignored.
+        Returns:
+            bool: True if the data was stored else False.
+        """
+        if data is None or len(data) > self._cold_max_bytes:
+            return False
+        with self._lock:
+            if resource_key in self._cache:
+                # The resource got cached again while it was compressed.
+                return False
+            previous_data = self._cold_cache.pop(resource_key, None)
+            if previous_data is not None:
+                self._cold_cache_bytes -= len(previous_data)
+            self._cold_cache[resource_key] = data
+            self._cold_cache_bytes += len(data)
+            self.trimColdResources()
+        return True
+
+    def promoteResource(self, resource_key, users=0) -> Any:
+        """Restore a resource from the cold tier into the cache.
+        Args:
+            resource_key (Any): The resource key.
+            users (int): The initial tracked user count.
+        Returns:
+            Any: The resource object or None if it isn't in the cold tier.
+        """
+        data = self._cold_cache.get(resource_key, None)
+        if data is None:
+            return None
+        start_time = time.perf_counter()
+        # Decompress outside of the lock, the data is only dropped from
+        # the cold tier once it was restored (e.g. pixmaps can only be
+        # restored on the GUI thread).
+        resource_object = self.decompressResource(data)
+        if resource_object is None:
+            return None
+        with self._lock:
+            resource = self._cache.get(resource_key, None)
+            if resource:
+                # Another thread promoted the resource in the meantime.
+                resource["users"] += users
+                return resource["object"]
+            # This drops the data from the cold tier.
+            self.insertResource(resource_key, resource_object, users=users)
+        resource_stats = self.resourceStats(resource_key)
+        resource_stats["cold_hits"] += 1
+        resource_stats["promote_time"].record(time.perf_counter() - start_time)
+        return resource_object
+
+    def trimColdResources(self):
+        """Drop the least recently demoted resources
+        until the cold tier fits its byte budget.
+        """
+        with self._lock:
+            while self._cold_cache and self._cold_cache_bytes > self._cold_max_bytes:
+                _, data = self._cold_cache.popitem(last=False)
+                self._cold_cache_bytes -= len(data)
+
+    def clearColdResources(self):
+        """Drop all resources of the cold tier."""
+        with self._lock:
+            self._cold_cache.clear()
+            self._cold_cache_bytes = 0
+
+    def evictionPolicy(self) -> MediaCacheEvictionPolicy:
+        """Get the eviction policy.
+        Returns:
+            MediaCacheEvictionPolicy: The policy.
+        """
+        return self._eviction_policy
+
+    def setEvictionPolicy(self, policy: MediaCacheEvictionPolicy):
+        """Set the eviction policy. The already cached
+        resources are handed over to the new policy.
+        Args:
+            policy (MediaCacheEvictionPolicy): The policy.
+        """
+        with self._lock:
+            self._drainAccessBuffer()
+            policy.clear()
+            for key in self._eviction_policy.victims():
+                policy.recordInsert(key)
+            self._eviction_policy = policy
+            self.evictResources()
+
+    def supportedResourceExtensions(self) -> list[str]:
+        """The list of supported file formats.
+        Returns:
+            list[str]: The supported extensions.
+        """
+        return self._supported_resource_ext
+
+    def isResourceSupported(self, resource_name):
+        """Check if the resource is supported (purely by extension).
+        Args:
+            resource_name (str): The resource name.
+        Returns:
+            bool: The support state.
+        """
+        resource_file_ext = os.path.splitext(resource_name)[1]
+        return resource_file_ext in self._supported_resource_ext
+
+    def getResource(self, resource_name, track=True, resource_file_path=None) -> Any:
+        """Get the resource object.
+        Args:
+            resource_name (str): The resource name.
+            track (int): Increment the usage tracker.
+            resource_file_path (str): The already resolved file path, if any.
+        Returns:
+            Any: The resource object.
+        """
+        requested_resource_name = resource_name
+        resource_name, resource_file_path = self.resolveCanonicalResource(
+            resource_name, resource_file_path
+        )
+        resource = self._cache.get(resource_name, None)
+        if resource and track:
+            # Re-check under the lock, the resource may just have been evicted.
+            with self._lock:
+                resource = self._cache.get(resource_name, None)
+                if resource:
+                    resource["users"] += 1
+        if resource:
+            self.recordAccess(resource_name)
+            return resource["object"]
+
+        resource_file_ext = os.path.splitext(resource_name)[1]
+        if resource_file_ext not in self._supported_resource_ext:
+            raise Exception(
+                f"Unsupported resource extension {resource_file_ext} | {resource_name}"
+            )
+
+        self.recordMiss(resource_name)
+        resource_object = self.promoteResource(resource_name, users=1 if track else 0)
+        if resource_object is not None:
+            return resource_object
+        # Aliases have the same content, so any of their files will do.
+        if resource_file_path is None:
+            resource_file_path = self.lookupResourcePath(requested_resource_name)
+        if not resource_file_path:
+            return None
+
+        start_time = time.perf_counter()
+        resource_object = self.allocateResource(resource_file_path)
+        self.recordDecodeTime(resource_name, time.perf_counter() - start_time)
+        with self._lock:
+            # Another thread may have allocated the resource in the meantime.
+            resource = self._cache.get(resource_name, None)
+            if resource:
+                if track:
+                    resource["users"] += 1
+                self.discardResource(resource_object)
+                return resource["object"]
+            self.insertResource(
+                resource_name, resource_object, users=1 if track else 0
+            )
+        return resource_object
+
+    def acquireResource(self, resource_name, clear=False) -> MediaResourceHandle:
+        """Get the resource object bound to a handle. The resource
+        is tracked until the handle is released, so callers don't
+        need to balance getResource and releaseResource by hand.
+        Args:
+            resource_name (str): The resource name.
+            clear (bool): If True, remove the resource from the cache
+                          once the last tracked user released it.
+        Returns:
+            MediaResourceHandle: The handle or None if the resource doesn't exist.
+        """
+        resource_object = self.getResource(resource_name, track=True)
+        if resource_object is None:
+            return None
+        # Pin the canonical key, the name may be re-hashed before the release.
+        resource_key = self.canonicalResourceName(resource_name, resolve=False)
+        return MediaResourceHandle(self, resource_key, resource_object, clear=clear)
+
+    def acquireResourceHandle(self, resource_key, clear=False) -> MediaResourceHandle:
+        """Pin an already cached resource by its key (e.g. a variant).
+        Args:
+            resource_key (Any): The resource key.
+            clear (bool): If True, remove the resource from the cache
+                          once the last tracked user released it.
+        Returns:
+            MediaResourceHandle: The handle or None if the resource isn't cached.
+        """
+        with self._lock:
+            resource = self._cache.get(resource_key, None)
+            if resource is None:
+                return None
+            resource["users"] += 1
+        return MediaResourceHandle(
+            self, resource_key, resource["object"], clear=clear
+        )
+
+    def recordAccess(self, resource_key):
+        """Record a cache hit without taking the cache lock.
+        The access is replayed to the eviction policy on the
+        next structural change.
+        Args:
+            resource_key (Any): The resource key.
+        """
+        self.touchResource(resource_key)
+        self.resourceStats(resource_key)["hits"] += 1
+
+    def touchResource(self, resource_key):
+        """Mark a resource as recently used without recording a cache hit,
+        e.g. for the source of a variant lookup that counted as a miss.
+        Args:
+            resource_key (Any): The resource key.
+        """
+        self._access_buffer.append(resource_key)
+        if len(self._access_buffer) >= self._access_buffer_max_count:
+            # Replay the full buffer instead of dropping accesses. If the lock
+            # is taken, the next access (or structural change) drains it.
+            if self._lock.acquire(blocking=False):
+                try:
+                    self._drainAccessBuffer()
+                finally:
+                    self._lock.release()
+
+    def _drainAccessBuffer(self):
+        access_buffer = self._access_buffer
+        while access_buffer:
+            try:
+                resource_key = access_buffer.popleft()
+            except IndexError:
+                break
+            self._eviction_policy.recordAccess(resource_key)
+
+    def lookupResourcePath(self, resource_name) -> str:
+        """Resolve the resource name to a file path
+        through the negative cache and record the resolve time.
+        Args:
+            resource_name (str): The resource name.
+        Returns:
+            str: The file path or None if not found.
+        """
+        if self._file_system_watcher is None:
+            self.fileSystemWatcher()
+        if self.isResourceMissing(resource_name):
+            return None
+        start_time = time.perf_counter()
+        resource_file_path = self.resolveResourcePath(resource_name)
+        self.resourceStats(resource_name)["resolve_time"].record(
+            time.perf_counter() - start_time
+        )
+        if not resource_file_path and self._missing_resource_ttl:
+            self._missing_resources[resource_name] = (
+                time.monotonic() + self._missing_resource_ttl
+            )
+        return resource_file_path
+
+    def resolveResourcePath(self, resource_name) -> str:
+        """Resolve the resource name to a file path
+        by checking the search paths (last added wins).
+        Plain file names are looked up in the search index,
+        only relative file paths check the file system.
+        Args:
+            resource_name (str): The resource name.
+        Returns:
+            str: The file path or None if not found.
+        """
+        if os.path.basename(resource_name) == resource_name:
+            return self._search_index.get(resource_name, None)
+        for search_dir_path in self._search_dir_paths[::-1]:
+            search_file_path = os.path.join(search_dir_path, resource_name)
+            if os.path.isfile(search_file_path):
+                return search_file_path
+        return None
+
+    def insertResource(self, resource_key, resource_object, users=0):
+        """Insert a resource object into the cache and
+        evict resources if the byte budget is exceeded.
+        Args:
+            resource_key (Any): The resource key.
+            resource_object (Any): The resource object.
+            users (int): The initial tracked user count.
+        """
+        resource_bytes = self.resourceBytes(resource_object)
+        with self._lock:
+            if resource_key in self._cache:
+                self.removeResource(resource_key)
+            cold_data = self._cold_cache.pop(resource_key, None)
+            if cold_data is not None:
+                self._cold_cache_bytes -= len(cold_data)
+            self._cache[resource_key] = {
+                "object": resource_object,
+                "users": users,
+                "bytes": resource_bytes,
+            }
+            self._cache_bytes += resource_bytes
+            self._drainAccessBuffer()
+            self._eviction_policy.recordInsert(resource_key)
+            self.evictResources()
+
+    def removeResource(self, resource_key, evicted=False):
+        """Remove a resource from the cache regardless of its users.
+        Args:
+            resource_key (Any): The resource key.
+            evicted (bool): If True, the removal was caused by the budget.
+        Returns:
+            bool: True if the resource was cached else False.
+        """
+        with self._lock:
+            resource = self._cache.pop(resource_key, None)
+            if resource is None:
+                return False
+            self._cache_bytes -= resource["bytes"]
+            self._eviction_policy.recordRemove(resource_key, evicted=evicted)
+        if evicted:
+            self.resourceStats(resource_key)["evictions"] += 1
+        return True
+
+    def evictResources(self):
+        """Evict resources until the cache fits its byte budget.
+        Resources with tracked users are pinned and never evicted.
+        Returns:
+            int: The evicted resource count.
+        """
+        if not self._max_bytes or self._cache_bytes <= self._max_bytes:
+            return 0
+        evicted_count = 0
+        with self._lock:
+            self._drainAccessBuffer()
+            for resource_key in self._eviction_policy.victims():
+                if self._cache_bytes <= self._max_bytes:
+                    break
+                resource = self._cache.get(resource_key, None)
+                if resource is None or resource["users"] > 0:
+                    continue
+                self.removeResource(resource_key, evicted=True)
+                self.demoteResource(resource_key, resource["object"])
+                evicted_count += 1
+        return evicted_count
+
+    def resourceBytes(self, resource_object) -> int:
+        """Get the (approximate) memory cost of a resource object.
+        Pixmaps and images report their pixel buffer size.
+        Args:
+            resource_object (Any): The resource object.
+        Returns:
+            int: The byte count.
+        """
+        if isinstance(resource_object, (QtGui.QPixmap, QtGui.QImage)):
+            return (
+                resource_object.width()
+                * resource_object.height()
+                * max(1, resource_object.depth() // 8)
+            )
+        return 0
+
+    def allocateResource(self, resource_file_path):
+        """Allocate the resource object.
+        Args:
+            resource_file_path (str): The resource file path.
+        Returns:
+            Any: The resource object.
+        """
+        raise NotImplementedError
+
+    def discardResource(self, resource_object):
+        """Discard a resource object that was allocated
+        but not cached, as another thread was faster.
+        Args:
+            resource_object (Any): The resource object.
+        """
+
+    def releaseResource(self, resource_name, clear=True):
+        """Release the resource object. If no tracked
+        users are found, optionally remove the object
+        from the cache.
+        Args:
+            resource_file_path (str): The resource file path.
+            clear (bool): If True and no users are found, remove
+                          the resource from the cache.
+        Returns:
+            Any: The resource object.
+        """
+        resource_name = self.canonicalResourceName(resource_name, resolve=False)
+        with self._lock:
+            resource = self._cache.get(resource_name, None)
+            if resource is None:
+                raise Exception(f"Resource {resource_name} not found!")
+            resource["users"] = max(0, resource["users"] - 1)
+            if clear and resource["users"] == 0:
+                self.removeResource(resource_name)
+            else:
+                self.evictResources()
+
+    def clearResources(self, force=False):
+        """Clear resources. If force is False, only
+        resources who don't have any users are removed.
+        Args:
+            force (bool): If True remove all resources regardless
+                          of the usage state. This can lead
+                          to memory leaks.
+        Returns:
+            Any: The resource object.
+        """
+        with self._lock:
+            if force:
+                self._cache.clear()
+                self._cache_bytes = 0
+                self._access_buffer.clear()
+                self._eviction_policy.clear()
+                self.clearColdResources()
+                return
+
+            unused_resources = []
+            for key, data in self._cache.items():
+                if data["users"] <= 0:
+                    unused_resources.append(key)
+            for key in unused_resources:
+                self.removeResource(key)
+
+
+def read_image(
+    file_path, scaled_size=None, aspect_mode=QtCore.Qt.IgnoreAspectRatio
+) -> QtGui.QImage:
+    """Read an image file, optionally decoding it directly at the target
+    size. The image reader only materializes the scaled image (formats
+    like JPEG downscale while decoding), so large source images never
+    have to be fully decoded. This is safe to call from worker threads.
+    Args:
+        file_path (str): The image file path.
+        scaled_size (QtCore.QSize): The target size (in device pixels).
+        aspect_mode (Qt.AspectRatioMode): The aspect ratio mode, expanding
+                                          fills the target size by clipping
+                                          the centered scaled image.
+    Returns:
+        QtGui.QImage: The image, null if the file couldn't be decoded.
+    """
+    image_reader = QtGui.QImageReader(file_path)
+    if scaled_size is not None:
+        source_size = image_reader.size()
+        if source_size.isValid() and aspect_mode != QtCore.Qt.IgnoreAspectRatio:
+            decode_size = source_size.scaled(scaled_size, aspect_mode)
+        else:
+            decode_size = scaled_size
+        image_reader.setScaledSize(decode_size)
+        if aspect_mode == QtCore.Qt.KeepAspectRatioByExpanding:
+            clip_rect = QtCore.QRect(QtCore.QPoint(0, 0), scaled_size)
+            decode_rect = QtCore.QRect(QtCore.QPoint(0, 0), decode_size)
+            clip_rect.moveCenter(decode_rect.center())
+            image_reader.setScaledClipRect(clip_rect)
+    return image_reader.read()
+
+
+def read_mip_levels(file_path, max_size=512, min_size=8) -> list:
+    """Read an image file as a power of two mip chain. The base level
+    is decoded directly at a size that fits the max size, every further
+    level halves the previous one. This is safe to call from worker threads.
+    Args:
+        file_path (str): The image file path.
+        max_size (int): The max base level width and height (in pixels).
+        min_size (int): The min level width and height (in pixels).
+    Returns:
+        list[QtGui.QImage]: The levels (largest first),
+                            empty if the file couldn't be decoded.
+    """
+    scaled_size = None
+    source_size = QtGui.QImageReader(file_path).size()
+    if source_size.width() > max_size or source_size.height() > max_size:
+        scaled_size = source_size.scaled(
+            max_size, max_size, QtCore.Qt.KeepAspectRatio
+        )
+    image = read_image(file_path, scaled_size)
+    if image.isNull():
+        return []
+    image = image.convertToFormat(QtGui.QImage.Format_ARGB32_Premultiplied)
+    levels = [image]
+    while image.width() > min_size or image.height() > min_size:
+        image = image.scaled(
+            max(1, image.width() // 2),
+            max(1, image.height() // 2),
+            QtCore.Qt.IgnoreAspectRatio,
+            QtCore.Qt.SmoothTransformation,
+        )
+        levels.append(image)
+    return levels
+
+
+svg_animation_tag_regex = re.compile(rb"<(?:[\w-]+:)?(?:animate\w*|set)\b[^>]*>")
+svg_tag_name_regex = re.compile(rb"<[\w:-]+")
+svg_clock_attribute_regex = re.compile(rb"""\s(begin|dur)\s*=\s*(["'])(.*?)\2""")
+
+
+def parse_svg_clock_value(value: bytes) -> float:
+    """Parse a svg clock value the way Qt does ("1.5", "1.5s", "1500ms").
+    Args:
+        value (bytes): The clock value.
+    Returns:
+        float: The time in seconds or None if the value isn't a time.
+    """
+    value = value.strip()
+    scale = 1.0
+    if value.endswith(b"ms"):
+        value = value[:-2]
+        scale = 0.001
+    elif value.endswith(b"s"):
+        value = value[:-1]
+    try:
+        return float(value) * scale
+    except ValueError:
+        return None
+
+
+def freeze_svg_animations(svg_data: bytes, time: float) -> bytes:
+    """Get the svg data with all animations moved to the given time.
+    Qt samples svg animations at the wall clock time since the first
+    render (QSvgRenderer.setCurrentFrame shifts that clock the wrong
+    way in Qt5), so instead the animations begin before the document
+    does and run slowed down as far as Qt's integer millisecond clock
+    values allow. The milliseconds between loading and rendering the
+    data then don't change the rendered pixels.
+    Args:
+        svg_data (bytes): The svg data.
+        time (float): The animation time in seconds.
+    Returns:
+        bytes: The svg data.
+    """
+    tag_clock_values = {}
+    max_clock_value = 0.0
+    for tag in svg_animation_tag_regex.findall(svg_data):
+        clock_values = {
+            name: value for name, _, value in svg_clock_attribute_regex.findall(tag)
+        }
+        begin = parse_svg_clock_value(clock_values.get(b"begin", b"0")) or 0.0
+        dur = parse_svg_clock_value(clock_values.get(b"dur", b""))
+        tag_clock_values[tag] = (begin, dur)
+        max_clock_value = max(max_clock_value, abs(begin - time) + (dur or 0.0))
+    # Qt parses clock values to int milliseconds, keep the end time in range.
+    time_scale = min(1e6, 1e6 / max_clock_value) if max_clock_value else 1e6
+
+    def freeze_tag(match):
+        tag = match.group(0)
+        begin, dur = tag_clock_values[tag]
+        attributes = b' begin="%dms"' % round((begin - time) * 1000 * time_scale)
+        if dur is not None:
+            attributes += b' dur="%dms"' % round(dur * 1000 * time_scale)
+        tag = svg_clock_attribute_regex.sub(b"", tag)
+        name_end = svg_tag_name_regex.match(tag).end()
+        return tag[:name_end] + attributes + tag[name_end:]
+
+    return svg_animation_tag_regex.sub(freeze_tag, svg_data)
+
+
+def render_svg_image(svg_renderer, pixel_width, pixel_height) -> QtGui.QImage:
+    """Rasterize an svg. This doesn't need the GUI thread.
+    Args:
+        svg_renderer (QtSvg.QSvgRenderer): The svg renderer.
+        pixel_width (int): The image width (in device pixels).
+        pixel_height (int): The image height (in device pixels).
+    Returns:
+        QtGui.QImage: The image.
+    """
+    image = QtGui.QImage(
+        pixel_width, pixel_height, QtGui.QImage.Format_ARGB32_Premultiplied
+    )
+    image.fill(QtCore.Qt.transparent)
+    painter = QtGui.QPainter(image)
+    painter.setRenderHint(QtGui.QPainter.Antialiasing)
+    svg_renderer.render(painter)
+    painter.end()
+    return image
+
+
+class ImageDecodeSignals(QtCore.QObject):
+    finished = QtCore.Signal(object, object, object, name="finished")
+
+
+class ImageDecodeRunnable(QtCore.QRunnable):
+    """Decode an image file to a QImage on a worker thread.
+    QPixmaps can only be created on the GUI thread, so the
+    conversion is done by the receiver of the finished signal.
+    If a thumbnail store is given, the scaled image is read from
+    the store instead and written to it after decoding.
+    """
+
+    def __init__(
+        self,
+        resource_key,
+        resource_file_path,
+        scaled_size=None,
+        aspect_mode=QtCore.Qt.IgnoreAspectRatio,
+        device_pixel_ratio=1.0,
+        image_store=None,
+        content_cache=None,
+        thumbnail_store=None,
+    ) -> None:
+        super().__init__()
+        # The cache keeps a reference until the runnable finished.
+        self.setAutoDelete(False)
+        self.signals = ImageDecodeSignals()
+        self._resource_key = resource_key
+        self._resource_file_path = resource_file_path
+        self._scaled_size = scaled_size
+        self._aspect_mode = aspect_mode
+        self._device_pixel_ratio = device_pixel_ratio
+        self._image_store = image_store
+        self._content_cache = content_cache
+        self._content_digest = None
+        self._thumbnail_store = thumbnail_store
+        self._cancelled = False
+        self._decode_time = 0.0
+
+    def resourceFilePath(self) -> str:
+        """Get the decoded file path.
+        Returns:
+            str: The file path.
+        """
+        return self._resource_file_path
+
+    def decodeTime(self) -> float:
+        """Get the time the decode took.
+        Returns:
+            float: The time in seconds.
+        """
+        return self._decode_time
+
+    def contentDigest(self) -> str:
+        """Get the content digest of the file.
+        Returns:
+            str: The digest or None if no content cache was given.
+        """
+        return self._content_digest
+
+    def cancel(self):
+        """Cancel the decode. If the runnable already started,
+        the result is discarded by the cache.
+        """
+        self._cancelled = True
+
+    def isCancelled(self) -> bool:
+        """Get the cancelled state.
+        Returns:
+            bool: The state.
+        """
+        return self._cancelled
+
+    def run(self):
+        if self._cancelled:
+            return
+        thumbnail_key = None
+        if self._thumbnail_store is not None:
+            thumbnail_key = self._thumbnail_store.thumbnailKey(
+                self._resource_file_path,
+                self._scaled_size.width(),
+                self._scaled_size.height(),
+            )
+            image = None
+            if thumbnail_key:
+                image = self._thumbnail_store.read(thumbnail_key)
+            if image is not None:
+                image.setDevicePixelRatio(self._device_pixel_ratio)
+                if not self._cancelled:
+                    self.signals.finished.emit(self._resource_key, image, self)
+                return
+        if self._content_cache is not None:
+            self._content_digest = self._content_cache.contentDigest(
+                self._resource_file_path
+            )
+            if self._content_digest and self._content_cache.isContentCached(
+                self._content_digest, self._resource_key
+            ):
+                # The content is cached under another name already.
+                self.signals.finished.emit(self._resource_key, QtGui.QImage(), self)
+                return
+        start_time = time.perf_counter()
+        if os.path.splitext(self._resource_file_path)[1] == ".svg":
+            image = render_svg_image(
+                QtSvg.QSvgRenderer(self._resource_file_path),
+                self._scaled_size.width(),
+                self._scaled_size.height(),
+            )
+        elif self._image_store is not None:
+            image = self._image_store.readImage(
+                self._resource_file_path, self._scaled_size, self._aspect_mode
+            )
+        else:
+            image = read_image(
+                self._resource_file_path, self._scaled_size, self._aspect_mode
+            )
+        image.setDevicePixelRatio(self._device_pixel_ratio)
+        self._decode_time = time.perf_counter() - start_time
+        if thumbnail_key and not image.isNull():
+            self._thumbnail_store.write(thumbnail_key, image)
+        if self._cancelled:
+            return
+        self.signals.finished.emit(self._resource_key, image, self)
+
+
+class MipPyramidRunnable(ImageDecodeRunnable):
+    """Decode an image file to a mip chain on a worker thread."""
+
+    def __init__(self, resource_key, resource_file_path, max_size=512) -> None:
+        super().__init__(resource_key, resource_file_path)
+        self._max_size = max_size
+
+    def run(self):
+        if self._cancelled:
+            return
+        start_time = time.perf_counter()
+        levels = read_mip_levels(self._resource_file_path, self._max_size)
+        self._decode_time = time.perf_counter() - start_time
+        if self._cancelled:
+            return
+        self.signals.finished.emit(self._resource_key, levels, self)
+
+
+class ThumbnailStore:
+    """A persistent on-disk store of already scaled raw pixel data.
+    Thumbnails are keyed by the source file path, its modification
+    time and size and the pixel size of the thumbnail, so stale
+    entries are never served. The store is capped by a byte budget,
+    the least recently read thumbnails are removed first.
+    """
+
+    file_ext = ".thumb"
+    file_magic = b"VQTH"
+    file_header = struct.Struct("<4sIIII")
+    image_format = QtGui.QImage.Format_ARGB32_Premultiplied
+
+    def __init__(self, dir_path=None, max_bytes=1024**3) -> None:
+        if dir_path is None:
+            dir_path = os.environ.get("VFXQT_THUMBNAIL_CACHE_DIR", None)
+        if dir_path is None:
+            dir_path = os.path.join(
+                QtCore.QStandardPaths.writableLocation(
+                    QtCore.QStandardPaths.GenericCacheLocation
+                ),
+                "vfxQt",
+                "thumbnails",
+            )
+        self._dir_path = dir_path
+        self._max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._store_bytes = None
+
+    def dirPath(self) -> str:
+        """Get the store directory.
+        Returns:
+            str: The directory path.
+        """
+        return self._dir_path
+
+    def maxBytes(self) -> int:
+        """Get the store byte budget.
+        Returns:
+            int: The budget, 0 means unlimited.
+        """
+        return self._max_bytes
+
+    def setMaxBytes(self, value: int):
+        """Set the store byte budget.
+        Args:
+            value (int): The budget, 0 means unlimited.
+        """
+        self._max_bytes = max(0, int(value))
+        self.trim()
+
+    def thumbnailKey(
+        self, resource_file_path, pixel_width, pixel_height, variant=""
+    ) -> str:
+        """Get the thumbnail key.
+        Args:
+            resource_file_path (str): The source file path.
+            pixel_width (int): The thumbnail width (in device pixels).
+            pixel_height (int): The thumbnail height (in device pixels).
+            variant (str): The variant of non plain thumbnails (e.g. atlases).
+        Returns:
+            str: The key or None if the source file doesn't exist.
+        """
+        try:
+            stat = os.stat(resource_file_path)
+        except OSError:
+            return None
+        key_parts = [
+            os.path.abspath(resource_file_path),
+            str(stat.st_mtime_ns),
+            str(stat.st_size),
+            f"{pixel_width}x{pixel_height}",
+        ]
+        if variant:
+            key_parts.append(variant)
+        key = "|".join(key_parts)
+        return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+    def thumbnailPath(self, key) -> str:
+        """Get the thumbnail file path.
+        Args:
+            key (str): The thumbnail key.
+        Returns:
+            str: The file path.
+        """
+        return os.path.join(self._dir_path, key[:2], key + self.file_ext)
+
+    def read(self, key) -> QtGui.QImage:
+        """Read a thumbnail.
+        Args:
+            key (str): The thumbnail key.
+        Returns:
+            QtGui.QImage: The image or None if the thumbnail doesn't exist.
+        """
+        thumbnail_file_path = self.thumbnailPath(key)
+        try:
+            with open(thumbnail_file_path, "rb") as thumbnail_file:
+                data = thumbnail_file.read()
+            # Touch the file, this drives the least recently read trimming.
+            os.utime(thumbnail_file_path)
+        except OSError:
+            return None
+        if len(data) < self.file_header.size:
+            return None
+        magic, width, height, bytes_per_line, image_format = (
+            self.file_header.unpack_from(data)
+        )
+        if magic != self.file_magic:
+            return None
+        pixel_data = data[self.file_header.size :]
+        if len(pixel_data) != bytes_per_line * height:
+            return None
+        image = QtGui.QImage(
+            pixel_data, width, height, bytes_per_line, QtGui.QImage.Format(image_format)
+        )
+        # Detach from the python buffer.
+        return image.copy()
+
+    def write(self, key, image: QtGui.QImage):
+        """Write a thumbnail. This is safe to call from worker threads.
+        Args:
+            key (str): The thumbnail key.
+            image (QtGui.QImage): The image.
+        """
+        if image.format() != self.image_format:
+            image = image.convertToFormat(self.image_format)
+        header = self.file_header.pack(
+            self.file_magic,
+            image.width(),
+            image.height(),
+            image.bytesPerLine(),
+            enum_to_int(image.format()),
+        )
+        pixel_data = bytes(image.constBits())[: image.bytesPerLine() * image.height()]
+        thumbnail_file_path = self.thumbnailPath(key)
+        thumbnail_dir_path = os.path.dirname(thumbnail_file_path)
+        try:
+            os.makedirs(thumbnail_dir_path, exist_ok=True)
+            file_descriptor, temp_file_path = tempfile.mkstemp(dir=thumbnail_dir_path)
+            with os.fdopen(file_descriptor, "wb") as thumbnail_file:
+                thumbnail_file.write(header)
+                thumbnail_file.write(pixel_data)
+            os.replace(temp_file_path, thumbnail_file_path)
+        except OSError:
+            return
+        with self._lock:
+            if self._store_bytes is not None:
+                self._store_bytes += len(header) + len(pixel_data)
+        self.trim()
+
+    def _listThumbnails(self):
+        thumbnails = []
+        try:
+            shard_entries = list(os.scandir(self._dir_path))
+        except OSError:
+            return thumbnails
+        for shard_entry in shard_entries:
+            if not shard_entry.is_dir():
+                continue
+            try:
+                entries = list(os.scandir(shard_entry.path))
+            except OSError:
+                continue
+            for entry in entries:
+                if not entry.name.endswith(self.file_ext):
+                    continue
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                thumbnails.append((stat.st_mtime, stat.st_size, entry.path))
+        return thumbnails
+
+    def trim(self):
+        """Remove the least recently read thumbnails
+        until the store fits its byte budget.
+        """
+        if not self._max_bytes:
+            return
+        with self._lock:
+            if self._store_bytes is not None and self._store_bytes <= self._max_bytes:
+                return
+            thumbnails = self._listThumbnails()
+            self._store_bytes = sum(t[1] for t in thumbnails)
+            if self._store_bytes <= self._max_bytes:
+                return
+            # Trim below the budget, so we don't re-list on every write.
+            target_bytes = self._max_bytes * 0.9
+            for _, file_size, file_path in sorted(thumbnails):
+                if self._store_bytes <= target_bytes:
+                    break
+                try:
+                    os.remove(file_path)
+                except OSError:
+                    continue
+                self._store_bytes -= file_size
+
+    def clear(self):
+        """Remove all thumbnails."""
+        with self._lock:
+            for _, _, file_path in self._listThumbnails():
+                try:
+                    os.remove(file_path)
+                except OSError:
+                    pass
+            self._store_bytes = 0
+
+
+class ThumbnailWriteRunnable(QtCore.QRunnable):
+    """Write a thumbnail to the thumbnail store on a worker thread."""
+
+    def __init__(self, thumbnail_store, key, image) -> None:
+        super().__init__()
+        self._thumbnail_store = thumbnail_store
+        self._key = key
+        self._image = image
+
+    def run(self):
+        self._thumbnail_store.write(self._key, self._image)
+
+
+class SharedImageStore:
+    """A host wide store of decoded pixel buffers in shared memory.
+    Every buffer is decoded once per host, processes attach to it
+    and wrap it in a QImage without copying the pixels. A small
+    index file (guarded by a file lock) tracks which processes are
+    attached to which buffer, buffers are unlinked once no (living)
+    process is attached anymore. Images handed out by the store must
+    be given back via releaseImage once they are not used anymore.
+    """
+
+    segment_prefix = "vfxqt_"
+    segment_magic = b"VQSH"
+    segment_header = struct.Struct("<4sIIII")
+    image_format = QtGui.QImage.Format_ARGB32_Premultiplied
+
+    def __init__(self, index_file_path=None) -> None:
+        if fcntl is None:
+            raise Exception("Shared image stores are only supported on POSIX hosts.")
+        if index_file_path is None:
+            index_file_path = os.path.join(
+                tempfile.gettempdir(), f"vfxqt_shared_images_{os.getuid()}.json"
+            )
+        self._index_file_path = index_file_path
+        self._lock = threading.RLock()
+        # The attached segments: key -> [SharedMemory, local reference count].
+        self._segments = {}
+        self._images = {}
+        atexit.register(self.close)
+
+    def imageKey(
+        self,
+        file_path,
+        pixel_width=0,
+        pixel_height=0,
+        aspect_mode=QtCore.Qt.IgnoreAspectRatio,
+    ) -> str:
+        """Get the image key, which also is the shared memory segment name.
+        Args:
+            file_path (str): The source file path.
+            pixel_width (int): The decode width, 0 for the source size.
+            pixel_height (int): The decode height, 0 for the source size.
+            aspect_mode (Qt.AspectRatioMode): The decode aspect ratio mode.
+        Returns:
+            str: The key or None if the source file doesn't exist.
+        """
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return None
+        key = "|".join(
+            [
+                os.path.abspath(file_path),
+                str(stat.st_mtime_ns),
+                str(stat.st_size),
+                f"{pixel_width}x{pixel_height}",
+                str(enum_to_int(aspect_mode)),
+            ]
+        )
+        # Segment names are limited to 31 characters on some hosts.
+        return self.segment_prefix + hashlib.sha1(key.encode("utf-8")).hexdigest()[:24]
+
+    @contextmanager
+    def lockedIndex(self):
+        """Lock the index file for the whole host and yield its content.
+        Changes to the yielded dict are written back on exit. Segments
+        whose attached processes all died are unlinked on the way.
+        Yields:
+            dict: The index, segment name -> {"bytes": int, "pids": list[int]}.
+        """
+        with open(self._index_file_path, "a+") as index_file:
+            fcntl.flock(index_file, fcntl.LOCK_EX)
+            try:
+                index_file.seek(0)
+                try:
+                    index = json.loads(index_file.read() or "{}")
+                except ValueError:
+                    index = {}
+                for name in list(index):
+                    pids = [pid for pid in index[name]["pids"] if _pid_alive(pid)]
+                    index[name]["pids"] = pids
+                    if not pids and name not in self._segments:
+                        _unlink_segment(name)
+                        del index[name]
+                yield index
+                index_file.seek(0)
+                index_file.truncate()
+                index_file.write(json.dumps(index))
+            finally:
+                fcntl.flock(index_file, fcntl.LOCK_UN)
+
+    def acquireImage(self, key) -> QtGui.QImage:
+        """Attach to a shared image.
+        Args:
+            key (str): The image key.
+        Returns:
+            QtGui.QImage: The image or None if the image isn't shared yet.
+        """
+        with self._lock:
+            self.collectSegments()
+            segment = self._segments.get(key, None)
+            if segment is None:
+                with self.lockedIndex() as index:
+                    if key not in index:
+                        return None
+                    try:
+                        shm = shared_memory.SharedMemory(name=key)
+                    except FileNotFoundError:
+                        del index[key]
+                        return None
+                    _untrack_segment(shm)
+                    index[key]["pids"].append(os.getpid())
+                segment = self._segments[key] = [shm, 0]
+            return self._wrapSegment(key, segment)
+
+    def publishImage(self, key, image: QtGui.QImage) -> QtGui.QImage:
+        """Copy an image into shared memory. If another process
+        published the image in the meantime, its buffer is used.
+        Args:
+            key (str): The image key.
+            image (QtGui.QImage): The image.
+        Returns:
+            QtGui.QImage: The shared image.
+        """
+        image = image.convertToFormat(self.image_format)
+        with self._lock:
+            self.collectSegments()
+            segment = self._segments.get(key, None)
+            if segment is None:
+                with self.lockedIndex() as index:
+                    if key in index:
+                        shm = shared_memory.SharedMemory(name=key)
+                        _untrack_segment(shm)
+                        index[key]["pids"].append(os.getpid())
+                    else:
+                        image_bytes = image.sizeInBytes()
+                        shm = shared_memory.SharedMemory(
+                            name=key,
+                            create=True,
+                            size=self.segment_header.size + image_bytes,
+                        )
+                        _untrack_segment(shm)
+                        self.segment_header.pack_into(
+                            shm.buf,
+                            0,
+                            self.segment_magic,
+                            image.width(),
+                            image.height(),
+                            image.bytesPerLine(),
+                            image_bytes,
+                        )
+                        shm.buf[self.segment_header.size :][:image_bytes] = (
+                            memoryview(image.constBits()).cast("B")[:image_bytes]
+                        )
+                        index[key] = {"bytes": shm.size, "pids": [os.getpid()]}
+                segment = self._segments[key] = [shm, 0]
+            return self._wrapSegment(key, segment)
+
+    def readImage(
+        self, file_path, scaled_size=None, aspect_mode=QtCore.Qt.IgnoreAspectRatio
+    ) -> QtGui.QImage:
+        """Read an image file through the store, it is
+        only decoded if no process has shared it yet.
+        This is safe to call from worker threads.
+        Args:
+            file_path (str): The image file path.
+            scaled_size (QtCore.QSize): The target size (in device pixels).
+            aspect_mode (Qt.AspectRatioMode): The aspect ratio mode.
+        Returns:
+            QtGui.QImage: The image, null if the file couldn't be decoded.
+        """
+        if scaled_size is None:
+            scaled_size = QtCore.QSize(0, 0)
+        key = self.imageKey(
+            file_path, scaled_size.width(), scaled_size.height(), aspect_mode
+        )
+        image = self.acquireImage(key) if key else None
+        if image is None:
+            image = read_image(
+                file_path, scaled_size if scaled_size.isValid() else None, aspect_mode
+            )
+            if key and not image.isNull():
+                image = self.publishImage(key, image)
+        return image
+
+    def isSharedImage(self, image) -> bool:
+        """Check if the image was handed out by the store.
+        Args:
+            image (Any): The image.
+        Returns:
+            bool: The shared state.
+        """
+        return id(image) in self._images
+
+    def releaseImage(self, image):
+        """Give back an image handed out by the store. Once a process
+        doesn't use a segment anymore, it detaches from it.
+        Args:
+            image (QtGui.QImage): The image, others are ignored.
+        """
+        with self._lock:
+            entry = self._images.pop(id(image), None)
+            if entry is None:
+                return
+            segment = self._segments.get(entry[0], None)
+            if segment is not None:
+                segment[1] -= 1
+
+    def collectSegments(self):
+        """Detach from all segments without local users. Segments which
+        are still mapped by a live QImage are detached later on.
+        """
+        with self._lock:
+            detached_keys = []
+            for key, (shm, local_count) in self._segments.items():
+                if local_count > 0:
+                    continue
+                try:
+                    shm.close()
+                except BufferError:
+                    continue
+                detached_keys.append(key)
+            if not detached_keys:
+                return
+            for key in detached_keys:
+                del self._segments[key]
+            with self.lockedIndex() as index:
+                pid = os.getpid()
+                for key in detached_keys:
+                    entry = index.get(key, None)
+                    if entry is None:
+                        continue
+                    entry["pids"] = [p for p in entry["pids"] if p != pid]
+                    if not entry["pids"]:
+                        _unlink_segment(key)
+                        del index[key]
+
+    def segmentCount(self) -> int:
+        """Get the count of shared images on this host.
+        Returns:
+            int: The count.
+        """
+        with self._lock, self.lockedIndex() as index:
+            return len(index)
+
+    def sharedBytes(self) -> int:
+        """Get the bytes of all shared images on this host.
+        Returns:
+            int: The byte count.
+        """
+        with self._lock, self.lockedIndex() as index:
+            return sum(entry["bytes"] for entry in index.values())
+
+    def close(self):
+        """Release all images of this process and detach from their segments."""
+        with self._lock:
+            self._images.clear()
+            for segment in self._segments.values():
+                segment[1] = 0
+            self.collectSegments()
+
+    def _wrapSegment(self, key, segment) -> QtGui.QImage:
+        shm = segment[0]
+        magic, width, height, bytes_per_line, image_bytes = (
+            self.segment_header.unpack_from(shm.buf, 0)
+        )
+        if magic != self.segment_magic:
+            raise Exception(f"Invalid shared image segment {key}")
+        # The image references the mapped buffer, no pixels are copied.
+        image = QtGui.QImage(
+            shm.buf[self.segment_header.size :][:image_bytes],
+            width,
+            height,
+            bytes_per_line,
+            self.image_format,
+        )
+        segment[1] += 1
+        self._images[id(image)] = (key, image)
+        return image
+
+
+def _pid_alive(pid) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _untrack_segment(shm):
+    # The resource tracker would unlink the segment when this process
+    # exits, even if other processes are still attached to it.
+    resource_tracker.unregister(shm._name, "shared_memory")
+
+
+def _unlink_segment(name):
+    try:
+        shm = shared_memory.SharedMemory(name=name)
+    except FileNotFoundError:
+        return
+    shm.close()
+    shm.unlink()
+
+
+class AnimationClock(QtCore.QObject):
+    """The global animation clock. All animated resources sample
+    their current frame from this clock, so they play in sync
+    and views only need a single repaint trigger per frame. The
+    clock only ticks while it has subscribers.
+    """
+
+    frameChanged = QtCore.Signal(int, name="frameChanged")
+
+    def __init__(self, parent=None) -> None:
+        super().__init__(parent)
+        # The style provides the frame interval in seconds.
+        self._frame_interval = get_frames_per_second()
+        self._start_time = time.monotonic()
+        self._timer = QtCore.QTimer(self)
+        self._timer.setTimerType(QtCore.Qt.PreciseTimer)
+        self._timer.setInterval(round(self._frame_interval * 1000))
+        self._timer.timeout.connect(self.onTimeout)
+        self._subscribers = []
+
+    def frameInterval(self) -> float:
+        """Get the frame interval.
+        Returns:
+            float: The interval in seconds.
+        """
+        return self._frame_interval
+
+    def setFrameInterval(self, value: float):
+        """Set the frame interval.
+        Args:
+            value (float): The interval in seconds.
+        """
+        self._frame_interval = value
+        self._timer.setInterval(round(self._frame_interval * 1000))
+
+    def elapsedTime(self) -> float:
+        """Get the time since the clock was created.
+        Returns:
+            float: The time in seconds.
+        """
+        return time.monotonic() - self._start_time
+
+    def globalFrame(self) -> int:
+        """Get the frame count since the clock was created.
+        Returns:
+            int: The frame.
+        """
+        return int(self.elapsedTime() / self._frame_interval)
+
+    def frame(self, frame_count: int) -> int:
+        """Get the current frame of a looping animation.
+        Args:
+            frame_count (int): The animation frame count.
+        Returns:
+            int: The frame index.
+        """
+        return self.globalFrame() % max(1, frame_count)
+
+    def start(self):
+        """Start emitting the frameChanged signal."""
+        self._timer.start()
+
+    def stop(self):
+        """Stop emitting the frameChanged signal."""
+        self._timer.stop()
+
+    def isActive(self) -> bool:
+        """Get the ticking state.
+        Returns:
+            bool: The state.
+        """
+        return self._timer.isActive()
+
+    def subscribe(self, slot):
+        """Connect a slot to the frameChanged signal,
+        the clock starts with its first subscriber.
+        Args:
+            slot (Callable): The slot.
+        """
+        if slot in self._subscribers:
+            return
+        self._subscribers.append(slot)
+        self.frameChanged.connect(slot)
+        if not self._timer.isActive():
+            self.start()
+
+    def unsubscribe(self, slot):
+        """Disconnect a slot from the frameChanged signal,
+        the clock stops with its last subscriber.
+        Args:
+            slot (Callable): The slot.
+        """
+        if slot not in self._subscribers:
+            return
+        self._subscribers.remove(slot)
+        self.frameChanged.disconnect(slot)
+        if not self._subscribers:
+            self.stop()
+
+    def subscriberCount(self) -> int:
+        """Get the count of subscribed slots.
+        Returns:
+            int: The count.
+        """
+        return len(self._subscribers)
+
+    def onTimeout(self):
+        self.frameChanged.emit(self.globalFrame())
+
+
+def getAnimationClock():
+    if not hasattr(getAnimationClock, "instance"):
+        getAnimationClock.instance = AnimationClock()
+    return getAnimationClock.instance
+
+
+class SvgFrameAtlas:
+    """An animated svg baked into a sprite atlas at the clock frame
+    rate. Drawing a frame is a plain blit of an atlas cell, so the
+    svg renderer state is never touched while painting.
+    """
+
+    def __init__(
+        self,
+        svg_renderer,
+        size: QtCore.QSize,
+        device_pixel_ratio=1.0,
+        atlas_image=None,
+        svg_file_path=None,
+    ):
+        frame_interval = getAnimationClock().frameInterval()
+        self._frame_count = self.frameCountFor(svg_renderer, frame_interval)
+        self._frame_width = max(1, round(size.width() * device_pixel_ratio))
+        self._frame_height = max(1, round(size.height() * device_pixel_ratio))
+        self._columns = math.ceil(math.sqrt(self._frame_count))
+        if atlas_image is None:
+            atlas_image = self.renderAtlasImage(
+                svg_file_path, self._frame_width, self._frame_height, frame_interval
+            )
+        self._pixmap = QtGui.QPixmap.fromImage(atlas_image)
+        self._pixmap.setDevicePixelRatio(device_pixel_ratio)
+
+    @staticmethod
+    def frameCountFor(svg_renderer, frame_interval) -> int:
+        """Get the atlas frame count of an animated svg.
+        Args:
+            svg_renderer (QtSvg.QSvgRenderer): The svg renderer.
+            frame_interval (float): The frame interval in seconds.
+        Returns:
+            int: The frame count.
+        """
+        duration = svg_renderer.animationDuration() / 1000.0
+        return max(1, round(duration / frame_interval))
+
+    @staticmethod
+    def thumbnailVariant(svg_renderer, frame_interval) -> str:
+        """Get the thumbnail store variant of an atlas, so atlases are
+        never mistaken for static thumbnails or baked at another rate.
+        Args:
+            svg_renderer (QtSvg.QSvgRenderer): The svg renderer.
+            frame_interval (float): The frame interval in seconds.
+        Returns:
+            str: The variant.
+        """
+        frame_count = SvgFrameAtlas.frameCountFor(svg_renderer, frame_interval)
+        # v2: Frames are sampled deterministically (see freeze_svg_animations).
+        return f"atlas{frame_count}@{frame_interval:g}v2"
+
+    @staticmethod
+    def renderAtlasImage(
+        svg_file_path, pixel_width, pixel_height, frame_interval
+    ) -> QtGui.QImage:
+        """Render all frames of an animated svg into an atlas image.
+        Each frame is rendered from the svg data frozen at the frame
+        time, so atlases are the same on every run and Qt version.
+        This doesn't need the GUI thread.
+        Args:
+            svg_file_path (str): The svg file path.
+            pixel_width (int): The frame width (in device pixels).
+            pixel_height (int): The frame height (in device pixels).
+            frame_interval (float): The frame interval in seconds.
+        Returns:
+            QtGui.QImage: The atlas image.
+        """
+        with open(svg_file_path, "rb") as svg_file:
+            svg_data = svg_file.read()
+        svg_renderer = QtSvg.QSvgRenderer(QtCore.QByteArray(svg_data))
+        frame_count = SvgFrameAtlas.frameCountFor(svg_renderer, frame_interval)
+        columns = math.ceil(math.sqrt(frame_count))
+        rows = math.ceil(frame_count / columns)
+        image = QtGui.QImage(
+            columns * pixel_width,
+            rows * pixel_height,
+            QtGui.QImage.Format_ARGB32_Premultiplied,
+        )
+        image.fill(QtCore.Qt.transparent)
+        painter = QtGui.QPainter(image)
+        painter.setRenderHint(QtGui.QPainter.Antialiasing)
+        for frame_index in range(frame_count):
+            row, column = divmod(frame_index, columns)
+            frame_renderer = QtSvg.QSvgRenderer(
+                QtCore.QByteArray(
+                    freeze_svg_animations(svg_data, frame_index * frame_interval)
+                )
+            )
+            frame_renderer.render(
+                painter,
+                QtCore.QRectF(
+                    column * pixel_width,
+                    row * pixel_height,
+                    pixel_width,
+                    pixel_height,
+                ),
+            )
+        painter.end()
+        return image
+
+    def frameCount(self) -> int:
+        """Get the frame count.
+        Returns:
+            int: The frame count.
+        """
+        return self._frame_count
+
+    def pixmap(self) -> QtGui.QPixmap:
+        """Get the atlas pixmap.
+        Returns:
+            QtGui.QPixmap: The pixmap.
+        """
+        return self._pixmap
+
+    def frameRect(self, frame_index) -> QtCore.QRectF:
+        """Get the atlas cell of a frame.
+        Args:
+            frame_index (int): The frame index.
+        Returns:
+            QtCore.QRectF: The cell rect (in device pixels).
+        """
+        row, column = divmod(frame_index, self._columns)
+        return QtCore.QRectF(
+            column * self._frame_width,
+            row * self._frame_height,
+            self._frame_width,
+            self._frame_height,
+        )
+
+    def draw(self, painter: QtGui.QPainter, rect: QtCore.QRect, frame_index=None):
+        """Draw a frame.
+        Args:
+            painter (QtGui.QPainter): The painter.
+            rect (QtCore.QRect): The target rect.
+            frame_index (int): The frame index, defaults to the clock frame.
+        """
+        if frame_index is None:
+            frame_index = getAnimationClock().frame(self._frame_count)
+        painter.drawPixmap(
+            QtCore.QRectF(rect), self._pixmap, self.frameRect(frame_index)
+        )
+
+    def cacheBytes(self) -> int:
+        """Get the atlas bytes.
+        Returns:
+            int: The byte count.
+        """
+        return self._pixmap.width() * self._pixmap.height() * 4
+
+
+class SvgAtlasRunnable(ImageDecodeRunnable):
+    """Bake an animated svg into a frame atlas image on a worker thread.
+    The cached svg renderer is only used on the GUI thread to create
+    the atlas from the finished image.
+    """
+
+    def __init__(
+        self,
+        resource_key,
+        resource_file_path,
+        svg_renderer,
+        size,
+        device_pixel_ratio,
+        frame_interval,
+        thumbnail_store=None,
+        thumbnail_variant="",
+    ) -> None:
+        super().__init__(
+            resource_key,
+            resource_file_path,
+            QtCore.QSize(
+                max(1, round(size.width() * device_pixel_ratio)),
+                max(1, round(size.height() * device_pixel_ratio)),
+            ),
+            device_pixel_ratio=device_pixel_ratio,
+        )
+        self._svg_renderer = svg_renderer
+        self._size = QtCore.QSize(size)
+        self._frame_interval = frame_interval
+        self._atlas_store = thumbnail_store
+        self._atlas_variant = thumbnail_variant
+
+    def createAtlas(self, atlas_image) -> SvgFrameAtlas:
+        """Create the atlas from the baked image, this must run on the GUI thread.
+        Args:
+            atlas_image (QtGui.QImage): The atlas image.
+        Returns:
+            SvgFrameAtlas: The atlas.
+        """
+        return SvgFrameAtlas(
+            self._svg_renderer, self._size, self._device_pixel_ratio, atlas_image
+        )
+
+    def run(self):
+        if self._cancelled:
+            return
+        start_time = time.perf_counter()
+        pixel_width = self._scaled_size.width()
+        pixel_height = self._scaled_size.height()
+        atlas_key = None
+        atlas_image = None
+        if self._atlas_store is not None:
+            atlas_key = self._atlas_store.thumbnailKey(
+                self._resource_file_path, pixel_width, pixel_height, self._atlas_variant
+            )
+        if atlas_key:
+            atlas_image = self._atlas_store.read(atlas_key)
+        if atlas_image is None:
+            try:
+                atlas_image = SvgFrameAtlas.renderAtlasImage(
+                    self._resource_file_path,
+                    pixel_width,
+                    pixel_height,
+                    self._frame_interval,
+                )
+            except OSError:
+                atlas_image = QtGui.QImage()
+            if atlas_key and not atlas_image.isNull():
+                self._atlas_store.write(atlas_key, atlas_image)
+        self._decode_time = time.perf_counter() - start_time
+        if self._cancelled:
+            return
+        self.signals.finished.emit(self._resource_key, atlas_image, self)
+
+
+class MipPyramid:
+    """A power of two mip chain of an image. Any target size is served
+    by the smallest level that still covers it, so drawing never scales
+    down by more than a factor of two and the source is never touched.
+    """
+
+    def __init__(self, images):
+        self._levels = [QtGui.QPixmap.fromImage(image) for image in images]
+
+    def levelCount(self) -> int:
+        """Get the level count.
+        Returns:
+            int: The level count.
+        """
+        return len(self._levels)
+
+    def level(self, level_index) -> QtGui.QPixmap:
+        """Get a level.
+        Args:
+            level_index (int): The level index, 0 is the largest level.
+        Returns:
+            QtGui.QPixmap: The level pixmap.
+        """
+        return self._levels[level_index]
+
+    def levelIndex(self, pixel_size: QtCore.QSize) -> int:
+        """Get the index of the smallest level that covers the size.
+        Args:
+            pixel_size (QtCore.QSize): The target size (in device pixels).
+        Returns:
+            int: The level index, 0 if no level covers the size.
+        """
+        for level_index in range(len(self._levels) - 1, 0, -1):
+            level = self._levels[level_index]
+            if (
+                level.width() >= pixel_size.width()
+                and level.height() >= pixel_size.height()
+            ):
+                return level_index
+        return 0
+
+    def levelForSize(self, pixel_size: QtCore.QSize) -> QtGui.QPixmap:
+        """Get the smallest level that covers the size.
+        Args:
+            pixel_size (QtCore.QSize): The target size (in device pixels).
+        Returns:
+            QtGui.QPixmap: The level pixmap.
+        """
+        return self._levels[self.levelIndex(pixel_size)]
+
+    def cacheBytes(self) -> int:
+        """Get the bytes of all levels.
+        Returns:
+            int: The byte count.
+        """
+        return sum(level.width() * level.height() * 4 for level in self._levels)
+
+
+class ImageSequence(QtCore.QObject):
+    """An image sequence (flipbook) resource. Frames are decoded ahead
+    of the playhead on worker threads into a bounded ring buffer. If
+    the frame at the playhead isn't decoded yet, the last decoded frame
+    is shown instead, so playback drops frames rather than stalling.
+    Frame patterns use either '#' (a '#' per padded digit) or
+    printf style '%d'/'%04d' tokens.
+    """
+
+    frameReady = QtCore.Signal(int, name="frameReady")
+
+    frame_token_regex = re.compile(r"#+|%0?(\d*)d")
+
+    def __init__(
+        self, frame_file_paths, thread_pool=None, buffer_size=24, parent=None
+    ) -> None:
+        super().__init__(parent)
+        self._frame_file_paths = list(frame_file_paths)
+        self._thread_pool = thread_pool or QtCore.QThreadPool.globalInstance()
+        self._buffer_size = max(1, buffer_size)
+        self._buffer = OrderedDict()
+        self._pending = {}
+        self._prefetch_frame_index = None
+        self._last_frame = None
+        self._dropped_frame_count = 0
+
+    @classmethod
+    def isPattern(cls, resource_name) -> bool:
+        """Check if the resource name is a frame pattern.
+        Args:
+            resource_name (str): The resource name.
+        Returns:
+            bool: The pattern state.
+        """
+        return bool(cls.frame_token_regex.search(os.path.basename(resource_name)))
+
+    @classmethod
+    def patternRegex(cls, file_name_pattern) -> re.Pattern:
+        """Convert a frame file name pattern to a regex.
+        The frame number is available as the 'frame' group.
+        Args:
+            file_name_pattern (str): The file name pattern.
+        Returns:
+            re.Pattern: The regex.
+        """
+        match = cls.frame_token_regex.search(file_name_pattern)
+        token = match.group(0)
+        if token.startswith("#"):
+            padding = len(token)
+        else:
+            padding = int(match.group(1) or 1)
+        return re.compile(
+            re.escape(file_name_pattern[: match.start()])
+            + r"(?P<frame>-?\d{%d,})" % padding
+            + re.escape(file_name_pattern[match.end() :])
+            + "$"
+        )
+
+    @classmethod
+    def matchFrames(cls, file_name_pattern, file_names) -> list[tuple[int, str]]:
+        """Match file names against a frame pattern.
+        Args:
+            file_name_pattern (str): The file name pattern.
+            file_names (Iterable[str]): The file names.
+        Returns:
+            list[tuple[int, str]]: The (frame number, file name) pairs, sorted by frame.
+        """
+        regex = cls.patternRegex(file_name_pattern)
+        frames = []
+        for file_name in file_names:
+            match = regex.match(file_name)
+            if match:
+                frames.append((int(match.group("frame")), file_name))
+        return sorted(frames)
+
+    def frameCount(self) -> int:
+        """Get the frame count.
+        Returns:
+            int: The frame count.
+        """
+        return len(self._frame_file_paths)
+
+    def frameFilePaths(self) -> list[str]:
+        """Get the frame file paths.
+        Returns:
+            list[str]: The file paths.
+        """
+        return list(self._frame_file_paths)
+
+    def bufferSize(self) -> int:
+        """Get the prefetch ring buffer size.
+        Returns:
+            int: The frame count.
+        """
+        return self._buffer_size
+
+    def droppedFrameCount(self) -> int:
+        """Get the count of frames that weren't decoded in time.
+        Returns:
+            int: The count.
+        """
+        return self._dropped_frame_count
+
+    def cacheBytes(self) -> int:
+        """Get the bytes of the decoded frames.
+        Returns:
+            int: The byte count.
+        """
+        return sum(
+            pixmap.width() * pixmap.height() * max(1, pixmap.depth() // 8)
+            for pixmap in self._buffer.values()
+        )
+
+    def playhead(self) -> int:
+        """Get the frame index at the current animation clock time.
+        Returns:
+            int: The frame index.
+        """
+        return getAnimationClock().frame(self.frameCount())
+
+    def currentFrame(self) -> QtGui.QPixmap:
+        """Get the frame at the playhead.
+        Returns:
+            QtGui.QPixmap: The frame pixmap or None if no frame is decoded yet.
+        """
+        return self.frame(self.playhead())
+
+    def frame(self, frame_index) -> QtGui.QPixmap:
+        """Get a frame and prefetch the frames after it.
+        Args:
+            frame_index (int): The frame index.
+        Returns:
+            QtGui.QPixmap: The frame pixmap or the last decoded frame
+                           if the frame isn't decoded yet.
+        """
+        if not self._frame_file_paths:
+            return None
+        self.prefetch(frame_index)
+        pixmap = self._buffer.get(frame_index, None)
+        if pixmap is None:
+            self._dropped_frame_count += 1
+            return self._last_frame
+        self._last_frame = pixmap
+        return pixmap
+
+    def prefetch(self, frame_index):
+        """Queue the decode of the ring buffer window starting
+        at the frame index and drop the frames outside of it.
+        Args:
+            frame_index (int): The frame index.
+        """
+        if frame_index == self._prefetch_frame_index:
+            return
+        self._prefetch_frame_index = frame_index
+        frame_count = self.frameCount()
+        window = [
+            (frame_index + offset) % frame_count
+            for offset in range(min(self._buffer_size, frame_count))
+        ]
+        window_set = set(window)
+        for buffered_frame_index in list(self._buffer):
+            if buffered_frame_index not in window_set:
+                self._buffer.pop(buffered_frame_index)
+        for pending_frame_index in list(self._pending):
+            if pending_frame_index not in window_set:
+                runnable = self._pending.pop(pending_frame_index)
+                runnable.cancel()
+                self._thread_pool.tryTake(runnable)
+        for window_frame_index in window:
+            if (
+                window_frame_index in self._buffer
+                or window_frame_index in self._pending
+            ):
+                continue
+            runnable = ImageDecodeRunnable(
+                str(window_frame_index), self._frame_file_paths[window_frame_index]
+            )
+            runnable.signals.finished.connect(self.onFrameDecoded)
+            self._pending[window_frame_index] = runnable
+            self._thread_pool.start(runnable)
+
+    def onFrameDecoded(self, frame_name, image, runnable):
+        """The background decode callback, this runs on the GUI thread.
+        Args:
+            frame_name (str): The frame index.
+            image (QtGui.QImage): The decoded image.
+            runnable (ImageDecodeRunnable): The finished runnable.
+        """
+        frame_index = int(frame_name)
+        if runnable.isCancelled() or self._pending.get(frame_index) is not runnable:
+            return
+        self._pending.pop(frame_index)
+        if image.isNull():
+            return
+        self._buffer[frame_index] = QtGui.QPixmap.fromImage(image)
+        self.frameReady.emit(frame_index)
+
+    def clear(self):
+        """Cancel all pending decodes and clear the ring buffer."""
+        for runnable in self._pending.values():
+            runnable.cancel()
+            self._thread_pool.tryTake(runnable)
+        self._pending.clear()
+        self._buffer.clear()
+        self._prefetch_frame_index = None
+        self._last_frame = None
+
+
+class ImageCache(MediaCache):
+    """The image cache. It serves pixmaps, svg renderers and image
+    sequences to the GUI thread and QImage payloads of raster images
+    to other threads. Svg renderers and image sequences requested off
+    the GUI thread are moved to it, so they can be drawn there.
+
+    Only QImages can be destroyed on any thread. Other resources that
+    are evicted or removed off the GUI thread are handed back to it and
+    released there, once its event loop processes the release request.
+    """
+
+    releaseRequested = QtCore.Signal(name="releaseRequested")
+    demoteRequested = QtCore.Signal(name="demoteRequested")
+
+    cold_header = struct.Struct("<IIIIdB")
+    cold_compression_level = 1
+
+    def __init__(self, parent=None) -> None:
+        super().__init__(parent)
+        self._release_queue = deque()
+        self.releaseRequested.connect(
+            self.onReleaseRequested, QtCore.Qt.QueuedConnection
+        )
+        self._demote_queue = deque()
+        self.demoteRequested.connect(
+            self.onDemoteRequested, QtCore.Qt.QueuedConnection
+        )
+        self._supported_resource_ext = (".svg", ".png", ".jpg", ".jpeg")
+        self._thread_pool = QtCore.QThreadPool(self)
+        self._placeholder = None
+        self._pending = {}
+        self._pending_users = {}
+        self._prefetch_queue = []
+        self._prefetch_entries = {}
+        self._prefetch_pending = set()
+        self._prefetch_counter = itertools.count()
+        self._thumbnail_store = None
+        self._decode_at_target_size = False
+        self._mipmapping = False
+        self._mipmap_max_size = 512
+        self._image_store = None
+
+    def threadPool(self) -> QtCore.QThreadPool:
+        """Get the thread pool used for background decoding.
+        Returns:
+            QtCore.QThreadPool: The thread pool.
+        """
+        return self._thread_pool
+
+    def thumbnailStore(self) -> ThumbnailStore:
+        """Get the persistent thumbnail store.
+        Returns:
+            ThumbnailStore: The store or None if disabled.
+        """
+        return self._thumbnail_store
+
+    def setThumbnailStore(self, store: ThumbnailStore):
+        """Set the persistent thumbnail store. Smooth scaled variants
+        are read from the store before decoding the source resource
+        and written to it in the background. Asynchronous lookups read
+        the store on the thread pool and decode missing raster variants
+        directly at their target size, unless the source is cached.
+        Args:
+            store (ThumbnailStore): The store, None disables it.
+        """
+        self._thumbnail_store = store
+
+    def sharedImageStore(self) -> SharedImageStore:
+        """Get the shared memory image store.
+        Returns:
+            SharedImageStore: The store or None if disabled.
+        """
+        return self._image_store
+
+    def setSharedImageStore(self, store: SharedImageStore):
+        """Set the shared memory image store. Raster images are then
+        decoded once per host and cached as QImages that reference the
+        shared pixel buffers, instead of a QPixmap copy per process.
+        Args:
+            store (SharedImageStore): The store, None disables it.
+        """
+        self._image_store = store
+
+    def readImage(self, resource_file_path, scaled_size=None) -> QtGui.QImage:
+        """Read an image file, through the shared image store if enabled.
+        This is safe to call from any thread.
+        Args:
+            resource_file_path (str): The image file path.
+            scaled_size (QtCore.QSize): The target size (in device pixels).
+        Returns:
+            QtGui.QImage: The image, null if the file couldn't be decoded.
+        """
+        if self._image_store is not None:
+            return self._image_store.readImage(resource_file_path, scaled_size)
+        return read_image(resource_file_path, scaled_size)
+
+    def isSharedImage(self, resource_object) -> bool:
+        """Check if the resource object references shared memory.
+        Args:
+            resource_object (Any): The resource object.
+        Returns:
+            bool: The shared state.
+        """
+        return self._image_store is not None and self._image_store.isSharedImage(
+            resource_object
+        )
+
+    def decodeAtTargetSize(self) -> bool:
+        """Get the decode at target size state.
+        Returns:
+            bool: The state.
+        """
+        return self._decode_at_target_size
+
+    def setDecodeAtTargetSize(self, state: bool):
+        """Set the decode at target size state. If enabled, raster
+        image variants are decoded directly at their target size
+        instead of scaling down the fully decoded source image.
+        Args:
+            state (bool): The state.
+        """
+        self._decode_at_target_size = state
+
+    def mipmapping(self) -> bool:
+        """Get the mipmapping state.
+        Returns:
+            bool: The state.
+        """
+        return self._mipmapping
+
+    def setMipmapping(self, state: bool):
+        """Set the mipmapping state. If enabled, raster image variants
+        are served from a mip pyramid that is built once per image,
+        so changing the requested size (e.g. zooming a view) never
+        decodes the source again or rescales it on the GUI thread.
+        Args:
+            state (bool): The state.
+        """
+        self._mipmapping = state
+
+    def mipmapMaxSize(self) -> int:
+        """Get the max mip pyramid base level size.
+        Returns:
+            int: The max width and height (in pixels).
+        """
+        return self._mipmap_max_size
+
+    def setMipmapMaxSize(self, size: int):
+        """Set the max mip pyramid base level size. Larger requests
+        are served by the (upscaled) base level. This only affects
+        pyramids that are built afterwards.
+        Args:
+            size (int): The max width and height (in pixels).
+        """
+        self._mipmap_max_size = size
+
+    def isResourceMipmapped(self, resource_name) -> bool:
+        """Check if the resource is served from a mip pyramid.
+        Args:
+            resource_name (str): The resource name.
+        Returns:
+            bool: The mipmapped state.
+        """
+        return (
+            self._mipmapping
+            and os.path.splitext(resource_name)[1] != ".svg"
+            and not ImageSequence.isPattern(resource_name)
+        )
+
+    def prefetchKey(
+        self,
+        resource_name,
+        size: QtCore.QSize = None,
+        device_pixel_ratio=1.0,
+        transform_mode=QtCore.Qt.SmoothTransformation,
+    ) -> Any:
+        """Get the cache key a prefetch of the resource produces.
+        Args:
+            resource_name (str): The resource name.
+            size (QtCore.QSize): The variant size (in logical pixels), if any.
+            device_pixel_ratio (float): The variant device pixel ratio.
+            transform_mode (Qt.TransformationMode): The variant transform mode.
+        Returns:
+            Any: The mip pyramid key if the resource is mipmapped, the
+                 variant key of raster images if a size is given else
+                 the (canonical) resource name.
+        """
+        resource_name = self.canonicalResourceName(resource_name, resolve=False)
+        if self.isResourceMipmapped(resource_name):
+            return (resource_name, MipPyramid)
+        if (
+            size is None
+            or os.path.splitext(resource_name)[1] == ".svg"
+            or ImageSequence.isPattern(resource_name)
+        ):
+            return resource_name
+        return self.resourceVariantKey(
+            resource_name, size, device_pixel_ratio, transform_mode
+        )
+
+    def placeholder(self) -> QtGui.QPixmap:
+        """Get the placeholder that is returned while a
+        resource is being decoded in the background.
+        Returns:
+            QtGui.QPixmap: The placeholder.
+        """
+        if self._placeholder is None:
+            self._placeholder = QtGui.QPixmap(1, 1)
+            self._placeholder.fill(QtCore.Qt.transparent)
+        return self._placeholder
+
+    def setPlaceholder(self, pixmap: QtGui.QPixmap):
+        """Set the placeholder that is returned while a
+        resource is being decoded in the background.
+        Args:
+            pixmap (QtGui.QPixmap): The placeholder.
+        """
+        self._placeholder = pixmap
+
+    def isResourcePending(self, resource_key) -> bool:
+        """Check if the resource is being decoded in the background.
+        Args:
+            resource_key (str | tuple): The resource name or variant key.
+        Returns:
+            bool: The pending state.
+        """
+        return resource_key in self._pending
+
+    def getResourceAsync(self, resource_name, track=True) -> Any:
+        """Get the resource object without blocking. If the resource
+        is not cached yet, it is decoded on the thread pool and the
+        placeholder is returned instead. Once the resource is cached,
+        the resourceReady signal is emitted. Svg files are cheap
+        to parse and image sequences prefetch their frames in the
+        background already, both are therefore allocated directly.
+        This must be called from the GUI thread.
+        Args:
+            resource_name (str): The resource name.
+            track (int): Increment the usage tracker.
+        Returns:
+            Any: The resource object, the placeholder or None
+                 if the resource doesn't exist.
+        """
+        # Unknown content is hashed on the thread pool instead.
+        resource_name = self.canonicalResourceName(resource_name, resolve=False)
+        resource = self._cache.get(resource_name, None)
+        if resource and track:
+            # Re-check under the lock, the resource may just have been evicted.
+            with self._lock:
+                resource = self._cache.get(resource_name, None)
+                if resource:
+                    resource["users"] += 1
+        if resource:
+            self.recordAccess(resource_name)
+            return resource["object"]
+
+        if resource_name in self._pending:
+            if track:
+                self._pending_users[resource_name] += 1
+            # The resource is in demand now, so it can't be cancelled as a prefetch.
+            self._prefetch_pending.discard(resource_name)
+            return self.placeholder()
+
+        resource_file_ext = os.path.splitext(resource_name)[1]
+        if resource_file_ext not in self._supported_resource_ext:
+            raise Exception(
+                f"Unsupported resource extension {resource_file_ext} | {resource_name}"
+            )
+        if resource_file_ext == ".svg" or ImageSequence.isPattern(resource_name):
+            return self.getResource(resource_name, track=track)
+
+        self.recordMiss(resource_name)
+        # Promoting from the cold tier is cheap enough to do it right away.
+        resource_object = self.promoteResource(resource_name, users=1 if track else 0)
+        if resource_object is not None:
+            return resource_object
+        resource_file_path = self.lookupResourcePath(resource_name)
+        if not resource_file_path:
+            return None
+
+        runnable = ImageDecodeRunnable(
+            resource_name,
+            resource_file_path,
+            image_store=self._image_store,
+            content_cache=self if self._content_dedup else None,
+        )
+        runnable.signals.finished.connect(self.onResourceDecoded)
+        self._pending[resource_name] = runnable
+        self._pending_users[resource_name] = 1 if track else 0
+        self._thread_pool.start(runnable)
+        return self.placeholder()
+
+    def cancelResourceAsync(self, resource_key) -> bool:
+        """Cancel a pending background decode.
+        Args:
+            resource_key (str | tuple): The resource name or variant key.
+        Returns:
+            bool: True if a pending decode was cancelled else False.
+        """
+        runnable = self._pending.pop(resource_key, None)
+        if runnable is None:
+            return False
+        self._pending_users.pop(resource_key, None)
+        self._prefetch_pending.discard(resource_key)
+        runnable.cancel()
+        self._thread_pool.tryTake(runnable)
+        self.processPrefetchQueue()
+        return True
+
+    def prefetch(
+        self,
+        resource_names,
+        priority=0,
+        size: QtCore.QSize = None,
+        device_pixel_ratio=1.0,
+        transform_mode=QtCore.Qt.SmoothTransformation,
+    ):
+        """Queue resources to be decoded in the background. Resources
+        with a higher priority are decoded first. Queueing an already
+        queued resource updates its priority. If a size is given, the
+        variant getResourceVariant returns for it is prefetched. Raster
+        variants are then decoded directly at their target size, so
+        drawing them doesn't scale the full resolution source on the
+        GUI thread. Svg files and image sequences prefetch their source.
+        Args:
+            resource_names (Iterable[str]): The resource names.
+            priority (float): The priority.
+            size (QtCore.QSize): The variant size (in logical pixels), if any.
+            device_pixel_ratio (float): The variant device pixel ratio.
+            transform_mode (Qt.TransformationMode): The variant transform mode.
+        """
+        variant = None
+        if size is not None:
+            variant = (QtCore.QSize(size), device_pixel_ratio, transform_mode)
+        for resource_name in resource_names:
+            resource_key = self.prefetchKey(
+                resource_name, size, device_pixel_ratio, transform_mode
+            )
+            if resource_key in self._cache or resource_key in self._pending:
+                continue
+            entry = self._prefetch_entries.get(resource_key, None)
+            if entry is not None:
+                if entry[0] == -priority:
+                    continue
+                # Invalidate the queued entry, the heap drops it lazily.
+                entry[2] = None
+            entry = [-priority, next(self._prefetch_counter), resource_name, variant]
+            self._prefetch_entries[resource_key] = entry
+            heapq.heappush(self._prefetch_queue, entry)
+        self.processPrefetchQueue()
+
+    def cancelPrefetch(self, resource_names=None):
+        """Remove resources from the prefetch queue and cancel their
+        background decodes (of any variant), unless something else
+        requested them.
+        Args:
+            resource_names (Iterable[str]): The resource names, all if None.
+        """
+        if resource_names is not None:
+            resource_names = {
+                self.canonicalResourceName(n, resolve=False) for n in resource_names
+            }
+        for resource_key, entry in list(self._prefetch_entries.items()):
+            resource_name = resource_key
+            if isinstance(resource_key, tuple):
+                resource_name = resource_key[0]
+            if resource_names is None or resource_name in resource_names:
+                self._prefetch_entries.pop(resource_key)
+                entry[2] = None
+        if not self._prefetch_entries:
+            self._prefetch_queue.clear()
+        for resource_key in list(self._prefetch_pending):
+            resource_name = resource_key
+            if isinstance(resource_key, tuple):
+                resource_name = resource_key[0]
+            if resource_names is None or resource_name in resource_names:
+                self.cancelResourceAsync(resource_key)
+
+    def prefetchQueueSize(self) -> int:
+        """Get the count of queued (not yet started) prefetches.
+        Returns:
+            int: The count.
+        """
+        return len(self._prefetch_entries)
+
+    def processPrefetchQueue(self):
+        """Start queued prefetches until the thread pool is saturated."""
+        max_active_count = max(1, self._thread_pool.maxThreadCount())
+        while self._prefetch_queue and len(self._prefetch_pending) < max_active_count:
+            _, _, resource_name, variant = heapq.heappop(self._prefetch_queue)
+            if resource_name is None:
+                continue
+            resource_key = self.prefetchKey(resource_name, *(variant or ()))
+            self._prefetch_entries.pop(resource_key, None)
+            if resource_key in self._cache or resource_key in self._pending:
+                continue
+            try:
+                if isinstance(resource_key, tuple) and resource_key[1] is MipPyramid:
+                    self.getResourceMipLevel(
+                        resource_name, QtCore.QSize(), asynchronous=True
+                    )
+                elif isinstance(resource_key, tuple):
+                    self.getResourceVariant(
+                        resource_name,
+                        *variant,
+                        asynchronous=True,
+                        decode_at_target_size=True,
+                    )
+                else:
+                    self.getResourceAsync(resource_name, track=False)
+            except Exception as exc:
+                LOG.warning(f"Failed to prefetch {resource_name} | {exc}")
+                continue
+            if resource_key in self._pending:
+                self._prefetch_pending.add(resource_key)
+
+    def onResourceDecoded(self, resource_key, image, runnable):
+        """The background decode callback, this runs on the GUI thread.
+        Args:
+            resource_key (str | tuple): The resource name, variant
+                                        or mip pyramid key.
+            image (QtGui.QImage | list[QtGui.QImage]): The decoded
+                                                       image or mip levels.
+            runnable (ImageDecodeRunnable): The finished runnable.
+        """
+        if runnable.isCancelled() or self._pending.get(resource_key) is not runnable:
+            return
+        self._pending.pop(resource_key)
+        users = self._pending_users.pop(resource_key, 0)
+        self._prefetch_pending.discard(resource_key)
+        self.recordDecodeTime(resource_key, runnable.decodeTime())
+        content_digest = runnable.contentDigest()
+        if content_digest is not None:
+            resource_name = resource_key
+            if isinstance(resource_key, tuple):
+                resource_name = resource_key[0]
+            canonical_name = self.registerContentAlias(
+                resource_name, content_digest, runnable.resourceFilePath()
+            )
+            canonical_key = canonical_name
+            if isinstance(resource_key, tuple):
+                # Variants are cached per content as well.
+                canonical_key = (canonical_name,) + resource_key[1:]
+            if canonical_key != resource_key:
+                # Another name with the same content was requested first.
+                with self._lock:
+                    resource = self._cache.get(canonical_key, None)
+                    if resource:
+                        resource["users"] += users
+                if resource or image.isNull():
+                    if self.isSharedImage(image):
+                        self._image_store.releaseImage(image)
+                    if resource or isinstance(resource_key, tuple):
+                        # Variant requests are re-issued under the canonical name.
+                        for alias_name in self.contentAliases(canonical_name):
+                            self.resourceReady.emit(alias_name)
+                    else:
+                        # The shared copy was evicted in the meantime.
+                        self.getResourceAsync(canonical_name, track=False)
+                        if canonical_name in self._pending_users:
+                            self._pending_users[canonical_name] += users
+                    self.processPrefetchQueue()
+                    return
+                resource_key = canonical_key
+        if isinstance(image, list):
+            # Mip levels, empty if the file couldn't be decoded.
+            resource_object = MipPyramid(image) if image else None
+        elif isinstance(runnable, SvgAtlasRunnable):
+            resource_object = None if image.isNull() else runnable.createAtlas(image)
+        elif self.isSharedImage(image):
+            # Keep referencing the shared pixels instead of copying them.
+            resource_object = image
+        elif not image.isNull():
+            resource_object = QtGui.QPixmap.fromImage(image)
+            resource_object.setDevicePixelRatio(image.devicePixelRatio())
+        else:
+            resource_object = None
+        if resource_object is not None:
+            self.insertResource(resource_key, resource_object, users=users)
+            resource_name = resource_key
+            if isinstance(resource_key, tuple):
+                resource_name = resource_key[0]
+            for alias_name in self.contentAliases(resource_name):
+                self.resourceReady.emit(alias_name)
+        self.processPrefetchQueue()
+
+    def isGuiThreadResource(self, resource_name) -> bool:
+        """Check if a resource is served as a GUI thread object
+        to all threads, as it has no QImage payload.
+        Args:
+            resource_name (str): The resource name.
+        Returns:
+            bool: True for svg files and image sequence patterns.
+        """
+        return (
+            os.path.splitext(resource_name)[1] == ".svg"
+            or ImageSequence.isPattern(resource_name)
+        )
+
+    def getResource(self, resource_name, track=True, resource_file_path=None) -> Any:
+        """Get the resource object. QPixmaps can only be used on the
+        GUI thread, other threads get the QImage payload of raster
+        images instead. Svg renderers and image sequences are returned
+        to all threads, they are owned by the GUI thread though.
+        Args:
+            resource_name (str): The resource name.
+            track (int): Increment the usage tracker.
+            resource_file_path (str): The already resolved file path, if any.
+        Returns:
+            Any: The resource object.
+        """
+        if not is_gui_thread() and not self.isGuiThreadResource(resource_name):
+            return self.getImage(
+                resource_name, track=track, resource_file_path=resource_file_path
+            )
+        canonical_name, resource_file_path = self.resolveCanonicalResource(
+            resource_name, resource_file_path
+        )
+        if canonical_name not in self._cache:
+            # Promote an already decoded payload instead of decoding again.
+            image_resource = self._cache.get((canonical_name, QtGui.QImage), None)
+            if image_resource:
+                pixmap = QtGui.QPixmap.fromImage(image_resource["object"])
+                with self._lock:
+                    if canonical_name not in self._cache:
+                        self.recordMiss(canonical_name)
+                        self.insertResource(
+                            canonical_name, pixmap, users=1 if track else 0
+                        )
+                        return pixmap
+        return super().getResource(
+            resource_name, track=track, resource_file_path=resource_file_path
+        )
+
+    def getImage(
+        self, resource_name, track=True, resource_file_path=None
+    ) -> QtGui.QImage:
+        """Get the QImage payload of a raster resource. This is safe
+        to call from any thread. Payloads are cached separately from
+        the GUI thread pixmaps under the (resource_name, QImage) key.
+        Args:
+            resource_name (str): The resource name.
+            track (int): Increment the usage tracker.
+            resource_file_path (str): The already resolved file path, if any.
+        Returns:
+            QtGui.QImage: The image or None if the resource doesn't exist.
+        """
+        requested_resource_name = resource_name
+        resource_name, resource_file_path = self.resolveCanonicalResource(
+            resource_name, resource_file_path
+        )
+        image_key = (resource_name, QtGui.QImage)
+        resource = self._cache.get(image_key, None)
+        if resource and track:
+            with self._lock:
+                resource = self._cache.get(image_key, None)
+                if resource:
+                    resource["users"] += 1
+        if resource:
+            self.recordAccess(image_key)
+            return resource["object"]
+
+        resource_file_ext = os.path.splitext(resource_name)[1]
+        if self.isGuiThreadResource(resource_name):
+            raise Exception(
+                f"Resource has no image payload, use getResource | {resource_name}"
+            )
+        if resource_file_ext not in (".png", ".jpg", ".jpeg"):
+            raise Exception(
+                f"Unsupported image extension {resource_file_ext} | {resource_name}"
+            )
+        self.recordMiss(image_key)
+        image = self.promoteResource(image_key, users=1 if track else 0)
+        if image is not None:
+            return image
+        if resource_file_path is None:
+            resource_file_path = self.lookupResourcePath(requested_resource_name)
+        if not resource_file_path:
+            return None
+        start_time = time.perf_counter()
+        image = self.readImage(resource_file_path)
+        self.recordDecodeTime(image_key, time.perf_counter() - start_time)
+        if image.isNull():
+            return None
+        with self._lock:
+            resource = self._cache.get(image_key, None)
+            if resource:
+                if track:
+                    resource["users"] += 1
+                if self.isSharedImage(image):
+                    self._image_store.releaseImage(image)
+                return resource["object"]
+            self.insertResource(image_key, image, users=1 if track else 0)
+        return image
+
+    def getResourceVariant(
+        self,
+        resource_name,
+        size: QtCore.QSize,
+        device_pixel_ratio=1.0,
+        transform_mode=QtCore.Qt.SmoothTransformation,
+        asynchronous=False,
+        decode_at_target_size=None,
+    ) -> Any:
+        """Get a pre-scaled pixmap variant of the resource. Each variant
+        is rasterized once and shared, so it can be drawn without any
+        further scaling. Animated svgs are baked into a frame atlas.
+        Args:
+            resource_name (str): The resource name.
+            size (QtCore.QSize): The target size (in logical pixels).
+            device_pixel_ratio (float): The device pixel ratio.
+            transform_mode (Qt.TransformationMode): The transform mode.
+            asynchronous (bool): Decode the source resource in the background.
+            decode_at_target_size (bool): Decode raster images directly at
+                                          the target size, None uses the
+                                          cache's decodeAtTargetSize state.
+        Returns:
+            Any: The pixmap variant, the svg frame atlas, the image sequence,
+                 the placeholder or None if the resource doesn't exist.
+                 Mipmapped resources return the nearest mip level instead.
+        """
+        resource_name = self.canonicalResourceName(
+            resource_name, resolve=not asynchronous
+        )
+        if self.isResourceMipmapped(resource_name):
+            return self.getResourceMipLevel(
+                resource_name, size, device_pixel_ratio, asynchronous
+            )
+        variant_key = self.resourceVariantKey(
+            resource_name, size, device_pixel_ratio, transform_mode
+        )
+        variant = self._cache.get(variant_key, None)
+        if variant:
+            self.recordAccess(variant_key)
+            return variant["object"]
+        # Repaints while the variant or its source decode are no new lookups.
+        if variant_key in self._pending:
+            self._prefetch_pending.discard(variant_key)
+            return self.placeholder()
+        if asynchronous and resource_name in self._pending:
+            self._prefetch_pending.discard(resource_name)
+            return self.placeholder()
+
+        # The miss is recorded once, either for the variant or by the
+        # lookup of its (not yet cached) source below.
+        variant_object = self.promoteResource(variant_key)
+        if variant_object is not None:
+            self.recordMiss(variant_key)
+            return variant_object
+        pixel_width = max(1, round(size.width() * device_pixel_ratio))
+        pixel_height = max(1, round(size.height() * device_pixel_ratio))
+        thumbnail_key = None
+        use_thumbnail_store = (
+            self._thumbnail_store is not None
+            and transform_mode == QtCore.Qt.SmoothTransformation
+            and not ImageSequence.isPattern(resource_name)
+        )
+        is_svg = os.path.splitext(resource_name)[1] == ".svg"
+        if use_thumbnail_store and asynchronous:
+            if not is_svg and resource_name not in self._cache:
+                # The store is read on the thread pool, misses are decoded there.
+                self.recordMiss(variant_key)
+                return self.decodeResourceVariant(
+                    variant_key,
+                    QtCore.QSize(pixel_width, pixel_height),
+                    asynchronous=True,
+                )
+        elif use_thumbnail_store:
+            resource_file_path = self.lookupResourcePath(resource_name)
+            if resource_file_path:
+                thumbnail_key = self._thumbnail_store.thumbnailKey(
+                    resource_file_path, pixel_width, pixel_height
+                )
+            if thumbnail_key:
+                image = self._thumbnail_store.read(thumbnail_key)
+                if image is not None:
+                    self.recordMiss(variant_key)
+                    variant_object = QtGui.QPixmap.fromImage(image)
+                    variant_object.setDevicePixelRatio(device_pixel_ratio)
+                    self.insertResource(variant_key, variant_object)
+                    return variant_object
+
+        if decode_at_target_size is None:
+            decode_at_target_size = self._decode_at_target_size
+        if (
+            decode_at_target_size
+            and resource_name not in self._cache
+            and not is_svg
+            and not ImageSequence.isPattern(resource_name)
+        ):
+            # Skip the full resolution source, it is never cached.
+            self.recordMiss(variant_key)
+            return self.decodeResourceVariant(
+                variant_key,
+                QtCore.QSize(pixel_width, pixel_height),
+                asynchronous=asynchronous,
+                thumbnail_key=thumbnail_key,
+            )
+
+        source = self._cache.get(resource_name, None)
+        if source:
+            self.recordMiss(variant_key)
+            self.touchResource(resource_name)
+            resource_object = source["object"]
+        elif asynchronous:
+            resource_object = self.getResourceAsync(resource_name, track=False)
+            if self.isResourcePending(resource_name):
+                return resource_object
+        else:
+            resource_object = self.getResource(resource_name, track=False)
+        if resource_object is None:
+            return None
+
+        if isinstance(resource_object, QtSvg.QSvgRenderer):
+            if resource_object.animated():
+                frame_interval = getAnimationClock().frameInterval()
+                svg_file_path = self.lookupResourcePath(resource_name)
+                if not svg_file_path:
+                    return None
+                if asynchronous:
+                    return self.bakeResourceAtlas(
+                        variant_key,
+                        resource_object,
+                        svg_file_path,
+                        size,
+                        frame_interval,
+                        use_thumbnail_store,
+                    )
+                atlas_key = None
+                atlas_image = None
+                if use_thumbnail_store:
+                    atlas_key = self._thumbnail_store.thumbnailKey(
+                        svg_file_path,
+                        pixel_width,
+                        pixel_height,
+                        SvgFrameAtlas.thumbnailVariant(resource_object, frame_interval),
+                    )
+                if atlas_key:
+                    atlas_image = self._thumbnail_store.read(atlas_key)
+                if atlas_image is None:
+                    atlas_image = SvgFrameAtlas.renderAtlasImage(
+                        svg_file_path, pixel_width, pixel_height, frame_interval
+                    )
+                    if atlas_key:
+                        self._thread_pool.start(
+                            ThumbnailWriteRunnable(
+                                self._thumbnail_store, atlas_key, atlas_image
+                            )
+                        )
+                atlas = SvgFrameAtlas(
+                    resource_object, size, device_pixel_ratio, atlas_image
+                )
+                self.insertResource(variant_key, atlas)
+                return atlas
+            if use_thumbnail_store and asynchronous:
+                # Static svgs are read from the store or rendered in the background.
+                return self.decodeResourceVariant(
+                    variant_key,
+                    QtCore.QSize(pixel_width, pixel_height),
+                    asynchronous=True,
+                )
+            variant_object = QtGui.QPixmap.fromImage(
+                render_svg_image(resource_object, pixel_width, pixel_height)
+            )
+        elif isinstance(resource_object, QtGui.QPixmap):
+            variant_object = resource_object.scaled(
+                pixel_width,
+                pixel_height,
+                QtCore.Qt.IgnoreAspectRatio,
+                transform_mode,
+            )
+        elif isinstance(resource_object, QtGui.QImage):
+            variant_object = QtGui.QPixmap.fromImage(
+                resource_object.scaled(
+                    pixel_width,
+                    pixel_height,
+                    QtCore.Qt.IgnoreAspectRatio,
+                    transform_mode,
+                )
+            )
         else:
-            self._search_dir_paths.remove(dir_path)
-            self._search_dir_paths.append(dir_path)
+            return resource_object
+        variant_object.setDevicePixelRatio(device_pixel_ratio)
+        self.insertResource(variant_key, variant_object)
+        if thumbnail_key:
+            self._thread_pool.start(
+                ThumbnailWriteRunnable(
+                    self._thumbnail_store, thumbnail_key, variant_object.toImage()
+                )
+            )
+        return variant_object
 
-    def removeSearchPath(self, dir_path) -> bool:
-        """Remove a search path directory.
+    def bakeResourceAtlas(
+        self,
+        variant_key,
+        svg_renderer,
+        svg_file_path,
+        size: QtCore.QSize,
+        frame_interval,
+        use_thumbnail_store=False,
+    ) -> QtGui.QPixmap:
+        """Bake an animated svg into a frame atlas in the background.
         Args:
-            dir_path (str): The directory to add.
+            variant_key (tuple): The variant key.
+            svg_renderer (QtSvg.QSvgRenderer): The cached svg renderer.
+            svg_file_path (str): The svg file path.
+            size (QtCore.QSize): The frame size (in logical pixels).
+            frame_interval (float): The frame interval in seconds.
+            use_thumbnail_store (bool): Read and write the atlas
+                                        from and to the thumbnail store.
         Returns:
-            bool: True if the directory was in the search path else False
+            QtGui.QPixmap: The placeholder.
         """
-        if dir_path in self._search_dir_paths:
-            self._search_dir_paths.remove(dir_path)
-            return True
-        return False
+        thumbnail_variant = ""
+        if use_thumbnail_store:
+            thumbnail_variant = SvgFrameAtlas.thumbnailVariant(
+                svg_renderer, frame_interval
+            )
+        runnable = SvgAtlasRunnable(
+            variant_key,
+            svg_file_path,
+            svg_renderer,
+            size,
+            variant_key[3],
+            frame_interval,
+            thumbnail_store=self._thumbnail_store if use_thumbnail_store else None,
+            thumbnail_variant=thumbnail_variant,
+        )
+        runnable.signals.finished.connect(self.onResourceDecoded)
+        self._pending[variant_key] = runnable
+        self._pending_users[variant_key] = 0
+        self._thread_pool.start(runnable)
+        return self.placeholder()
 
-    def supportedResourceExtensions(self) -> list[str]:
-        """The list of supported file formats.
+    def resourceVariantKey(
+        self,
+        resource_name,
+        size: QtCore.QSize,
+        device_pixel_ratio=1.0,
+        transform_mode=QtCore.Qt.SmoothTransformation,
+    ) -> Any:
+        """Get the key the object returned by getResourceVariant is
+        cached under, e.g. to pin it with acquireResourceHandle.
+        Args:
+            resource_name (str): The resource name.
+            size (QtCore.QSize): The target size (in logical pixels).
+            device_pixel_ratio (float): The device pixel ratio.
+            transform_mode (Qt.TransformationMode): The transform mode.
         Returns:
-            list[str]: The supported extensions.
+            Any: The resource key.
         """
-        return self._supported_resource_ext
+        resource_name = self.canonicalResourceName(resource_name, resolve=False)
+        if self.isResourceMipmapped(resource_name):
+            return (resource_name, MipPyramid)
+        if ImageSequence.isPattern(resource_name):
+            return resource_name
+        return (
+            resource_name,
+            size.width(),
+            size.height(),
+            device_pixel_ratio,
+            transform_mode,
+        )
 
-    def isResourceSupported(self, resource_name):
-        """Check if the resource is supported (purely by extension).
+    def getResourceMipLevel(
+        self,
+        resource_name,
+        size: QtCore.QSize,
+        device_pixel_ratio=1.0,
+        asynchronous=False,
+    ) -> Any:
+        """Get the smallest mip level of the resource that covers the size.
+        The mip pyramid is built once and then serves any size.
         Args:
             resource_name (str): The resource name.
+            size (QtCore.QSize): The target size (in logical pixels).
+            device_pixel_ratio (float): The device pixel ratio.
+            asynchronous (bool): Build the mip pyramid in the background.
         Returns:
-            bool: The support state.
+            Any: The mip level pixmap, the placeholder or None
+                 if the resource doesn't exist.
         """
-        resource_file_ext = os.path.splitext(resource_name)[1]
-        return resource_file_ext in self._supported_resource_ext
+        pyramid_key = (resource_name, MipPyramid)
+        pixel_size = QtCore.QSize(
+            round(size.width() * device_pixel_ratio),
+            round(size.height() * device_pixel_ratio),
+        )
+        pyramid = self._cache.get(pyramid_key, None)
+        if pyramid:
+            self.recordAccess(pyramid_key)
+            return pyramid["object"].levelForSize(pixel_size)
+        if pyramid_key in self._pending:
+            # The pyramid is in demand now, so it can't be cancelled as a prefetch.
+            self._prefetch_pending.discard(pyramid_key)
+            return self.placeholder()
 
-    def getResource(self, resource_name, track=True) -> Any:
-        """Get the resource object.
+        self.recordMiss(pyramid_key)
+        resource_file_path = self.lookupResourcePath(resource_name)
+        if not resource_file_path:
+            return None
+
+        if asynchronous:
+            runnable = MipPyramidRunnable(
+                pyramid_key, resource_file_path, self._mipmap_max_size
+            )
+            runnable.signals.finished.connect(self.onResourceDecoded)
+            self._pending[pyramid_key] = runnable
+            self._pending_users[pyramid_key] = 0
+            self._thread_pool.start(runnable)
+            return self.placeholder()
+
+        start_time = time.perf_counter()
+        levels = read_mip_levels(resource_file_path, self._mipmap_max_size)
+        self.recordDecodeTime(pyramid_key, time.perf_counter() - start_time)
+        if not levels:
+            return None
+        pyramid = MipPyramid(levels)
+        self.insertResource(pyramid_key, pyramid)
+        return pyramid.levelForSize(pixel_size)
+
+    def decodeResourceVariant(
+        self, variant_key, pixel_size, asynchronous=False, thumbnail_key=None
+    ) -> Any:
+        """Decode a raster image variant directly at its pixel size.
+        Asynchronous decodes read and write the thumbnail store
+        on the thread pool, this also renders static svg variants.
         Args:
-            resource_name (str): The resource name.
-            track (int): Increment the usage tracker.
+            variant_key (tuple): The variant key.
+            pixel_size (QtCore.QSize): The target size (in device pixels).
+            asynchronous (bool): Decode the variant in the background.
+            thumbnail_key (str): The thumbnail store key of synchronous
+                                 decodes, if any.
         Returns:
-            Any: The resource object.
+            Any: The pixmap variant, the placeholder or None
+                 if the resource doesn't exist.
         """
-        resource = self._cache.get(resource_name, None)
-        if resource:
-            if track:
-                resource["users"] += 1
-            return resource["object"]
+        if variant_key in self._pending:
+            # The variant is in demand now, so it can't be cancelled as a prefetch.
+            self._prefetch_pending.discard(variant_key)
+            return self.placeholder()
+        resource_name, device_pixel_ratio = variant_key[0], variant_key[3]
+        resource_file_path = self.lookupResourcePath(resource_name)
+        if not resource_file_path:
+            return None
 
-        resource_file_ext = os.path.splitext(resource_name)[1]
-        if resource_file_ext not in self._supported_resource_ext:
-            raise Exception(
-                f"Unsupported resource extension {resource_file_ext} | {resource_name}"
+        if asynchronous:
+            # Unknown content is hashed on the thread pool as well.
+            content_cache = None
+            if self._content_dedup and resource_name not in self._content_aliases:
+                content_cache = self
+            thumbnail_store = None
+            if variant_key[4] == QtCore.Qt.SmoothTransformation:
+                thumbnail_store = self._thumbnail_store
+            runnable = ImageDecodeRunnable(
+                variant_key,
+                resource_file_path,
+                pixel_size,
+                device_pixel_ratio=device_pixel_ratio,
+                image_store=self._image_store,
+                content_cache=content_cache,
+                thumbnail_store=thumbnail_store,
             )
+            runnable.signals.finished.connect(self.onResourceDecoded)
+            self._pending[variant_key] = runnable
+            self._pending_users[variant_key] = 0
+            self._thread_pool.start(runnable)
+            return self.placeholder()
 
-        resource_file_path = None
-        for search_dir_path in self._search_dir_paths[::-1]:
-            search_file_path = os.path.join(search_dir_path, resource_name)
-            if os.path.isfile(search_file_path):
-                resource_file_path = search_file_path
-                break
-        if not resource_file_path:
+        start_time = time.perf_counter()
+        image = self.readImage(resource_file_path, pixel_size)
+        self.recordDecodeTime(variant_key, time.perf_counter() - start_time)
+        if image.isNull():
             return None
+        if self.isSharedImage(image):
+            variant_object = image
+        else:
+            variant_object = QtGui.QPixmap.fromImage(image)
+        variant_object.setDevicePixelRatio(device_pixel_ratio)
+        self.insertResource(variant_key, variant_object)
+        if thumbnail_key:
+            self._thread_pool.start(
+                ThumbnailWriteRunnable(self._thumbnail_store, thumbnail_key, image)
+            )
+        return variant_object
 
-        self._cache[resource_name] = {
-            "object": self.allocateResource(resource_file_path),
-            "users": 1,
-        }
-        return self._cache[resource_name]["object"]
+    def resolveResourcePath(self, resource_name) -> str:
+        """Resolve the resource name to a file path
+        by checking the search paths (last added wins).
+        Image sequence patterns resolve to the pattern
+        path in the search path that contains frames.
+        Args:
+            resource_name (str): The resource name.
+        Returns:
+            str: The file path or None if not found.
+        """
+        if not ImageSequence.isPattern(resource_name):
+            return super().resolveResourcePath(resource_name)
+        frame_file_paths = self.resolveSequenceFramePaths(resource_name)
+        if not frame_file_paths:
+            return None
+        return os.path.join(
+            os.path.dirname(frame_file_paths[0]), os.path.basename(resource_name)
+        )
+
+    def resolveSequenceFramePaths(self, resource_name) -> list[str]:
+        """Resolve the frame file paths of an image sequence pattern.
+        Frames are resolved per frame number, so frames in later
+        added search paths win over frames in earlier ones.
+        Args:
+            resource_name (str): The resource name (or pattern file path).
+        Returns:
+            list[str]: The frame file paths, sorted by frame number.
+        """
+        if os.path.isabs(resource_name):
+            dir_path, file_name_pattern = os.path.split(resource_name)
+            frames = ImageSequence.matchFrames(
+                file_name_pattern, self.listSearchPath(dir_path)
+            )
+            return [os.path.join(dir_path, file_name) for _, file_name in frames]
+        if os.path.basename(resource_name) == resource_name:
+            frames = ImageSequence.matchFrames(resource_name, self._search_index)
+            return [self._search_index[file_name] for _, file_name in frames]
+        relative_dir_path, file_name_pattern = os.path.split(resource_name)
+        for search_dir_path in self._search_dir_paths[::-1]:
+            dir_path = os.path.join(search_dir_path, relative_dir_path)
+            frames = ImageSequence.matchFrames(
+                file_name_pattern, self.listSearchPath(dir_path)
+            )
+            if frames:
+                return [os.path.join(dir_path, file_name) for _, file_name in frames]
+        return []
 
     def allocateResource(self, resource_file_path):
         """Allocate the resource object.
@@ -95,25 +4046,181 @@ class MediaCache:
         Returns:
             Any: The resource object.
         """
-        raise NotImplementedError
+        resource_file_ext = os.path.splitext(resource_file_path)[1]
+        if ImageSequence.isPattern(resource_file_path):
+            resource_object = ImageSequence(
+                self.resolveSequenceFramePaths(resource_file_path),
+                thread_pool=self._thread_pool,
+            )
+        elif resource_file_ext == ".svg":
+            svg_renderer = QtSvg.QSvgRenderer(resource_file_path)
+            if svg_renderer.animated():
+                svg_renderer.setFramesPerSecond(get_frames_per_second() * 1000)
+            resource_object = svg_renderer
+        elif resource_file_ext.endswith((".png", ".jpg", ".jpeg")):
+            if self._image_store is not None:
+                resource_object = self._image_store.readImage(resource_file_path)
+            else:
+                resource_object = QtGui.QPixmap(resource_file_path)
+        if isinstance(resource_object, QtCore.QObject) and not is_gui_thread():
+            resource_object.moveToThread(QtCore.QCoreApplication.instance().thread())
+        return resource_object
+
+    def acquireResource(self, resource_name, clear=False) -> MediaResourceHandle:
+        """Get the resource object bound to a handle. Other threads than
+        the GUI thread get a handle of the QImage payload of raster
+        images instead.
+        Args:
+            resource_name (str): The resource name.
+            clear (bool): If True, remove the resource from the cache
+                          once the last tracked user released it.
+        Returns:
+            MediaResourceHandle: The handle or None if the resource doesn't exist.
+        """
+        if is_gui_thread() or self.isGuiThreadResource(resource_name):
+            return super().acquireResource(resource_name, clear=clear)
+        image = self.getImage(resource_name, track=True)
+        if image is None:
+            return None
+        image_key = (self.canonicalResourceName(resource_name), QtGui.QImage)
+        return MediaResourceHandle(self, image_key, image, clear=clear)
 
     def releaseResource(self, resource_name, clear=True):
         """Release the resource object. If no tracked
         users are found, optionally remove the object
-        from the cache.
+        from the cache. Resources that are still being
+        decoded in the background are released as well.
+        Other threads than the GUI thread release the
+        QImage payload of raster images they got.
         Args:
-            resource_file_path (str): The resource file path.
+            resource_name (str): The resource name.
             clear (bool): If True and no users are found, remove
                           the resource from the cache.
+        """
+        resource_key = self.canonicalResourceName(resource_name, resolve=False)
+        if (
+            isinstance(resource_key, str)
+            and not is_gui_thread()
+            and not self.isGuiThreadResource(resource_key)
+        ):
+            super().releaseResource((resource_key, QtGui.QImage), clear=clear)
+            return
+        if resource_key not in self._cache and resource_key in self._pending_users:
+            self._pending_users[resource_key] = max(
+                0, self._pending_users[resource_key] - 1
+            )
+            return
+        super().releaseResource(resource_name, clear=clear)
+
+    def demoteResource(self, resource_key, resource_object) -> bool:
+        """Queue a pixmap or image to be compressed into the cold tier.
+        Pixmaps are converted to images on the GUI thread first, once its
+        event loop processes the demotion request, so neither the
+        conversion nor the compression runs under the cache lock.
+        Args:
+            resource_key (Any): The resource key.
+            resource_object (Any): The resource object.
         Returns:
-            Any: The resource object.
+            bool: True if the resource was queued else False.
         """
-        resource = self._cache.get(resource_name, None)
-        if resource is None:
-            raise Exception(f"Resource {resource_name} not found!")
-        resource["users"] = max(0, resource["users"] - 1)
-        if clear and resource["users"] == 0:
-            self._cache.pop(resource_name)
+        if not self._cold_max_bytes:
+            return False
+        if isinstance(resource_object, QtGui.QPixmap):
+            self._demote_queue.append((resource_key, resource_object))
+            self.demoteRequested.emit()
+            return True
+        if not isinstance(resource_object, QtGui.QImage):
+            return False
+        return super().demoteResource(resource_key, resource_object)
+
+    def onDemoteRequested(self):
+        """Convert the queued pixmaps and compress them
+        on the thread pool, this runs on the GUI thread.
+        """
+        while self._demote_queue:
+            resource_key, pixmap = self._demote_queue.popleft()
+            if resource_key in self._cache:
+                continue
+            QtCore.QThreadPool.globalInstance().start(
+                MediaDemoteRunnable(self, resource_key, pixmap.toImage(), True)
+            )
+
+    def compressResource(self, resource_object, is_pixmap=None) -> bytes:
+        """Compress pixmaps and images to zlib compressed raw pixels.
+        Pixmaps can only be read back on the GUI thread.
+        Args:
+            resource_object (Any): The resource object.
+            is_pixmap (bool): Restore the image as a pixmap, e.g. if it was
+                              converted from a pixmap on the GUI thread.
+        Returns:
+            bytes: The compressed data or None if the
+                   resource can't be compressed.
+        """
+        if is_pixmap is None:
+            is_pixmap = isinstance(resource_object, QtGui.QPixmap)
+        if isinstance(resource_object, QtGui.QPixmap):
+            if not is_gui_thread():
+                return None
+            image = resource_object.toImage()
+        elif isinstance(resource_object, QtGui.QImage):
+            image = resource_object
+        else:
+            return None
+        if image.isNull():
+            return None
+        header = self.cold_header.pack(
+            image.width(),
+            image.height(),
+            image.bytesPerLine(),
+            enum_to_int(image.format()),
+            image.devicePixelRatio(),
+            is_pixmap,
+        )
+        pixel_data = bytes(image.constBits())[: image.bytesPerLine() * image.height()]
+        return header + zlib.compress(pixel_data, self.cold_compression_level)
+
+    def decompressResource(self, data: bytes) -> Any:
+        """Restore a pixmap or image from the cold tier.
+        Args:
+            data (bytes): The compressed data.
+        Returns:
+            Any: The resource object or None if it can't be restored.
+        """
+        width, height, bytes_per_line, image_format, device_pixel_ratio, is_pixmap = (
+            self.cold_header.unpack_from(data)
+        )
+        if is_pixmap and not is_gui_thread():
+            return None
+        pixel_data = zlib.decompress(memoryview(data)[self.cold_header.size :])
+        image = QtGui.QImage(
+            pixel_data, width, height, bytes_per_line, QtGui.QImage.Format(image_format)
+        )
+        # Detach from the python buffer.
+        image = image.copy()
+        image.setDevicePixelRatio(device_pixel_ratio)
+        if not is_pixmap:
+            return image
+        pixmap = QtGui.QPixmap.fromImage(image)
+        pixmap.setDevicePixelRatio(device_pixel_ratio)
+        return pixmap
+
+    def removeResource(self, resource_key, evicted=False):
+        """Remove a resource from the cache regardless of its users.
+        Shared images are given back to the shared image store.
+        Args:
+            resource_key (Any): The resource key.
+            evicted (bool): If True, the removal was caused by the budget.
+        Returns:
+            bool: True if the resource was cached else False.
+        """
+        with self._lock:
+            resource = self._cache.get(resource_key, None)
+            removed = super().removeResource(resource_key, evicted=evicted)
+            if removed:
+                if self.isSharedImage(resource["object"]):
+                    self._image_store.releaseImage(resource["object"])
+                self.queueGuiThreadRelease([resource["object"]])
+        return removed
 
     def clearResources(self, force=False):
         """Clear resources. If force is False, only
@@ -122,25 +4229,105 @@ class MediaCache:
             force (bool): If True remove all resources regardless
                           of the usage state. This can lead
                           to memory leaks.
-        Returns:
-            Any: The resource object.
         """
-        if force:
-            self._cache.clear()
+        with self._lock:
+            if force:
+                resource_objects = [r["object"] for r in self._cache.values()]
+                if self._image_store is not None:
+                    for resource_object in resource_objects:
+                        self._image_store.releaseImage(resource_object)
+                self.queueGuiThreadRelease(resource_objects)
+            super().clearResources(force=force)
+
+    def queueGuiThreadRelease(self, resource_objects):
+        """Keep resources that were removed off the GUI thread alive
+        until the GUI thread released them. Dropping the last reference
+        of a QPixmap (or a QObject living on the GUI thread) on another
+        thread isn't safe.
+        Args:
+            resource_objects (list[Any]): The removed resource objects.
+        """
+        if is_gui_thread():
             return
+        resource_objects = [
+            o for o in resource_objects if not isinstance(o, QtGui.QImage)
+        ]
+        if not resource_objects:
+            return
+        self._release_queue.extend(resource_objects)
+        self.releaseRequested.emit()
 
-        unused_resources = []
-        for key, data in self._cache.items():
-            if data["users"] <= 0:
-                unused_resources.append(key)
-        for key in unused_resources:
-            self._cache.pop(key)
+    def discardResource(self, resource_object):
+        """Discard a resource object that was allocated
+        but not cached, as another thread was faster.
+        Args:
+            resource_object (Any): The resource object.
+        """
+        self.queueGuiThreadRelease([resource_object])
 
+    def releaseQueueSize(self) -> int:
+        """Get the count of removed resources that
+        wait to be released on the GUI thread.
+        Returns:
+            int: The count.
+        """
+        return len(self._release_queue)
 
-class ImageCache(MediaCache):
-    def __init__(self) -> None:
-        super().__init__()
-        self._supported_resource_ext = (".svg", ".png", ".jpg", ".jpeg")
+    def onReleaseRequested(self):
+        """Release the resources that were removed off
+        the GUI thread, this runs on the GUI thread.
+        """
+        while self._release_queue:
+            resource_object = self._release_queue.popleft()
+            if isinstance(resource_object, ImageSequence):
+                resource_object.clear()
+
+    def resourceBytes(self, resource_object) -> int:
+        """Get the (approximate) memory cost of a resource object.
+        Pixmaps and images report their pixel buffer size, svg renderers
+        the cost of rasterizing them once at their default size, image
+        sequences the cost of a filled ring buffer and mip pyramids
+        the cost of all levels.
+        Args:
+            resource_object (Any): The resource object.
+        Returns:
+            int: The byte count.
+        """
+        if isinstance(resource_object, QtSvg.QSvgRenderer):
+            size = resource_object.defaultSize()
+            return max(0, size.width() * size.height() * 4)
+        elif isinstance(resource_object, ImageSequence):
+            if not resource_object.frameCount():
+                return 0
+            # Estimate the filled ring buffer from the first frame header.
+            frame_file_path = resource_object.frameFilePaths()[0]
+            size = QtGui.QImageReader(frame_file_path).size()
+            frame_bytes = max(0, size.width() * size.height() * 4)
+            return frame_bytes * min(
+                resource_object.bufferSize(), resource_object.frameCount()
+            )
+        elif isinstance(resource_object, (SvgFrameAtlas, MipPyramid)):
+            return resource_object.cacheBytes()
+        return super().resourceBytes(resource_object)
+
+
+def getImageCache():
+    if not hasattr(getImageCache, "instance"):
+        getImageCache.instance = ImageCache()
+    return getImageCache.instance
+
+
+class IconCache(MediaCache):
+    """An icon cache for file icons and font icons (qtawesome specs).
+    Icons are rasterized once per (spec, color, mode, state, size,
+    device pixel ratio) and the pixmaps are shared across delegates.
+    The pixmaps count towards the cache byte budget and are evicted
+    like any other resource.
+    """
+
+    def __init__(self, parent=None) -> None:
+        super().__init__(parent)
+        self._supported_resource_ext = (".svg", ".png", ".ico")
 
     def allocateResource(self, resource_file_path):
         """Allocate the resource object.
@@ -149,26 +4336,565 @@ class ImageCache(MediaCache):
         Returns:
             Any: The resource object.
         """
-        resource_file_ext = os.path.splitext(resource_file_path)[1]
-        if resource_file_ext == ".svg":
-            svg_renderer = QtSvg.QSvgRenderer(resource_file_path)
-            if svg_renderer.animated():
-                svg_renderer.setFramesPerSecond(get_frames_per_second() * 1000)
-            resource_object = svg_renderer
-        elif resource_file_ext.endswith((".png", ".jpg", ".jpeg")):
-            pixmap = QtGui.QPixmap(resource_file_path)
-            resource_object = pixmap
-        return resource_object
+        return QtGui.QIcon(resource_file_path)
 
+    def resourceType(self, resource_key) -> str:
+        """Get the resource type used to group statistics.
+        Args:
+            resource_key (Any): The resource key.
+        Returns:
+            str: The file extension for file icons, 'font'
+                 for font icons and 'icon' for QIcon objects.
+        """
+        if isinstance(resource_key, tuple):
+            resource_key = resource_key[0]
+        if not isinstance(resource_key, str):
+            return "icon"
+        if self.isResourceSupported(resource_key):
+            return os.path.splitext(resource_key)[1]
+        return "font"
 
-def getImageCache():
-    return getattr(getImageCache, "instance", ImageCache())
+    def getIcon(self, icon_spec, color=None) -> QtGui.QIcon:
+        """Get the icon of a file or font icon spec.
+        Args:
+            icon_spec (str): The icon file name or the font icon spec
+                             (e.g. 'fa5s.user-circle').
+            color (QtGui.QColor | str): The font icon color.
+        Returns:
+            QtGui.QIcon: The icon or None if the icon doesn't exist.
+        """
+        if self.isResourceSupported(icon_spec):
+            return self.getResource(icon_spec, track=False)
+        if qtawesome is None:
+            raise Exception(
+                f"Font icon {icon_spec} requested, but qtawesome is not available!"
+            )
+        color_name = QtGui.QColor(color).name(QtGui.QColor.HexArgb) if color else None
+        icon_key = (icon_spec, color_name)
+        resource = self._cache.get(icon_key, None)
+        if resource:
+            self.recordAccess(icon_key)
+            return resource["object"]
+        self.recordMiss(icon_key)
+        options = {"color": color_name} if color_name else {}
+        icon = qtawesome.icon(icon_spec, **options)
+        self.insertResource(icon_key, icon)
+        return icon
 
+    def getIconPixmap(
+        self,
+        icon_spec,
+        size: QtCore.QSize,
+        device_pixel_ratio=1.0,
+        color=None,
+        mode=QtGui.QIcon.Normal,
+        state=QtGui.QIcon.Off,
+    ) -> QtGui.QPixmap:
+        """Get a pre-rasterized icon pixmap.
+        Args:
+            icon_spec (str | QtGui.QIcon): The icon file name, the font icon spec
+                                           or an icon object.
+            size (QtCore.QSize): The target size (in logical pixels).
+            device_pixel_ratio (float): The device pixel ratio.
+            color (QtGui.QColor | str): The font icon color.
+            mode (QtGui.QIcon.Mode): The icon mode.
+            state (QtGui.QIcon.State): The icon state.
+        Returns:
+            QtGui.QPixmap: The pixmap or None if the icon doesn't exist.
+        """
+        if isinstance(icon_spec, QtGui.QIcon):
+            # Copies of an icon share the same cache key.
+            spec_key = icon_spec.cacheKey()
+        else:
+            spec_key = icon_spec
+        color_name = QtGui.QColor(color).name(QtGui.QColor.HexArgb) if color else None
+        pixmap_key = (
+            spec_key,
+            color_name,
+            enum_to_int(mode),
+            enum_to_int(state),
+            size.width(),
+            size.height(),
+            device_pixel_ratio,
+        )
+        resource = self._cache.get(pixmap_key, None)
+        if resource:
+            self.recordAccess(pixmap_key)
+            return resource["object"]
 
-class IconCache(MediaCache):
-    def __init__(self) -> None:
-        super().__init__()
+        self.recordMiss(pixmap_key)
+        if isinstance(icon_spec, QtGui.QIcon):
+            icon = icon_spec
+        else:
+            icon = self.getIcon(icon_spec, color=color)
+        if icon is None or icon.isNull():
+            return None
+        start_time = time.perf_counter()
+        pixmap = icon.pixmap(
+            QtCore.QSize(
+                max(1, round(size.width() * device_pixel_ratio)),
+                max(1, round(size.height() * device_pixel_ratio)),
+            ),
+            mode,
+            state,
+        )
+        pixmap.setDevicePixelRatio(device_pixel_ratio)
+        self.recordDecodeTime(pixmap_key, time.perf_counter() - start_time)
+        self.insertResource(pixmap_key, pixmap)
+        return pixmap
 
 
 def getIconCache():
-    return getattr(getIconCache, "instance", IconCache())
+    if not hasattr(getIconCache, "instance"):
+        getIconCache.instance = IconCache()
+    return getIconCache.instance
+
+
+class MemoryPressureLevel(IntEnum):
+    normal = 0
+    moderate = 1
+    critical = 2
+
+
+class MemoryPressureMonitor(QtCore.QObject):
+    """Sample the host memory (/proc/meminfo) and the process resident
+    set size on a timer and trim the registered caches as the memory
+    pressure rises. Moderate pressure drops the cold tiers and halves
+    the cache budgets, critical pressure quarters them and removes all
+    unused resources. The budgets are restored once the pressure drops.
+    Pinned resources (with tracked users) are exempt, so a cache can stay
+    above its trimmed budget until they are released. Views can react to
+    the pressureChanged signal (e.g. by drawing lower resolution variants).
+    """
+
+    pressureChanged = QtCore.Signal(int, name="pressureChanged")
+
+    budget_factors = {
+        MemoryPressureLevel.normal: 1.0,
+        MemoryPressureLevel.moderate: 0.5,
+        MemoryPressureLevel.critical: 0.25,
+    }
+
+    def __init__(self, parent=None) -> None:
+        super().__init__(parent)
+        self._caches = []
+        self._budgets = {}
+        self._level = MemoryPressureLevel.normal
+        # The fraction of available host memory below which a level is entered.
+        self._available_thresholds = {
+            MemoryPressureLevel.moderate: 0.15,
+            MemoryPressureLevel.critical: 0.05,
+        }
+        # The fraction of the resident set size limit above which a level is entered.
+        self._rss_thresholds = {
+            MemoryPressureLevel.moderate: 0.8,
+            MemoryPressureLevel.critical: 1.0,
+        }
+        self._recovery_margin = 0.05
+        self._max_rss_bytes = 0
+        self._min_budget_bytes = 32 * 1024**2
+        self._timer = QtCore.QTimer(self)
+        self._timer.setInterval(2000)
+        self._timer.timeout.connect(self.checkPressure)
+
+    def addCache(self, cache: MediaCache):
+        """Register a cache to be trimmed under memory pressure.
+        Args:
+            cache (MediaCache): The cache.
+        """
+        if cache not in self._caches:
+            self._caches.append(cache)
+            if self._level != MemoryPressureLevel.normal:
+                self.trimCache(cache, self._level)
+
+    def removeCache(self, cache: MediaCache):
+        """Unregister a cache, its budgets are restored.
+        Args:
+            cache (MediaCache): The cache.
+        """
+        if cache in self._caches:
+            self.trimCache(cache, MemoryPressureLevel.normal)
+            self._caches.remove(cache)
+
+    def level(self) -> MemoryPressureLevel:
+        """Get the current memory pressure level.
+        Returns:
+            MemoryPressureLevel: The level.
+        """
+        return self._level
+
+    def availableThreshold(self, level: MemoryPressureLevel) -> float:
+        """Get the available memory fraction below which a level is entered.
+        Args:
+            level (MemoryPressureLevel): The moderate or critical level.
+        Returns:
+            float: The fraction of the total host memory.
+        """
+        return self._available_thresholds[level]
+
+    def setAvailableThreshold(self, level: MemoryPressureLevel, value: float):
+        """Set the available memory fraction below which a level is entered.
+        Args:
+            level (MemoryPressureLevel): The moderate or critical level.
+            value (float): The fraction of the total host memory.
+        """
+        self._available_thresholds[level] = value
+
+    def maxRssBytes(self) -> int:
+        """Get the process resident set size limit.
+        Returns:
+            int: The limit, 0 means only the host memory is checked.
+        """
+        return self._max_rss_bytes
+
+    def setMaxRssBytes(self, value: int):
+        """Set the process resident set size limit. Moderate pressure
+        starts at 80% of the limit, critical pressure at the limit.
+        Args:
+            value (int): The limit, 0 means only the host memory is checked.
+        """
+        self._max_rss_bytes = max(0, int(value))
+
+    def minBudgetBytes(self) -> int:
+        """Get the floor of the trimmed cache budgets.
+        Returns:
+            int: The byte count.
+        """
+        return self._min_budget_bytes
+
+    def setMinBudgetBytes(self, value: int):
+        """Set the floor of the trimmed cache budgets, so empty or small
+        unlimited caches can still hold the resources in view. Budgets
+        are never raised above the original budget of limited caches.
+        Args:
+            value (int): The byte count.
+        """
+        self._min_budget_bytes = max(1, int(value))
+
+    def interval(self) -> float:
+        """Get the sample interval.
+        Returns:
+            float: The interval in seconds.
+        """
+        return self._timer.interval() / 1000.0
+
+    def setInterval(self, value: float):
+        """Set the sample interval.
+        Args:
+            value (float): The interval in seconds.
+        """
+        self._timer.setInterval(round(value * 1000))
+
+    def start(self):
+        """Start sampling the memory pressure."""
+        self._timer.start()
+
+    def stop(self):
+        """Stop sampling the memory pressure."""
+        self._timer.stop()
+
+    def sample(self) -> dict:
+        """Sample the host memory and the process resident set size.
+        Returns:
+            dict: The 'total', 'available' and 'rss' bytes or None
+                  if the host doesn't provide /proc (e.g. Windows).
+        """
+        meminfo = {}
+        try:
+            with open("/proc/meminfo", "r") as meminfo_file:
+                for line in meminfo_file:
+                    name, _, value = line.partition(":")
+                    if name in ("MemTotal", "MemAvailable"):
+                        meminfo[name] = int(value.split()[0]) * 1024
+            with open("/proc/self/statm", "r") as statm_file:
+                rss_pages = int(statm_file.read().split()[1])
+        except (OSError, ValueError, IndexError):
+            return None
+        if "MemTotal" not in meminfo or "MemAvailable" not in meminfo:
+            return None
+        return {
+            "total": meminfo["MemTotal"],
+            "available": meminfo["MemAvailable"],
+            "rss": rss_pages * os.sysconf("SC_PAGE_SIZE"),
+        }
+
+    def pressureLevel(self, sample: dict) -> MemoryPressureLevel:
+        """Get the pressure level of a sample. Leaving a level requires
+        the recovery margin on top of its threshold, so the caches don't
+        flip between budgets when the memory hovers around a threshold.
+        Args:
+            sample (dict): The sample.
+        Returns:
+            MemoryPressureLevel: The level.
+        """
+        available_fraction = sample["available"] / max(1, sample["total"])
+        rss_fraction = 0.0
+        if self._max_rss_bytes:
+            rss_fraction = sample["rss"] / self._max_rss_bytes
+        level = MemoryPressureLevel.normal
+        for candidate_level in (
+            MemoryPressureLevel.moderate,
+            MemoryPressureLevel.critical,
+        ):
+            available_threshold = self._available_thresholds[candidate_level]
+            rss_threshold = self._rss_thresholds[candidate_level]
+            if candidate_level <= self._level:
+                available_threshold += self._recovery_margin
+                rss_threshold -= self._recovery_margin
+            if available_fraction < available_threshold or (
+                self._max_rss_bytes and rss_fraction > rss_threshold
+            ):
+                level = candidate_level
+        return level
+
+    def checkPressure(self):
+        """Sample the memory and update the pressure level."""
+        sample = self.sample()
+        if sample is None:
+            return
+        self.setLevel(self.pressureLevel(sample))
+
+    def setLevel(self, level: MemoryPressureLevel):
+        """Set the pressure level and trim or restore the caches.
+        Args:
+            level (MemoryPressureLevel): The level.
+        """
+        level = MemoryPressureLevel(level)
+        if level == self._level:
+            return
+        LOG.info(f"Memory pressure changed to {level.name}")
+        self._level = level
+        for cache in self._caches:
+            self.trimCache(cache, level)
+        self.pressureChanged.emit(int(level))
+
+    def trimCache(self, cache: MediaCache, level: MemoryPressureLevel):
+        """Apply the budgets of a pressure level to a cache. The trimmed
+        budget is a fraction of the cache budget (or of the current
+        cache bytes of unlimited caches), but at least minBudgetBytes.
+        Pinned resources are exempt from the trimming and clearing.
+        Args:
+            cache (MediaCache): The cache.
+            level (MemoryPressureLevel): The level.
+        """
+        if level == MemoryPressureLevel.normal:
+            budgets = self._budgets.pop(cache, None)
+            if budgets is not None:
+                cache.setMaxBytes(budgets["max_bytes"])
+                cache.setColdMaxBytes(budgets["cold_max_bytes"])
+            return
+        budgets = self._budgets.setdefault(
+            cache,
+            {
+                "max_bytes": cache.maxBytes(),
+                "cold_max_bytes": cache.coldMaxBytes(),
+                # Unlimited caches are trimmed relative to their current size.
+                "base_bytes": cache.maxBytes() or cache.cacheBytes(),
+            },
+        )
+        max_bytes = max(
+            self._min_budget_bytes,
+            round(budgets["base_bytes"] * self.budget_factors[level]),
+        )
+        if budgets["max_bytes"]:
+            max_bytes = min(max_bytes, budgets["max_bytes"])
+        cache.setColdMaxBytes(0)
+        cache.setMaxBytes(max_bytes)
+        if level == MemoryPressureLevel.critical:
+            cache.clearResources()
+
+
+def getMemoryPressureMonitor():
+    if not hasattr(getMemoryPressureMonitor, "instance"):
+        getMemoryPressureMonitor.instance = MemoryPressureMonitor()
+        getMemoryPressureMonitor.instance.addCache(getImageCache())
+        getMemoryPressureMonitor.instance.addCache(getIconCache())
+    return getMemoryPressureMonitor.instance
+
+
+def iter_media_files(dir_paths, file_extensions) -> Iterator[str]:
+    """Walk directories for media files.
+    Args:
+        dir_paths (list[str]): The directory paths.
+        file_extensions (tuple[str]): The media file extensions.
+    Yields:
+        str: The media file path.
+    """
+    for dir_path in dir_paths:
+        for root_dir_path, _, file_names in os.walk(dir_path):
+            for file_name in sorted(file_names):
+                if os.path.splitext(file_name)[1] in file_extensions:
+                    yield os.path.join(root_dir_path, file_name)
+
+
+def init_bake_worker():
+    """Set up a bake worker process. Svg rendering
+    needs a GUI application, but no display.
+    """
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    if QtGui.QGuiApplication.instance() is None:
+        init_bake_worker.app = QtGui.QGuiApplication(["vfxQt-bake"])
+
+
+def bake_thumbnails(file_path, pixel_sizes, store_dir_path, force=False) -> tuple:
+    """Bake the thumbnails of a media file into the thumbnail store, the
+    same way ImageCache.getResourceVariant creates smooth variants.
+    Animated svgs are baked into frame atlases.
+    Args:
+        file_path (str): The media file path.
+        pixel_sizes (list[tuple[int, int]]): The thumbnail sizes (in device pixels).
+        store_dir_path (str): The thumbnail store directory.
+        force (bool): Re-bake thumbnails that already exist.
+    Returns:
+        tuple[int, int]: The baked and the skipped thumbnail count.
+    """
+    store = ThumbnailStore(store_dir_path, max_bytes=0)
+    variant = ""
+    if os.path.splitext(file_path)[1] == ".svg":
+        svg_renderer = QtSvg.QSvgRenderer(file_path)
+        if not svg_renderer.isValid():
+            raise Exception(f"Invalid svg file {file_path}")
+        # The style provides the frame interval in seconds.
+        frame_interval = get_frames_per_second()
+        if svg_renderer.animated():
+            variant = SvgFrameAtlas.thumbnailVariant(svg_renderer, frame_interval)
+
+            def render(pixel_width, pixel_height):
+                atlas_image = SvgFrameAtlas.renderAtlasImage(
+                    file_path, pixel_width, pixel_height, frame_interval
+                )
+                # Stored atlases are served on every later run, so only
+                # persist them if the frame sampling is reproducible.
+                if atlas_image != SvgFrameAtlas.renderAtlasImage(
+                    file_path, pixel_width, pixel_height, frame_interval
+                ):
+                    raise Exception(f"Non deterministic svg frame sampling {file_path}")
+                return atlas_image
+
+        else:
+
+            def render(pixel_width, pixel_height):
+                return render_svg_image(svg_renderer, pixel_width, pixel_height)
+
+    else:
+        source_images = []
+
+        def render(pixel_width, pixel_height):
+            # Decode the source once and only if a thumbnail is missing.
+            if not source_images:
+                source_images.append(read_image(file_path))
+            if source_images[0].isNull():
+                raise Exception(f"Failed to decode {file_path}")
+            return source_images[0].scaled(
+                pixel_width,
+                pixel_height,
+                QtCore.Qt.IgnoreAspectRatio,
+                QtCore.Qt.SmoothTransformation,
+            )
+
+    baked_count = skipped_count = 0
+    for pixel_width, pixel_height in pixel_sizes:
+        key = store.thumbnailKey(file_path, pixel_width, pixel_height, variant)
+        if not key:
+            continue
+        if not force and os.path.exists(store.thumbnailPath(key)):
+            skipped_count += 1
+            continue
+        store.write(key, render(pixel_width, pixel_height))
+        baked_count += 1
+    return baked_count, skipped_count
+
+
+def parse_thumbnail_size(value) -> QtCore.QSize:
+    """Parse a thumbnail size argument.
+    Args:
+        value (str): The size, either "<size>" or "<width>x<height>".
+    Returns:
+        QtCore.QSize: The size (in logical pixels).
+    """
+    width, _, height = value.lower().partition("x")
+    try:
+        return QtCore.QSize(int(width), int(height or width))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid thumbnail size {value}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Media cache utilities.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    bake_parser = subparsers.add_parser(
+        "bake", help="Bake thumbnails of media directories into the thumbnail store."
+    )
+    bake_parser.add_argument("dirs", nargs="+", help="The media directories.")
+    bake_parser.add_argument(
+        "--sizes",
+        type=parse_thumbnail_size,
+        nargs="+",
+        default=[parse_thumbnail_size("128")],
+        help="Thumbnail sizes in logical pixels, e.g. 128 or 160x90.",
+    )
+    bake_parser.add_argument(
+        "--device-pixel-ratios",
+        type=float,
+        nargs="+",
+        default=[1.0],
+        help="Device pixel ratios to bake each size at.",
+    )
+    bake_parser.add_argument(
+        "--store-dir", default=None, help="The thumbnail store directory."
+    )
+    bake_parser.add_argument(
+        "--max-bytes", type=int, default=1024**3, help="The thumbnail store budget."
+    )
+    bake_parser.add_argument(
+        "--workers", type=int, default=None, help="The worker process count."
+    )
+    bake_parser.add_argument(
+        "--force", action="store_true", help="Re-bake existing thumbnails."
+    )
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    pixel_sizes = sorted(
+        {
+            (
+                max(1, round(size.width() * device_pixel_ratio)),
+                max(1, round(size.height() * device_pixel_ratio)),
+            )
+            for size in args.sizes
+            for device_pixel_ratio in args.device_pixel_ratios
+        }
+    )
+    store = ThumbnailStore(args.store_dir, max_bytes=args.max_bytes)
+    file_paths = list(iter_media_files(args.dirs, (".svg", ".png", ".jpg", ".jpeg")))
+    start_time = time.perf_counter()
+    baked_count = skipped_count = failed_count = 0
+    with ProcessPoolExecutor(
+        max_workers=args.workers, initializer=init_bake_worker
+    ) as executor:
+        futures = {
+            executor.submit(
+                bake_thumbnails, file_path, pixel_sizes, store.dirPath(), args.force
+            ): file_path
+            for file_path in file_paths
+        }
+        for future in as_completed(futures):
+            try:
+                file_baked_count, file_skipped_count = future.result()
+            except Exception as exc:
+                LOG.warning(f"Failed to bake {futures[future]} | {exc}")
+                failed_count += 1
+                continue
+            baked_count += file_baked_count
+            skipped_count += file_skipped_count
+    store.trim()
+    LOG.info(
+        f"Baked {baked_count} thumbnails of {len(file_paths)} files"
+        f" in {time.perf_counter() - start_time:.1f}s"
+        f" ({skipped_count} up to date, {failed_count} failed) | {store.dirPath()}"
+    )
+    return 1 if failed_count else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
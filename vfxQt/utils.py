@@ -15,3 +15,12 @@ def rect_scale_from_center(rect, scale_x, scale_y):
     )
     rect.translate(rect_center - rect.center())
     return rect
+
+def is_gui_thread():
+    app = QtCore.QCoreApplication.instance()
+    if app is None:
+        return True
+    return QtCore.QThread.currentThread() == app.thread()
+def enum_to_int(value):
+    # PySide6 enums are python enums, which don't support int().
+    return int(getattr(value, "value", value))
@@ -1,11 +1,20 @@
+import math
 import sys
+from collections import OrderedDict
 from enum import Enum
-from typing import Any
+from typing import Any, List
 
-from Qt import QtCore, QtGui, QtSvg, QtWidgets
+from Qt import QtCore, QtGui, QtWidgets
 from Qt.QtCore import Qt
 
-from vfxQt.utils import rect_scale_from_center
+from vfxQt.media import (
+    ImageSequence,
+    MemoryPressureLevel,
+    SvgFrameAtlas,
+    getAnimationClock,
+    getIconCache,
+)
+from vfxQt.utils import enum_to_int, rect_scale_from_center
 
 ##############################
 # Interface/Abstract
@@ -140,6 +149,118 @@ class MultiEditItemDelegate(StyledItemDelegate):
                     self.setData(multi_index, value, role)
 
 
+##############################
+# Text
+##############################
+
+
+class TextMetricsCache:
+    """Memoize text widths per (font, text) with a bounded LRU, so item
+    delegates don't build a QFontMetrics and measure every label on
+    every layout pass. Only use it from the GUI thread.
+    """
+
+    def __init__(self, max_count: int = 65536) -> None:
+        self._max_count = max_count
+        self._font_metrics = {}
+        self._widths = OrderedDict()
+        self._stats = {"hits": 0, "misses": 0}
+
+    def maxCount(self) -> int:
+        """Get the maximum number of memoized text widths.
+        Returns:
+            int: The count.
+        """
+        return self._max_count
+
+    def setMaxCount(self, count: int):
+        """Set the maximum number of memoized text widths.
+        Args:
+            count (int): The count.
+        """
+        self._max_count = max(0, count)
+        while len(self._widths) > self._max_count:
+            self._widths.popitem(last=False)
+
+    def stats(self) -> dict:
+        """Get the hit/miss counters.
+        Returns:
+            dict: The stats.
+        """
+        stats = dict(self._stats)
+        stats["count"] = len(self._widths)
+        return stats
+
+    def clear(self):
+        """Clear all memoized font metrics and text widths."""
+        self._font_metrics.clear()
+        self._widths.clear()
+        self._stats = {"hits": 0, "misses": 0}
+
+    def fontMetrics(
+        self, font: QtGui.QFont, font_key: str = None
+    ) -> QtGui.QFontMetrics:
+        """Get the (shared) font metrics of the font.
+        Args:
+            font (QtGui.QFont): The font.
+            font_key (str): The font key, computed from the font if None.
+        Returns:
+            QtGui.QFontMetrics: The font metrics.
+        """
+        if font_key is None:
+            font_key = font.key()
+        font_metrics = self._font_metrics.get(font_key, None)
+        if font_metrics is None:
+            font_metrics = QtGui.QFontMetrics(font)
+            self._font_metrics[font_key] = font_metrics
+        return font_metrics
+
+    def horizontalAdvance(
+        self, font: QtGui.QFont, text: str, font_key: str = None
+    ) -> int:
+        """Get the horizontal advance of the text.
+        Args:
+            font (QtGui.QFont): The font.
+            text (str): The text.
+            font_key (str): The font key, computed from the font if None.
+        Returns:
+            int: The width.
+        """
+        if font_key is None:
+            font_key = font.key()
+        key = (font_key, text)
+        width = self._widths.get(key, None)
+        if width is not None:
+            self._stats["hits"] += 1
+            self._widths.move_to_end(key)
+            return width
+        self._stats["misses"] += 1
+        width = self.fontMetrics(font, font_key).horizontalAdvance(text)
+        if self._max_count:
+            self._widths[key] = width
+            if len(self._widths) > self._max_count:
+                self._widths.popitem(last=False)
+        return width
+
+    def horizontalAdvances(self, font: QtGui.QFont, texts: List[str]) -> List[int]:
+        """Get the horizontal advances of multiple texts in the same font.
+        The font key and metrics are resolved only once for the batch.
+        Args:
+            font (QtGui.QFont): The font.
+            texts (list[str]): The texts.
+        Returns:
+            list[int]: The widths.
+        """
+        font_key = font.key()
+        return [self.horizontalAdvance(font, text, font_key) for text in texts]
+
+
+def getTextMetricsCache():
+    if not hasattr(getTextMetricsCache, "instance"):
+        getTextMetricsCache.instance = TextMetricsCache()
+    return getTextMetricsCache.instance
+
+
 ##############################
 # Delegates
 ##############################
@@ -158,7 +279,15 @@ class ComboBoxItemDelegate(MultiEditItemDelegate):
         self._items_source_mode = ComboBoxItemDelegateSourceMode.role
         self._items_source_role = Qt.UserRole
         self._items_source_func = lambda i: []
-        self._items_value_label = {}
+
+        # Items cache
+        self._items_model = None
+        self._items_cache_max_count = 4096
+        self._items_role_cache = OrderedDict()
+        self._items_func_cache = OrderedDict()
+        self._items_payload_cache = OrderedDict()
+        self._items_last_source = None
+        self._value_labels = {}
 
         self._showing_popup = False
         self._editor = None
@@ -174,8 +303,11 @@ class ComboBoxItemDelegate(MultiEditItemDelegate):
             bool: Set the value if true, ignore the edit if false.
         """
         if role == self._item_value_role:
-            items = [i[-1] for i in self.getItems(index)]
-            return value in items
+            try:
+                return value in self.getItemValues(index)
+            except TypeError:
+                # Unhashable values can't be looked up in the frozen value set.
+                return value in [i[-1] for i in self.getItems(index)]
         return True
 
     def setData(self, index: QtCore.QModelIndex, value: Any, role: int):
@@ -192,7 +324,7 @@ class ComboBoxItemDelegate(MultiEditItemDelegate):
             # have the same label for each value. Indices can still have varying
             # items, only the label must match the value per item.
             if role != Qt.DisplayRole:
-                super().setData(index, self._items_value_label[value], Qt.DisplayRole)
+                super().setData(index, self.getValueLabel(index, value), Qt.DisplayRole)
 
     def getItemValueRole(self):
         """Get the item value role.
@@ -217,17 +349,186 @@ class ComboBoxItemDelegate(MultiEditItemDelegate):
                        to return a list of [(icon, label, value),
                        (label, value)] tuples.
         """
+        return list(self._getItemsEntry(index)["items"])
+
+    def getItemValues(self, index: QtCore.QModelIndex):
+        """Get the (memoized) item values based on the source mode.
+        Args:
+            index (QtCore.QModelIndex): The model index.
+        Returns:
+            frozenset: The values, a tuple if the values are unhashable.
+        """
+        return self._getItemsEntry(index)["values"]
+
+    def getValueLabel(self, index: QtCore.QModelIndex, value: Any):
+        """Get the label of an item value. Labels are looked up in the
+        value to label index shared by all item sources of the delegate.
+        Args:
+            index (QtCore.QModelIndex): The model index.
+            value (Any): The value.
+        Returns:
+            str: The label.
+        """
+        try:
+            return self._value_labels[value]
+        except (KeyError, TypeError):
+            pass
+        for item in self._getItemsEntry(index)["items"]:
+            if item[-1] == value:
+                return item[-2]
+        return value
+
+    def setModel(self, model: QtCore.QAbstractItemModel):
+        """Set the model whose data the item sources depend on. Memoized
+        function items are dropped whenever the model changes, memoized
+        role items whenever the model changes its structure or the
+        source role data. This is called automatically with the model
+        of the queried indices.
+        Args:
+            model (QtCore.QAbstractItemModel): The model.
+        """
+        model_signals = (
+            "rowsInserted",
+            "rowsRemoved",
+            "rowsMoved",
+            "modelReset",
+            "layoutChanged",
+        )
+        if self._items_model is not None:
+            self._items_model.dataChanged.disconnect(self.onModelDataChanged)
+            for signal_name in model_signals:
+                getattr(self._items_model, signal_name).disconnect(
+                    self.onModelChanged
+                )
+        self._items_role_cache.clear()
+        self._items_func_cache.clear()
+        self._items_last_source = None
+        self._items_model = model
+        if self._items_model is not None:
+            self._items_model.dataChanged.connect(self.onModelDataChanged)
+            for signal_name in model_signals:
+                getattr(self._items_model, signal_name).connect(self.onModelChanged)
+
+    def onModelChanged(self, *args):
+        """Drop the memoized items, as the indices they are memoized for moved."""
+        self._items_role_cache.clear()
+        self._items_func_cache.clear()
+        self._items_last_source = None
+
+    def onModelDataChanged(
+        self,
+        top_left: QtCore.QModelIndex,
+        bottom_right: QtCore.QModelIndex,
+        roles: list = (),
+    ):
+        """Drop the memoized function items, as they may depend on the model
+        data, and the memoized role items if the source role changed.
+        Args:
+            top_left (QtCore.QModelIndex): The top left changed index.
+            bottom_right (QtCore.QModelIndex): The bottom right changed index.
+            roles (list[int]): The changed roles, all if empty.
+        """
+        self._items_func_cache.clear()
+        source_role = enum_to_int(self._items_source_role)
+        if not roles or any(enum_to_int(role) == source_role for role in roles):
+            self._items_role_cache.clear()
+            self._items_last_source = None
+
+    def itemsCacheMaxCount(self) -> int:
+        """Get the maximum number of memoized item sources (per source mode).
+        Returns:
+            int: The count.
+        """
+        return self._items_cache_max_count
+
+    def setItemsCacheMaxCount(self, count: int):
+        """Set the maximum number of memoized item sources (per source mode).
+        Args:
+            count (int): The count.
+        """
+        self._items_cache_max_count = max(1, count)
+        for cache in (
+            self._items_role_cache,
+            self._items_func_cache,
+            self._items_payload_cache,
+        ):
+            while len(cache) > self._items_cache_max_count:
+                cache.popitem(last=False)
+
+    def clearItemsCache(self):
+        """Clear the memoized item sources and the value to label index."""
+        self._items_role_cache.clear()
+        self._items_func_cache.clear()
+        self._items_payload_cache.clear()
+        self._items_last_source = None
+        self._value_labels.clear()
+
+    def _buildItemsEntry(self, raw_items) -> dict:
+        # Rows with equal payloads share an entry, even if the model returns
+        # a new payload per call. Unhashable payloads are built per row.
+        try:
+            payload_key = tuple(raw_items)
+            entry = self._items_payload_cache.get(payload_key, None)
+        except TypeError:
+            payload_key = None
+            entry = None
+        if entry is not None:
+            self._items_payload_cache.move_to_end(payload_key)
+            return entry
+        items = tuple(
+            item if isinstance(item, tuple) else (item, item) for item in raw_items
+        )
+        try:
+            values = frozenset(item[-1] for item in items)
+        except TypeError:
+            values = tuple(item[-1] for item in items)
+        for item in items:
+            try:
+                self._value_labels[item[-1]] = item[-2]
+            except TypeError:
+                pass
+        entry = {"items": items, "values": values}
+        if payload_key is not None:
+            self._items_payload_cache[payload_key] = entry
+            if len(self._items_payload_cache) > self._items_cache_max_count:
+                self._items_payload_cache.popitem(last=False)
+        return entry
+
+    def _getItemsEntry(self, index: QtCore.QModelIndex) -> dict:
+        # Item sources are memoized per index until the model changes (the
+        # source role data for role sources), as models often return a new
+        # payload per call. Role payloads that are shared across rows are
+        # only built once, so they must not be mutated in place without
+        # clearItemsCache.
+        model = index.model()
+        if model is not self._items_model:
+            self.setModel(model)
         if self._items_source_mode == ComboBoxItemDelegateSourceMode.role:
-            raw_items = index.data(self._items_source_role) or []
+            cache = self._items_role_cache
         elif self._items_source_mode == ComboBoxItemDelegateSourceMode.func:
-            raw_items = self._items_source_func(index) or []
-        items = []
-        for item in raw_items:
-            if isinstance(item, tuple):
-                items.append(item)
+            cache = self._items_func_cache
+        cache_key = (index.row(), index.column(), index.internalId())
+        entry = cache.get(cache_key, None)
+        if entry is not None:
+            cache.move_to_end(cache_key)
+            return entry
+
+        if self._items_source_mode == ComboBoxItemDelegateSourceMode.role:
+            raw_items = index.data(self._items_source_role) or []
+            if (
+                self._items_last_source is not None
+                and self._items_last_source[0] is raw_items
+            ):
+                entry = self._items_last_source[1]
             else:
-                items.append((item, item))
-        return items
+                entry = self._buildItemsEntry(raw_items)
+                self._items_last_source = (raw_items, entry)
+        else:
+            entry = self._buildItemsEntry(self._items_source_func(index) or [])
+        cache[cache_key] = entry
+        if len(cache) > self._items_cache_max_count:
+            cache.popitem(last=False)
+        return entry
 
     def getItemsSourceMode(self):
         """Get the item source mode.
@@ -242,6 +543,7 @@ class ComboBoxItemDelegate(MultiEditItemDelegate):
             mode (ComboBoxItemDelegateSourceMode): The mode.
         """
         self._items_source_mode = mode
+        self.clearItemsCache()
 
     def getItemsSourceRole(self):
         """Get the item source role.
@@ -256,6 +558,7 @@ class ComboBoxItemDelegate(MultiEditItemDelegate):
             role (int): The role.
         """
         self._items_source_role = role
+        self.clearItemsCache()
 
     def getItemsSourceFunction(self):
         """Get the item source function.
@@ -274,6 +577,7 @@ class ComboBoxItemDelegate(MultiEditItemDelegate):
             role (func): The callable function.
         """
         self._items_source_func = func
+        self.clearItemsCache()
 
     def onDropDownCloseCallback(self):
         """The combobox dropdown close callback."""
@@ -294,10 +598,8 @@ class ComboBoxItemDelegate(MultiEditItemDelegate):
             QtWidgets.QWidget: The editor widget.
         """
         self._showing_popup = False
-        self._items_value_label.clear()
         self._editor = QtWidgets.QComboBox(parent)
-        for item in self.getItems(index):
-            self._items_value_label[item[-1]] = item[-2]
+        for item in self._getItemsEntry(index)["items"]:
             self._editor.addItem(*item)
         self._editor.currentTextChanged.connect(self.onDropDownCloseCallback)
         return self._editor
@@ -361,17 +663,170 @@ class ComboBoxItemDelegate(MultiEditItemDelegate):
         painter.restore()
 
 
+def draw_html_document(
+    painter: QtGui.QPainter,
+    html_doc: QtGui.QTextDocument,
+    clip_rect: QtCore.QRectF,
+    text_color: QtGui.QColor,
+):
+    """Draw a text document clipped to a rect. Unlike drawContents, which
+    draws with the default palette of the paint context and ignores the
+    painter's pen, text without an explicit color uses the text color.
+    Args:
+        painter (QtGui.QPainter): The painter.
+        html_doc (QtGui.QTextDocument): The text document.
+        clip_rect (QtCore.QRectF): The clip rect (in document coordinates).
+        text_color (QtGui.QColor): The default text color.
+    """
+    paint_context = QtGui.QAbstractTextDocumentLayout.PaintContext()
+    palette = QtGui.QPalette(paint_context.palette)
+    palette.setColor(QtGui.QPalette.Text, text_color)
+    paint_context.palette = palette
+    paint_context.clip = clip_rect
+    painter.save()
+    painter.setClipRect(clip_rect)
+    html_doc.documentLayout().draw(painter, paint_context)
+    painter.restore()
+
+
+def render_html_image(
+    html: str,
+    width: int,
+    height: int,
+    font: QtGui.QFont,
+    text_color: QtGui.QColor,
+    device_pixel_ratio: float = 1.0,
+    text_option: QtGui.QTextOption = None,
+) -> QtGui.QImage:
+    """Render html to an image. Unlike QPixmaps, QTextDocuments and
+    QPainters on QImages can be used on worker threads.
+    Args:
+        html (str): The html.
+        width (int): The width (in logical pixels), the text is wrapped at it.
+        height (int): The height (in logical pixels), the content is clipped.
+        font (QtGui.QFont): The default font.
+        text_color (QtGui.QColor): The default text color.
+        device_pixel_ratio (float): The device pixel ratio.
+        text_option (QtGui.QTextOption): The default text option.
+    Returns:
+        QtGui.QImage: The image.
+    """
+    html_doc = QtGui.QTextDocument()
+    html_doc.setDocumentMargin(0)
+    if text_option is not None:
+        html_doc.setDefaultTextOption(text_option)
+    html_doc.setDefaultFont(font)
+    html_doc.setHtml(html)
+    html_doc.setTextWidth(width)
+
+    image = QtGui.QImage(
+        round(width * device_pixel_ratio),
+        round(height * device_pixel_ratio),
+        QtGui.QImage.Format_ARGB32_Premultiplied,
+    )
+    image.setDevicePixelRatio(device_pixel_ratio)
+    image.fill(Qt.transparent)
+    painter = QtGui.QPainter(image)
+    painter.setRenderHint(QtGui.QPainter.Antialiasing)
+    draw_html_document(
+        painter,
+        html_doc,
+        QtCore.QRectF(0.0, 0.0, float(width), float(height)),
+        text_color,
+    )
+    painter.end()
+    return image
+
+
+class HtmlRenderSignals(QtCore.QObject):
+    finished = QtCore.Signal(object, object, object, name="finished")
+
+
+class HtmlRenderRunnable(QtCore.QRunnable):
+    """Render html to a QImage on a worker thread.
+    QPixmaps can only be created on the GUI thread, so the
+    image is drawn as is by the receiver of the finished signal.
+    """
+
+    def __init__(
+        self,
+        render_key,
+        html,
+        width,
+        height,
+        font,
+        text_color,
+        device_pixel_ratio=1.0,
+        text_option=None,
+    ) -> None:
+        super().__init__()
+        # The delegate keeps a reference until the runnable finished.
+        self.setAutoDelete(False)
+        self.signals = HtmlRenderSignals()
+        self._render_key = render_key
+        self._html = html
+        self._width = width
+        self._height = height
+        self._font = QtGui.QFont(font)
+        self._text_color = QtGui.QColor(text_color)
+        self._device_pixel_ratio = device_pixel_ratio
+        self._text_option = (
+            QtGui.QTextOption(text_option) if text_option is not None else None
+        )
+        self._cancelled = False
+
+    def cancel(self):
+        """Cancel the render. If the runnable already started,
+        the result is discarded by the delegate.
+        """
+        self._cancelled = True
+
+    def isCancelled(self) -> bool:
+        """Get the cancelled state.
+        Returns:
+            bool: The state.
+        """
+        return self._cancelled
+
+    def run(self):
+        if self._cancelled:
+            return
+        image = render_html_image(
+            self._html,
+            self._width,
+            self._height,
+            self._font,
+            self._text_color,
+            self._device_pixel_ratio,
+            self._text_option,
+        )
+        if self._cancelled:
+            return
+        self.signals.finished.emit(self._render_key, image, self)
+
+
 class HtmlItemDelegate(MultiEditItemDelegate):
+    repaintNeeded = QtCore.Signal(QtCore.QModelIndex, name="repaintNeeded")
+
     def __init__(self, parent=None):
         super().__init__(parent)
 
-        self._html_doc = QtGui.QTextDocument(parent=self)
-        self._html_doc.setDocumentMargin(0)
         self._html_doc_options = QtGui.QTextOption()
         self._html_doc_options.setWrapMode(
             self._html_doc_options.WrapAtWordBoundaryOrAnywhere
         )
-        self._html_doc.setDefaultTextOption(self._html_doc_options)
+
+        # Layout cache
+        self._html_doc_cache = OrderedDict()
+        self._html_doc_cache_max_count = 512
+
+        # Async rendering
+        self._async_rendering = False
+        self._thread_pool = QtCore.QThreadPool.globalInstance()
+        self._html_image_cache = OrderedDict()
+        self._html_image_cache_max_count = 512
+        self._html_image_pending = {}
+        self._render_params = None
 
         self._item_value_role = Qt.DisplayRole
 
@@ -389,6 +844,299 @@ class HtmlItemDelegate(MultiEditItemDelegate):
         """
         self._item_value_role = role
 
+    def layoutCacheMaxCount(self) -> int:
+        """Get the maximum number of laid out html documents.
+        Returns:
+            int: The count.
+        """
+        return self._html_doc_cache_max_count
+
+    def setLayoutCacheMaxCount(self, count: int):
+        """Set the maximum number of laid out html documents.
+        Args:
+            count (int): The count.
+        """
+        self._html_doc_cache_max_count = max(1, count)
+        while len(self._html_doc_cache) > self._html_doc_cache_max_count:
+            self._html_doc_cache.popitem(last=False)
+
+    def clearLayoutCache(self):
+        """Clear all laid out html documents."""
+        self._html_doc_cache.clear()
+
+    def asyncRendering(self) -> bool:
+        """Get the async rendering state.
+        Returns:
+            bool: The state.
+        """
+        return self._async_rendering
+
+    def setAsyncRendering(self, state: bool):
+        """Set the async rendering state. If enabled, html cells are
+        rendered to images on the thread pool and a placeholder is
+        drawn until the image is available. Use prefetch (e.g. via an
+        ItemViewPrefetcher) to render cells before they are visible.
+        Args:
+            state (bool): The state.
+        """
+        self._async_rendering = state
+        if not state:
+            self.cancelPrefetch()
+
+    def threadPool(self) -> QtCore.QThreadPool:
+        """Get the thread pool html cells are rendered on.
+        Returns:
+            QtCore.QThreadPool: The thread pool.
+        """
+        return self._thread_pool
+
+    def setThreadPool(self, thread_pool: QtCore.QThreadPool):
+        """Set the thread pool html cells are rendered on.
+        Args:
+            thread_pool (QtCore.QThreadPool): The thread pool.
+        """
+        self._thread_pool = thread_pool
+
+    def renderCacheMaxCount(self) -> int:
+        """Get the maximum number of rendered html images.
+        Returns:
+            int: The count.
+        """
+        return self._html_image_cache_max_count
+
+    def setRenderCacheMaxCount(self, count: int):
+        """Set the maximum number of rendered html images.
+        Args:
+            count (int): The count.
+        """
+        self._html_image_cache_max_count = max(1, count)
+        while len(self._html_image_cache) > self._html_image_cache_max_count:
+            self._html_image_cache.popitem(last=False)
+
+    def clearRenderCache(self):
+        """Clear all rendered html images."""
+        self._html_image_cache.clear()
+
+    def renderKey(
+        self,
+        html: str,
+        size: QtCore.QSize,
+        font: QtGui.QFont,
+        text_color: QtGui.QColor,
+        device_pixel_ratio: float,
+    ) -> tuple:
+        """Get the key of a rendered html image.
+        Args:
+            html (str): The html.
+            size (QtCore.QSize): The cell size.
+            font (QtGui.QFont): The default font.
+            text_color (QtGui.QColor): The default text color.
+            device_pixel_ratio (float): The device pixel ratio.
+        Returns:
+            tuple: The key.
+        """
+        return (
+            html,
+            size.width(),
+            size.height(),
+            font.key(),
+            text_color.rgba(),
+            device_pixel_ratio,
+        )
+
+    def queueRender(
+        self,
+        html: str,
+        size: QtCore.QSize,
+        font: QtGui.QFont,
+        text_color: QtGui.QColor,
+        device_pixel_ratio: float,
+        priority: int = 0,
+        index: QtCore.QModelIndex = None,
+    ):
+        """Queue the render of a html cell on the thread pool.
+        Args:
+            html (str): The html.
+            size (QtCore.QSize): The cell size.
+            font (QtGui.QFont): The default font.
+            text_color (QtGui.QColor): The default text color.
+            device_pixel_ratio (float): The device pixel ratio.
+            priority (int): The thread pool priority.
+            index (QtCore.QModelIndex): The index to repaint once rendered.
+        """
+        render_key = self.renderKey(html, size, font, text_color, device_pixel_ratio)
+        if render_key in self._html_image_cache:
+            return
+        entry = self._html_image_pending.get(render_key, None)
+        if entry is None:
+            runnable = HtmlRenderRunnable(
+                render_key,
+                html,
+                size.width(),
+                size.height(),
+                font,
+                text_color,
+                device_pixel_ratio,
+                self._html_doc_options,
+            )
+            runnable.signals.finished.connect(self.onRenderFinished)
+            entry = self._html_image_pending[render_key] = {
+                "runnable": runnable,
+                "indexes": {},
+            }
+            self._thread_pool.start(runnable, priority)
+        if index is not None:
+            index_key = (index.row(), index.column(), index.internalId())
+            entry["indexes"][index_key] = QtCore.QPersistentModelIndex(index)
+
+    def prefetch(self, htmls, priority=0):
+        """Queue html cells to be rendered in the background, with the
+        cell size, font and color of the last painted cell. This mirrors
+        MediaCache.prefetch, so the delegate can be used as the cache of
+        an ItemViewPrefetcher.
+        Args:
+            htmls (Iterable[str]): The html of the cells.
+            priority (int): The priority.
+        """
+        if not self._async_rendering or self._render_params is None:
+            return
+        size, font, text_color, device_pixel_ratio = self._render_params
+        for html in htmls:
+            self.queueRender(
+                html, size, font, text_color, device_pixel_ratio, int(priority)
+            )
+
+    def releaseHiddenIndexes(self):
+        """Forget the painted cells of pending renders that have been
+        scrolled out of the viewport, so their renders can be cancelled.
+        This only applies if the delegate is parented to its view.
+        """
+        view = self.parent()
+        if not isinstance(view, QtWidgets.QAbstractItemView):
+            return
+        viewport_rect = view.viewport().rect()
+        for entry in self._html_image_pending.values():
+            for index_key, persistent_index in list(entry["indexes"].items()):
+                if not persistent_index.isValid() or not view.visualRect(
+                    QtCore.QModelIndex(persistent_index)
+                ).intersects(viewport_rect):
+                    entry["indexes"].pop(index_key)
+
+    def cancelPrefetch(self, htmls=None):
+        """Cancel the background renders of html cells, unless a
+        painted cell in view is waiting for them.
+        Args:
+            htmls (Iterable[str]): The html of the cells, all if None.
+        """
+        if htmls is not None:
+            htmls = set(htmls)
+        self.releaseHiddenIndexes()
+        for render_key, entry in list(self._html_image_pending.items()):
+            if entry["indexes"] and self._async_rendering:
+                continue
+            if htmls is not None and render_key[0] not in htmls:
+                continue
+            runnable = self._html_image_pending.pop(render_key)["runnable"]
+            runnable.cancel()
+            self._thread_pool.tryTake(runnable)
+
+    def onRenderFinished(self, render_key, image, runnable):
+        """The background render callback, this runs on the GUI thread.
+        Args:
+            render_key (tuple): The render key.
+            image (QtGui.QImage): The rendered image.
+            runnable (HtmlRenderRunnable): The finished runnable.
+        """
+        entry = self._html_image_pending.get(render_key, None)
+        if entry is None or entry["runnable"] is not runnable:
+            return
+        self._html_image_pending.pop(render_key)
+        if runnable.isCancelled():
+            return
+        self._html_image_cache[render_key] = image
+        if len(self._html_image_cache) > self._html_image_cache_max_count:
+            self._html_image_cache.popitem(last=False)
+
+        view = self.parent()
+        for persistent_index in entry["indexes"].values():
+            if not persistent_index.isValid():
+                continue
+            index = QtCore.QModelIndex(persistent_index)
+            if isinstance(view, QtWidgets.QAbstractItemView):
+                view.update(index)
+            else:
+                self.repaintNeeded.emit(index)
+
+    def paintPlaceholder(
+        self,
+        painter: QtGui.QPainter,
+        option: QtWidgets.QStyleOptionViewItem,
+        index: QtCore.QModelIndex,
+    ) -> None:
+        """Paint the placeholder of a cell that is still being rendered.
+        Args:
+            painter (QtGui.QPainter): The painter.
+            option (QtWidgets.QStyleOptionViewItem): The style option.
+            index (QtCore.QModelIndex): The model index.
+        """
+        color = option.palette.color(QtGui.QPalette.Text)
+        color.setAlphaF(0.05)
+        painter.fillRect(option.rect, color)
+
+    def getHtmlDocument(
+        self, html: str, width: int, font: QtGui.QFont
+    ) -> QtGui.QTextDocument:
+        """Get the laid out document of the html. Documents are cached
+        per (html, width, font), so the html is only parsed and laid out
+        once instead of on every paint. The text color doesn't affect the
+        layout, it is applied when drawing (see draw_html_document).
+        Args:
+            html (str): The html.
+            width (int): The text width, -1 lays out without wrapping.
+            font (QtGui.QFont): The default font.
+        Returns:
+            QtGui.QTextDocument: The document, it must not be modified.
+        """
+        key = (html, width, font.key())
+        html_doc = self._html_doc_cache.get(key, None)
+        if html_doc is not None:
+            self._html_doc_cache.move_to_end(key)
+            return html_doc
+
+        html_doc = QtGui.QTextDocument()
+        html_doc.setDocumentMargin(0)
+        html_doc.setDefaultTextOption(self._html_doc_options)
+        html_doc.setDefaultFont(font)
+        html_doc.setHtml(html)
+        html_doc.setTextWidth(width)
+        # Force the layout now, so paint and sizeHint don't trigger it.
+        html_doc.size()
+
+        self._html_doc_cache[key] = html_doc
+        if len(self._html_doc_cache) > self._html_doc_cache_max_count:
+            self._html_doc_cache.popitem(last=False)
+        return html_doc
+
+    def sizeHint(
+        self, option: QtWidgets.QStyleOptionViewItem, index: QtCore.QModelIndex
+    ) -> QtCore.QSize:
+        """Calculate the size based on the laid out html.
+        Args:
+            option (QtWidgets.QStyleOptionViewItem): The style option.
+            index (QtCore.QModelIndex): The model index.
+        """
+        size_hint = index.data(Qt.SizeHintRole)
+        if size_hint:
+            return size_hint
+        html = index.data(self._item_value_role)
+        if not html:
+            return super().sizeHint(option, index)
+
+        width = option.rect.width()
+        html_doc = self.getHtmlDocument(html, width if width > 0 else -1, option.font)
+        size = html_doc.size()
+        return QtCore.QSize(math.ceil(size.width()), math.ceil(size.height()))
+
     def paint(
         self,
         painter: QtGui.QPainter,
@@ -401,6 +1149,38 @@ class HtmlItemDelegate(MultiEditItemDelegate):
             option (QtWidgets.QStyleOptionViewItem): The style option.
             index (QtCore.QModelIndex): The model index.
         """
+        rect = option.rect
+        html = index.data(self._item_value_role)
+        if not html or rect.isEmpty():
+            return
+
+        if self._async_rendering:
+            size = rect.size()
+            text_color = painter.pen().color()
+            device_pixel_ratio = painter.device().devicePixelRatioF()
+            self._render_params = (size, option.font, text_color, device_pixel_ratio)
+            render_key = self.renderKey(
+                html, size, option.font, text_color, device_pixel_ratio
+            )
+            image = self._html_image_cache.get(render_key, None)
+            if image is None:
+                # Visible cells are rendered before prefetched ones.
+                self.queueRender(
+                    html,
+                    size,
+                    option.font,
+                    text_color,
+                    device_pixel_ratio,
+                    priority=1,
+                    index=index,
+                )
+                self.paintPlaceholder(painter, option, index)
+            else:
+                self._html_image_cache.move_to_end(render_key)
+                painter.drawImage(rect.topLeft(), image)
+            return
+
+        html_doc = self.getHtmlDocument(html, rect.width(), option.font)
 
         painter.save()
         # style_option = QtWidgets.QStyleOptionViewItem(option)
@@ -409,15 +1189,10 @@ class HtmlItemDelegate(MultiEditItemDelegate):
         # style = option.widget.style()
         # style.drawControl(QtWidgets.QStyle.CE_ItemViewItem, style_option, painter)
 
-        rect = option.rect
-        html = index.data(self._item_value_role)
-
+        text_color = painter.pen().color()
         painter.translate(rect.topLeft())
         clip_rect = QtCore.QRectF(0.0, 0.0, float(rect.width()), float(rect.height()))
-        self._html_doc.setHtml(html)
-        self._html_doc.setTextWidth(rect.width())
-        self._html_doc.setPageSize(rect.size())
-        self._html_doc.drawContents(painter, clip_rect)
+        draw_html_document(painter, html_doc, clip_rect, text_color)
 
         painter.restore()
 
@@ -427,12 +1202,313 @@ class ImageItemDelegate(MultiEditItemDelegate):
 
     def __init__(self, parent=None):
         super().__init__(parent)
+        self._image_cache = None
+        self._async_loading = False
+        self._pending_indexes = {}
+        self._model = None
+        self._resource_handles = {}
+        self._index_resource_keys = {}
+        self._low_quality = False
+        self._variant_params = None
+        self._retention_screen_count = 2
+        self._animated_indexes = {}
+
+        # Coalesce paints, so hidden rows are only checked once per event loop.
+        self._release_timer = QtCore.QTimer(self)
+        self._release_timer.setSingleShot(True)
+        self._release_timer.setInterval(0)
+        self._release_timer.timeout.connect(self.releaseHiddenResources)
 
     def getImageCache(self):
         return self._image_cache
 
     def setImageCache(self, cache):
+        if self._image_cache is not None:
+            self._image_cache.resourceReady.disconnect(self.onResourceReady)
+        self.releaseResources()
         self._image_cache = cache
+        self._pending_indexes.clear()
+        if self._image_cache is not None:
+            self._image_cache.resourceReady.connect(self.onResourceReady)
+
+    def setModel(self, model: QtCore.QAbstractItemModel):
+        """Set the model whose rows own the drawn resources. Resources
+        are released once their rows are removed or the model is reset.
+        This is called automatically with the model of painted indices.
+        Args:
+            model (QtCore.QAbstractItemModel): The model.
+        """
+        model_signals = (
+            "rowsInserted",
+            "rowsRemoved",
+            "rowsMoved",
+            "columnsInserted",
+            "columnsRemoved",
+            "columnsMoved",
+            "layoutChanged",
+        )
+        if self._model is not None:
+            self._model.rowsAboutToBeRemoved.disconnect(self.onRowsAboutToBeRemoved)
+            self._model.modelAboutToBeReset.disconnect(self.releaseResources)
+            for signal_name in model_signals:
+                getattr(self._model, signal_name).disconnect(self.rebuildIndexKeys)
+        self.releaseResources()
+        self._model = model
+        if self._model is not None:
+            self._model.rowsAboutToBeRemoved.connect(self.onRowsAboutToBeRemoved)
+            self._model.modelAboutToBeReset.connect(self.releaseResources)
+            for signal_name in model_signals:
+                getattr(self._model, signal_name).connect(self.rebuildIndexKeys)
+
+    def trackResource(self, index: QtCore.QModelIndex, resource_key: Any):
+        """Pin the resource drawn for the index until its row scrolls out
+        of the retention range or is removed. Resources of removed rows
+        are cleared from the cache, resources of rows that scrolled out
+        or now draw another resource stay cached (but can be evicted).
+        Args:
+            index (QtCore.QModelIndex): The model index.
+            resource_key (Any): The cache key of the drawn resource.
+        """
+        index_key = (index.row(), index.column(), index.internalId())
+        previous_resource_key = self._index_resource_keys.get(index_key, None)
+        if previous_resource_key == resource_key:
+            return
+        if previous_resource_key is not None:
+            self.untrackResource(previous_resource_key, index_key, clear=False)
+        entry = self._resource_handles.get(resource_key, None)
+        if entry is None:
+            handle = self._image_cache.acquireResourceHandle(resource_key, clear=True)
+            if handle is None:
+                return
+            entry = self._resource_handles[resource_key] = {
+                "handle": handle,
+                "indexes": {},
+            }
+        entry["indexes"][index_key] = QtCore.QPersistentModelIndex(index)
+        self._index_resource_keys[index_key] = resource_key
+
+    def untrackResource(self, resource_key: Any, index_key: tuple, clear=True):
+        """Stop tracking a resource for an index, the resource
+        is released once no tracked index draws it anymore.
+        Args:
+            resource_key (Any): The cache key of the drawn resource.
+            index_key (tuple): The (row, column, internal id) of the index.
+            clear (bool): If True, remove the resource from the
+                          cache once it has no users anymore.
+        """
+        self._index_resource_keys.pop(index_key, None)
+        entry = self._resource_handles.get(resource_key, None)
+        if entry is None:
+            return
+        entry["indexes"].pop(index_key, None)
+        if not entry["indexes"]:
+            self._resource_handles.pop(resource_key)["handle"].release(clear=clear)
+
+    def trackAnimation(self, index: QtCore.QModelIndex):
+        """Repaint an animated cell on the next animation clock frame.
+        The delegate subscribes to the clock while animated cells are
+        painted, cells that aren't painted again are dropped on the
+        next frame, so the clock stops once no animation is visible.
+        Args:
+            index (QtCore.QModelIndex): The model index.
+        """
+        index_key = (index.row(), index.column(), index.internalId())
+        self._animated_indexes[index_key] = QtCore.QPersistentModelIndex(index)
+        getAnimationClock().subscribe(self.onFrameChanged)
+
+    def onFrameChanged(self, frame: int):
+        """Request a repaint of the animated cells painted since the last frame.
+        Args:
+            frame (int): The global frame.
+        """
+        animated_indexes = self._animated_indexes
+        self._animated_indexes = {}
+        if not animated_indexes:
+            getAnimationClock().unsubscribe(self.onFrameChanged)
+            return
+        for persistent_index in animated_indexes.values():
+            if persistent_index.isValid():
+                self.repaintNeeded.emit(QtCore.QModelIndex(persistent_index))
+
+    def retentionScreenCount(self) -> int:
+        """Get the count of screens around the viewport
+        whose rows keep their resources pinned.
+        Returns:
+            int: The count.
+        """
+        return self._retention_screen_count
+
+    def setRetentionScreenCount(self, value: int):
+        """Set the count of screens around the viewport whose rows keep
+        their resources pinned. This should match the screen count of an
+        ItemViewPrefetcher, so prefetched rows that get painted stay pinned.
+        Args:
+            value (int): The count.
+        """
+        self._retention_screen_count = max(0, value)
+        self._release_timer.start()
+
+    def releaseHiddenResources(self):
+        """Unpin the resources of rows outside of the retention range,
+        so they can be evicted to make room for the rows in view.
+        This only applies if the delegate is parented to its view.
+        """
+        view = self.parent()
+        if not isinstance(view, QtWidgets.QAbstractItemView):
+            return
+        viewport_rect = view.viewport().rect()
+        retention_rect = viewport_rect.adjusted(
+            -viewport_rect.width() * self._retention_screen_count,
+            -viewport_rect.height() * self._retention_screen_count,
+            viewport_rect.width() * self._retention_screen_count,
+            viewport_rect.height() * self._retention_screen_count,
+        )
+        hidden_keys = []
+        for resource_key, entry in self._resource_handles.items():
+            for index_key, persistent_index in entry["indexes"].items():
+                if not persistent_index.isValid() or not view.visualRect(
+                    QtCore.QModelIndex(persistent_index)
+                ).intersects(retention_rect):
+                    hidden_keys.append((resource_key, index_key))
+        for resource_key, index_key in hidden_keys:
+            self.untrackResource(resource_key, index_key, clear=False)
+
+    def rebuildIndexKeys(self, *args):
+        """Re-key the tracked indices by their current (row, column, internal
+        id), as inserted, moved or sorted rows shift them. Indices that
+        no longer exist release their resources.
+        """
+        resource_handles = self._resource_handles
+        self._resource_handles = {}
+        self._index_resource_keys = {}
+        for resource_key, entry in resource_handles.items():
+            indexes = {}
+            for persistent_index in entry["indexes"].values():
+                if not persistent_index.isValid():
+                    continue
+                index_key = (
+                    persistent_index.row(),
+                    persistent_index.column(),
+                    persistent_index.internalId(),
+                )
+                indexes[index_key] = persistent_index
+            if not indexes:
+                entry["handle"].release()
+                continue
+            entry["indexes"] = indexes
+            self._resource_handles[resource_key] = entry
+            for index_key in indexes:
+                self._index_resource_keys[index_key] = resource_key
+
+    def releaseResources(self):
+        """Release all tracked resources."""
+        for entry in self._resource_handles.values():
+            entry["handle"].release()
+        self._resource_handles.clear()
+        self._index_resource_keys.clear()
+
+    def onRowsAboutToBeRemoved(self, parent: QtCore.QModelIndex, first: int, last: int):
+        """Release the resources that are only drawn by the removed rows.
+        Args:
+            parent (QtCore.QModelIndex): The parent index.
+            first (int): The first removed row.
+            last (int): The last removed row.
+        """
+        removed_keys = []
+        for resource_key, entry in self._resource_handles.items():
+            for index_key, persistent_index in entry["indexes"].items():
+                if not persistent_index.isValid() or (
+                    persistent_index.parent() == parent
+                    and first <= persistent_index.row() <= last
+                ):
+                    removed_keys.append((resource_key, index_key))
+        for resource_key, index_key in removed_keys:
+            self.untrackResource(resource_key, index_key)
+
+    def prefetch(self, resource_names, priority=0):
+        """Queue the variants of resources to be decoded in the background,
+        with the cell size and device pixel ratio of the last painted cell.
+        This mirrors MediaCache.prefetch, so the delegate can be used as
+        the cache of an ItemViewPrefetcher.
+        Args:
+            resource_names (Iterable[str]): The resource names.
+            priority (float): The priority.
+        """
+        if self._image_cache is None:
+            return
+        if self._variant_params is None:
+            self._image_cache.prefetch(resource_names, priority)
+            return
+        size, device_pixel_ratio = self._variant_params
+        self._image_cache.prefetch(resource_names, priority, size, device_pixel_ratio)
+
+    def cancelPrefetch(self, resource_names=None):
+        """Cancel the background decodes of resources,
+        unless a painted cell is waiting for them.
+        Args:
+            resource_names (Iterable[str]): The resource names, all if None.
+        """
+        if self._image_cache is not None:
+            self._image_cache.cancelPrefetch(resource_names)
+
+    def asyncLoading(self) -> bool:
+        """Get the async loading state.
+        Returns:
+            bool: The state.
+        """
+        return self._async_loading
+
+    def setAsyncLoading(self, state: bool):
+        """Set the async loading state. If enabled, images are
+        decoded in the background and a placeholder is drawn until
+        the image is available.
+        Args:
+            state (bool): The state.
+        """
+        self._async_loading = state
+
+    def lowQuality(self) -> bool:
+        """Get the low quality state.
+        Returns:
+            bool: The state.
+        """
+        return self._low_quality
+
+    def setLowQuality(self, state: bool):
+        """Set the low quality state. If enabled, images are
+        drawn from half resolution variants to save memory.
+        Args:
+            state (bool): The state.
+        """
+        if state == self._low_quality:
+            return
+        self._low_quality = state
+        view = self.parent()
+        if isinstance(view, QtWidgets.QAbstractItemView):
+            view.viewport().update()
+
+    def onMemoryPressureChanged(self, level: int):
+        """Switch to low quality variants under critical memory pressure.
+        Args:
+            level (int): The memory pressure level.
+        """
+        self.setLowQuality(level >= MemoryPressureLevel.critical)
+
+    def onResourceReady(self, resource_name: str):
+        """Repaint the indices that requested the resource.
+        Args:
+            resource_name (str): The resource name.
+        """
+        persistent_indexes = self._pending_indexes.pop(resource_name, {})
+        view = self.parent()
+        for persistent_index in persistent_indexes.values():
+            if not persistent_index.isValid():
+                continue
+            index = QtCore.QModelIndex(persistent_index)
+            if isinstance(view, QtWidgets.QAbstractItemView):
+                view.update(index)
+            else:
+                self.repaintNeeded.emit(index)
 
     def paint(
         self,
@@ -456,24 +1532,66 @@ class ImageItemDelegate(MultiEditItemDelegate):
             return
 
         rect = option.rect
+        if index.model() is not self._model:
+            self.setModel(index.model())
 
         display_time_out = index.data(Qt.UserRole)
         image_resource_name = index.data(Qt.UserRole + 1)
-        image_resource = self._image_cache.getResource(image_resource_name, track=False)
+        device_pixel_ratio = painter.device().devicePixelRatioF()
+        if self._low_quality:
+            device_pixel_ratio *= 0.5
+        self._variant_params = (rect.size(), device_pixel_ratio)
+        image_resource = self._image_cache.getResourceVariant(
+            image_resource_name,
+            rect.size(),
+            device_pixel_ratio,
+            asynchronous=self._async_loading,
+        )
+        if (
+            self._async_loading
+            and image_resource is not None
+            and image_resource is self._image_cache.placeholder()
+        ):
+            pending_key = (index.row(), index.column(), index.internalId())
+            self._pending_indexes.setdefault(image_resource_name, {})[
+                pending_key
+            ] = QtCore.QPersistentModelIndex(index)
+        elif image_resource is not None:
+            self.trackResource(
+                index,
+                self._image_cache.resourceVariantKey(
+                    image_resource_name, rect.size(), device_pixel_ratio
+                ),
+            )
+        if self._resource_handles:
+            self._release_timer.start()
         if image_resource:
-            if isinstance(image_resource, QtSvg.QSvgRenderer):
+            if isinstance(image_resource, SvgFrameAtlas):
                 if display_time_out > 0:
+                    image_resource.draw(painter, rect)
+                    self.trackAnimation(index)
+            elif isinstance(image_resource, ImageSequence):
+                if display_time_out > 0:
+                    frame_pixmap = image_resource.currentFrame()
+                    if frame_pixmap is not None:
+                        painter.save()
+                        painter.setRenderHint(QtGui.QPainter.SmoothPixmapTransform)
+                        painter.drawPixmap(rect, frame_pixmap)
+                        painter.restore()
+                    self.trackAnimation(index)
+            elif isinstance(image_resource, QtGui.QPixmap):
+                if image_resource.width() == round(rect.width() * device_pixel_ratio):
+                    # Variants match the rect size, so this is a plain blit.
+                    painter.drawPixmap(rect, image_resource)
+                else:
+                    # Mip levels are at most twice the rect size.
                     painter.save()
-                    painter.translate(rect.topLeft())
-                    image_resource.setViewBox(option.rect)
-                    image_resource.render(painter, option.rect)
+                    painter.setRenderHint(QtGui.QPainter.SmoothPixmapTransform)
+                    painter.drawPixmap(rect, image_resource)
                     painter.restore()
-                    self.repaintNeeded.emit(index)
-            elif isinstance(image_resource, QtGui.QPixmap):
-                painter.save()
-                painter.setRenderHint(QtGui.QPainter.Antialiasing)
-                painter.drawPixmap(rect, image_resource)
-                painter.restore()
+            elif isinstance(image_resource, QtGui.QImage):
+                # Shared memory images are drawn without a pixmap copy.
+                painter.drawImage(rect, image_resource)
 
         return
         image = ""
@@ -543,6 +1661,15 @@ class TagItemDelegate(MultiEditItemDelegate):
 
         self._label_pen = QtGui.QPen()
 
+        self._icon_cache = getIconCache()
+        self._text_metrics = getTextMetricsCache()
+        self._label_fonts = {}
+
+        # Pixmap cache
+        self._style_revision = 0
+        self._pixmap_cache = OrderedDict()
+        self._pixmap_cache_max_count = 1024
+
         # Example Style
         # self._colors = {
         #     TagItemColorRole.background: QtGui.QColor(229, 239, 254),
@@ -611,6 +1738,7 @@ class TagItemDelegate(MultiEditItemDelegate):
             pen (QtGui.QBrush): The pen.
         """
         self._bg_brush = brush
+        self.invalidatePixmapCache()
 
     def borderPen(self) -> QtGui.QPen:
         """Get the border pen.
@@ -625,6 +1753,7 @@ class TagItemDelegate(MultiEditItemDelegate):
             pen (QtGui.QPen): The pen.
         """
         self._border_pen = pen
+        self.invalidatePixmapCache()
 
     def borderWidthPercentage(self) -> float:
         """Get the button border width.
@@ -639,6 +1768,7 @@ class TagItemDelegate(MultiEditItemDelegate):
             value (float): The width.
         """
         self._border_width_percentage = min(max(0, value * 0.5), 0.5)
+        self.invalidatePixmapCache()
 
     def iconAlignment(self) -> Qt.Alignment:
         """Get the icon alignment.
@@ -657,6 +1787,7 @@ class TagItemDelegate(MultiEditItemDelegate):
                 "Invalid alignment specified! Only 'Qt.AlignLeft'/'Qt.AlignRight' are allowed"
             )
         self._icon_alignment = alignment
+        self.invalidatePixmapCache()
 
     def iconScale(self) -> float:
         """Get the icon scale.
@@ -671,6 +1802,7 @@ class TagItemDelegate(MultiEditItemDelegate):
             value (float): The icon scale.
         """
         self._icon_scale = value
+        self.invalidatePixmapCache()
 
     def labelPen(self) -> QtGui.QPen:
         """Get the label pen.
@@ -685,6 +1817,7 @@ class TagItemDelegate(MultiEditItemDelegate):
             pen (QtGui.QPen): The pen.
         """
         self._label_pen = pen
+        self.invalidatePixmapCache()
 
     def color(self, role: int):
         """Get the tag colors.
@@ -705,6 +1838,7 @@ class TagItemDelegate(MultiEditItemDelegate):
         """
         if role in self._colors:
             self._colors[role] = color
+            self.invalidatePixmapCache()
             return True
         else:
             return False
@@ -728,10 +1862,54 @@ class TagItemDelegate(MultiEditItemDelegate):
         """
         if role in self._icons:
             self._icons[role] = icon
+            self.invalidatePixmapCache()
             return True
         else:
             return False
 
+    def getIconCache(self):
+        """Get the icon cache used to rasterize the tag icons.
+        Returns:
+            IconCache: The icon cache.
+        """
+        return self._icon_cache
+
+    def setIconCache(self, cache):
+        """Set the icon cache used to rasterize the tag icons.
+        Args:
+            cache (IconCache): The icon cache.
+        """
+        self._icon_cache = cache
+        self.invalidatePixmapCache()
+
+    def styleRevision(self) -> int:
+        """Get the style revision, which is bumped whenever the style changes.
+        Returns:
+            int: The revision.
+        """
+        return self._style_revision
+
+    def invalidatePixmapCache(self):
+        """Drop all pre-rendered tag pixmaps and bump the style revision."""
+        self._style_revision += 1
+        self._pixmap_cache.clear()
+
+    def pixmapCacheMaxCount(self) -> int:
+        """Get the maximum number of pre-rendered tag pixmaps.
+        Returns:
+            int: The count.
+        """
+        return self._pixmap_cache_max_count
+
+    def setPixmapCacheMaxCount(self, count: int):
+        """Set the maximum number of pre-rendered tag pixmaps.
+        Args:
+            count (int): The count, 0 disables the cache.
+        """
+        self._pixmap_cache_max_count = max(0, count)
+        while len(self._pixmap_cache) > self._pixmap_cache_max_count:
+            self._pixmap_cache.popitem(last=False)
+
     def getIconRect(self, index, rect) -> QtCore.QRect:
         """Get the icon rectangle.
         Args:
@@ -770,6 +1948,37 @@ class TagItemDelegate(MultiEditItemDelegate):
         )
         return icon_rect
 
+    def getTextMetricsCache(self) -> TextMetricsCache:
+        """Get the text metrics cache used to measure the tag labels.
+        Returns:
+            TextMetricsCache: The text metrics cache.
+        """
+        return self._text_metrics
+
+    def setTextMetricsCache(self, cache: TextMetricsCache):
+        """Set the text metrics cache used to measure the tag labels.
+        Args:
+            cache (TextMetricsCache): The text metrics cache.
+        """
+        self._text_metrics = cache
+
+    def labelFont(self, font: QtGui.QFont) -> QtGui.QFont:
+        """Get the (shared) label font for the given item font.
+        Args:
+            font (QtGui.QFont): The item font, it is not modified.
+        Returns:
+            QtGui.QFont: The font scaled by the font point size percentage.
+        """
+        key = (font.key(), self._font_point_size_percentage)
+        label_font = self._label_fonts.get(key, None)
+        if label_font is None:
+            label_font = QtGui.QFont(font)
+            label_font.setPointSizeF(
+                label_font.pointSizeF() * self._font_point_size_percentage
+            )
+            self._label_fonts[key] = label_font
+        return label_font
+
     def sizeHint(
         self, option: QtWidgets.QStyleOptionViewItem, index: QtCore.QModelIndex
     ) -> QtCore.QSize:
@@ -778,21 +1987,60 @@ class TagItemDelegate(MultiEditItemDelegate):
             option (QtWidgets.QStyleOptionViewItem): The style option.
             index (QtCore.QModelIndex): The model index.
         """
-        text = index.data(Qt.DisplayRole)
+        return self.sizeHints(option, [index])[0]
 
-        # Height
-        size_hint = index.data(Qt.SizeHintRole)
-        size_height = size_hint.height() if size_hint else option.fontMetrics.height()
-        # Width based on content
-        font = option.font
-        font.setPointSizeF(font.pointSizeF() * self._font_point_size_percentage)
-        font_metrics = QtGui.QFontMetrics(font)
-        size_width = font_metrics.horizontalAdvance(text)
-        # Add padding for round border
-        size_width += size_height
-
-        size = QtCore.QSize(size_width, size_height)
-        return size
+    def sizeHints(
+        self,
+        option: QtWidgets.QStyleOptionViewItem,
+        indexes: List[QtCore.QModelIndex],
+    ) -> List[QtCore.QSize]:
+        """Calculate the sizes of multiple items based on their text.
+        The label font and its metrics are resolved once for the whole batch.
+        Args:
+            option (QtWidgets.QStyleOptionViewItem): The style option.
+            indexes (list[QtCore.QModelIndex]): The model indexes.
+        Returns:
+            list[QtCore.QSize]: The sizes.
+        """
+        font = self.labelFont(option.font)
+        font_key = font.key()
+        font_height = option.fontMetrics.height()
+        horizontal_advance = self._text_metrics.horizontalAdvance
+
+        sizes = []
+        for index in indexes:
+            text = index.data(Qt.DisplayRole) or ""
+            # Height
+            size_hint = index.data(Qt.SizeHintRole)
+            size_height = size_hint.height() if size_hint else font_height
+            # Width based on content
+            size_width = horizontal_advance(font, text, font_key)
+            # Add padding for round border
+            size_width += size_height
+            sizes.append(QtCore.QSize(size_width, size_height))
+        return sizes
+
+    def tagState(
+        self, option: QtWidgets.QStyleOptionViewItem, index: QtCore.QModelIndex
+    ) -> tuple:
+        """Get the state bucket that decides the tag colors and icon.
+        Args:
+            option (QtWidgets.QStyleOptionViewItem): The style option.
+            index (QtCore.QModelIndex): The model index.
+        Returns:
+            tuple: The state ("hover"/"selected"/"checked"/"normal")
+                   and the checked state.
+        """
+        is_checked = index.data(Qt.CheckStateRole) == Qt.Checked
+        if option.state & QtWidgets.QStyle.State_MouseOver:
+            state = "hover"
+        elif option.state & QtWidgets.QStyle.State_Selected:
+            state = "selected"
+        elif is_checked:
+            state = "checked"
+        else:
+            state = "normal"
+        return state, is_checked
 
     def paint(
         self,
@@ -800,30 +2048,89 @@ class TagItemDelegate(MultiEditItemDelegate):
         option: QtWidgets.QStyleOptionViewItem,
         index: QtCore.QModelIndex,
     ) -> None:
-        """Paint the tag item
+        """Paint the tag item from the pre-rendered tag pixmap cache.
         Args:
             painter (QtGui.QPainter): The painter.
             option (QtWidgets.QStyleOptionViewItem): The style option.
             index (QtCore.QModelIndex): The model index.
         """
-
-        # Style
-        is_checked = index.data(Qt.CheckStateRole) == Qt.Checked
-        is_hover = option.state & QtWidgets.QStyle.State_MouseOver
-        is_selected = option.state & QtWidgets.QStyle.State_Selected
+        rect = option.rect
+        if rect.isEmpty():
+            return
 
         label_text = index.data(Qt.DisplayRole)
         icon = index.data(Qt.DecorationRole)
+        state, is_checked = self.tagState(option, index)
+
+        if not self._pixmap_cache_max_count:
+            self.paintTag(painter, rect, label_text, icon, state, is_checked)
+            return
+
+        dpr = painter.device().devicePixelRatioF()
+        font = painter.font()
+        key = (
+            label_text,
+            state,
+            is_checked,
+            icon.cacheKey() if icon else None,
+            rect.width(),
+            rect.height(),
+            dpr,
+            font.key(),
+            self._style_revision,
+        )
+        pixmap = self._pixmap_cache.get(key, None)
+        if pixmap is None:
+            pixmap = QtGui.QPixmap(rect.size() * dpr)
+            pixmap.setDevicePixelRatio(dpr)
+            pixmap.fill(Qt.transparent)
+            pixmap_painter = QtGui.QPainter(pixmap)
+            pixmap_painter.setFont(font)
+            self.paintTag(
+                pixmap_painter,
+                QtCore.QRect(QtCore.QPoint(0, 0), rect.size()),
+                label_text,
+                icon,
+                state,
+                is_checked,
+            )
+            pixmap_painter.end()
+            self._pixmap_cache[key] = pixmap
+            if len(self._pixmap_cache) > self._pixmap_cache_max_count:
+                self._pixmap_cache.popitem(last=False)
+        else:
+            self._pixmap_cache.move_to_end(key)
+        painter.drawPixmap(rect.topLeft(), pixmap)
 
-        if is_hover:
+    def paintTag(
+        self,
+        painter: QtGui.QPainter,
+        rect: QtCore.QRect,
+        label_text: str,
+        icon: QtGui.QIcon,
+        state: str,
+        is_checked: bool,
+    ) -> None:
+        """Paint the tag
+        Args:
+            painter (QtGui.QPainter): The painter.
+            rect (QtCore.QRect): The tag rect.
+            label_text (str): The label.
+            icon (QtGui.QIcon): The icon, the checked state icon is used if None.
+            state (str): The state, see tagState.
+            is_checked (bool): The checked state.
+        """
+
+        # Style
+        if state == "hover":
             bg_color = self._colors[TagItemColorRole.backgroundHover]
             border_color = self._colors[TagItemColorRole.borderHover]
             label_color = self._colors[TagItemColorRole.labelHover]
-        elif is_selected:
+        elif state == "selected":
             bg_color = self._colors[TagItemColorRole.backgroundSelected]
             border_color = self._colors[TagItemColorRole.borderSelected]
             label_color = self._colors[TagItemColorRole.labelSelected]
-        elif is_checked:
+        elif state == "checked":
             bg_color = self._colors[TagItemColorRole.backgroundChecked]
             border_color = self._colors[TagItemColorRole.borderChecked]
             label_color = self._colors[TagItemColorRole.labelChecked]
@@ -844,8 +2151,6 @@ class TagItemDelegate(MultiEditItemDelegate):
                 icon = self._icons[TagItemIconRole.unchecked]
 
         # Draw areas
-        rect = option.rect
-
         bg_rect = rect
         bg_radius = bg_rect.height() * 0.5
 
@@ -864,7 +2169,7 @@ class TagItemDelegate(MultiEditItemDelegate):
         )
         text_font_scale = 1.0
 
-        icon_rect = self.getIconRect(index, rect)
+        icon_rect = self.getIconRect(None, rect)
         if icon:
             text_font_scale = text_rect.width()
             if self._icon_alignment == Qt.AlignLeft:
@@ -910,9 +2215,17 @@ class TagItemDelegate(MultiEditItemDelegate):
 
         # Icon
         if icon:
-            painter.save()
-            icon.paint(painter, icon_rect)
-            painter.restore()
+            icon_pixmap = self._icon_cache.getIconPixmap(
+                icon, icon_rect.size(), painter.device().devicePixelRatioF()
+            )
+            if icon_pixmap is not None:
+                # Match QIcon.paint, which centers the (possibly smaller) pixmap.
+                icon_pixmap_rect = QtCore.QRect(
+                    QtCore.QPoint(0, 0),
+                    icon_pixmap.size() / icon_pixmap.devicePixelRatio(),
+                )
+                icon_pixmap_rect.moveCenter(icon_rect.center())
+                painter.drawPixmap(icon_pixmap_rect, icon_pixmap)
 
         # Label
         painter.save()
@@ -1017,4 +2330,148 @@ class TagView(QtWidgets.QListView):
             print("Checked", index, check_state)
             event.accept()
         else:
-            return super().mouseReleaseEvent(event)
\ No newline at end of file
+            return super().mouseReleaseEvent(event)
+
+##############################
+# Prefetch
+##############################
+
+
+class ItemViewPrefetcher(QtCore.QObject):
+    """Queue cache prefetches for the rows around the visible range
+    of an item view. Rows ahead of the viewport (in scroll direction)
+    are prioritized over rows behind it and prefetches of rows that
+    scrolled out of range are cancelled.
+    """
+
+    def __init__(
+        self,
+        view: QtWidgets.QAbstractItemView,
+        cache,
+        role: int = Qt.UserRole + 1,
+        column: int = 0,
+        screen_count: int = 2,
+    ) -> None:
+        super().__init__(view)
+        self._view = view
+        self._cache = cache
+        self._role = role
+        self._column = column
+        self._screen_count = screen_count
+        self._scroll_direction = 1
+        self._scroll_values = {}
+        self._queued_resource_names = set()
+
+        # Coalesce scroll events, so the queue is only rebuilt once per event loop.
+        self._update_timer = QtCore.QTimer(self)
+        self._update_timer.setSingleShot(True)
+        self._update_timer.setInterval(0)
+        self._update_timer.timeout.connect(self.update)
+
+        for scroll_bar in (view.verticalScrollBar(), view.horizontalScrollBar()):
+            scroll_bar.valueChanged.connect(self.onScrolled)
+            self._scroll_values[scroll_bar] = scroll_bar.value()
+
+    def screenCount(self) -> int:
+        """Get the count of screens to prefetch ahead of the viewport.
+        Returns:
+            int: The count.
+        """
+        return self._screen_count
+
+    def setScreenCount(self, value: int):
+        """Set the count of screens to prefetch ahead of the viewport.
+        Args:
+            value (int): The count.
+        """
+        self._screen_count = max(0, value)
+        self._update_timer.start()
+
+    def scrollDirection(self) -> int:
+        """Get the last scroll direction.
+        Returns:
+            int: 1 if scrolling forward, -1 if scrolling backward.
+        """
+        return self._scroll_direction
+
+    def onScrolled(self, value: int):
+        """The scroll bar callback, this tracks the scroll direction.
+        Args:
+            value (int): The scroll bar value.
+        """
+        scroll_bar = self.sender()
+        previous_value = self._scroll_values.get(scroll_bar, value)
+        self._scroll_values[scroll_bar] = value
+        if value != previous_value:
+            self._scroll_direction = 1 if value > previous_value else -1
+        self._update_timer.start()
+
+    def visibleRowRange(self) -> tuple[int, int]:
+        """Get the visible row range of the view.
+        Returns:
+            tuple[int, int]: The first and last visible row, (-1, -1) if empty.
+        """
+        viewport_rect = self._view.viewport().rect()
+        first_row = -1
+        last_row = -1
+        # Probe along the top/bottom edges, as item spacing can leave gaps.
+        probe_count = 8
+        for probe_idx in range(probe_count + 1):
+            x = viewport_rect.left() + viewport_rect.width() * probe_idx // probe_count
+            for y in (viewport_rect.top(), viewport_rect.bottom()):
+                index = self._view.indexAt(QtCore.QPoint(x, y))
+                if not index.isValid():
+                    continue
+                if first_row < 0 or index.row() < first_row:
+                    first_row = index.row()
+                last_row = max(last_row, index.row())
+        model = self._view.model()
+        if first_row < 0 and model is not None and model.rowCount():
+            first_row = 0
+        if last_row < 0 and first_row >= 0:
+            last_row = first_row
+        return first_row, last_row
+
+    def update(self):
+        """Rebuild the prefetch queue from the current visible range."""
+        model = self._view.model()
+        if model is None:
+            return
+        first_row, last_row = self.visibleRowRange()
+        if first_row < 0:
+            self._cache.cancelPrefetch(self._queued_resource_names)
+            self._queued_resource_names = set()
+            return
+        row_count = model.rowCount()
+        visible_count = last_row - first_row + 1
+        ahead_count = visible_count * self._screen_count
+        behind_count = visible_count
+
+        # Priorities drop with the distance to the viewport, rows behind it
+        # (in scroll direction) drop twice as fast.
+        row_priorities = {row: 0 for row in range(first_row, last_row + 1)}
+        for distance in range(1, max(ahead_count, behind_count) + 1):
+            ahead_row = last_row + distance
+            behind_row = first_row - distance
+            if self._scroll_direction < 0:
+                ahead_row = first_row - distance
+                behind_row = last_row + distance
+            if distance <= ahead_count and 0 <= ahead_row < row_count:
+                row_priorities[ahead_row] = -distance
+            if distance <= behind_count and 0 <= behind_row < row_count:
+                row_priorities[behind_row] = -distance * 2
+
+        priority_resource_names = {}
+        for row, priority in row_priorities.items():
+            resource_name = model.index(row, self._column).data(self._role)
+            if not resource_name:
+                continue
+            priority_resource_names.setdefault(priority, []).append(resource_name)
+        resource_names = set()
+        for priority in sorted(priority_resource_names, reverse=True):
+            names = priority_resource_names[priority]
+            self._cache.prefetch(names, priority)
+            resource_names.update(names)
+
+        self._cache.cancelPrefetch(self._queued_resource_names - resource_names)
+        self._queued_resource_names = resource_names